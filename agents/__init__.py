@@ -2,10 +2,12 @@ from .metadata_extractor_agent import extract_metadata
 from .multi_agent_coordinator import run_multi_agent_system
 from .data_collection_agent import fetch_github_readme
 from .tag_candidate_agent import generate_tag_candidates
+from .topic_dictionary_agent import match_dictionary_candidates
 
 __all__ = [
     "extract_metadata",
     "run_multi_agent_system",
     "fetch_github_readme",
-    "generate_tag_candidates"
+    "generate_tag_candidates",
+    "match_dictionary_candidates"
 ]
@@ -0,0 +1,166 @@
+import os
+from typing import Callable, List, Dict, Any, Optional
+from dotenv import load_dotenv
+from agents.tag_candidate_agent import generate_tag_candidates
+from agents.topic_dictionary_agent import match_dictionary_candidates
+from tool.keyphrase_extractor import tfidf_keyphrases
+from tool.lexical_scorer import tokenize
+from tool.readme_chunking import chunk_text
+
+load_dotenv()
+
+CANDIDATE_CASCADE = os.getenv("CANDIDATE_CASCADE", "true").lower() in ("1", "true", "yes")
+CASCADE_MIN_TAGS = int(os.getenv("CASCADE_MIN_TAGS", "8"))  # Confident cheap tags needed to skip the LLM
+CASCADE_MIN_COVERAGE = float(os.getenv("CASCADE_MIN_COVERAGE", "0.5"))  # Share of README chunks they must cover
+CASCADE_MIN_CONFIDENCE = float(os.getenv("CASCADE_MIN_CONFIDENCE", "0.6"))  # Per-tag confidence to count as confident
+CASCADE_KEYPHRASES = 10
+
+# Cheapest and most trustworthy first; a tag keeps the first tier that produced it
+TIERS = ["topics", "technologies", "dictionary", "keyphrase", "llm"]
+
+
+def _tier_candidates(
+    readme_content: str,
+    topics: List[str],
+    technologies: List[str]
+) -> List[Dict[str, Any]]:
+    """Local candidates with their tier and a 0-1 confidence"""
+    candidates = []
+    # Maintainer-curated, so trusted outright
+    candidates += [{"tag": t, "tier": "topics", "confidence": 1.0} for t in topics]
+    # Measured by GitHub, but minor languages (build scripts, notebooks) are less telling
+    candidates += [{"tag": t, "tier": "technologies", "confidence": 0.8} for t in technologies]
+
+    dictionary_result = match_dictionary_candidates(readme_content)
+    for match in dictionary_result.get("matches", []):
+        candidates.append({
+            "tag": match["tag"],
+            "tier": "dictionary",
+            "confidence": 0.8 if match["count"] > 1 else 0.5,
+            "count": match["count"]
+        })
+
+    for phrase, score in tfidf_keyphrases(readme_content, top_k=CASCADE_KEYPHRASES).items():
+        candidates.append({"tag": phrase, "tier": "keyphrase", "confidence": round(0.7 * score, 4), "score": score})
+    return candidates
+
+
+def _chunk_coverage(chunks: List[str], tags: List[str]) -> float:
+    """Share of chunks mentioning at least one of the tags (every tag token present)"""
+    if not chunks:
+        return 0.0
+    tag_tokens = [set(tokenize(tag)) for tag in tags]
+    tag_tokens = [tokens for tokens in tag_tokens if tokens]
+    covered = 0
+    for chunk in chunks:
+        chunk_tokens = set(tokenize(chunk))
+        if any(tokens <= chunk_tokens for tokens in tag_tokens):
+            covered += 1
+    return covered / len(chunks)
+
+
+def cascade_tag_candidates(
+    readme_content: str,
+    topics: Optional[List[str]] = None,
+    technologies: Optional[List[str]] = None,
+    min_tags: Optional[int] = None,
+    min_coverage: Optional[float] = None,
+    min_confidence: Optional[float] = None,
+    max_concurrency: Optional[int] = None,
+    packing: Optional[bool] = None,
+    routing: Optional[bool] = None,
+    on_tags: Optional[Callable[[List[str]], None]] = None,
+    hedging: Optional[bool] = None
+) -> Dict[str, Any]:
+    """
+    Candidate Cascade Agent - Generates candidate tags with local extractors first and
+    calls the LLM candidate generator only when they are not enough.
+
+    Tiers, cheapest first: GitHub topics and technologies (passthrough), canonical topic
+    dictionary matches in the README, and TF-IDF keyphrases. The LLM tier
+    (generate_tag_candidates) runs when fewer than ``min_tags`` local tags reach
+    ``min_confidence`` or when those tags are mentioned in less than ``min_coverage``
+    of the README chunks, i.e. when large parts of the README are unexplained.
+
+    Args:
+        readme_content: Full README text content
+        topics: GitHub repository topics
+        technologies: GitHub repository languages
+        min_tags: Confident local tags needed to skip the LLM (default: CASCADE_MIN_TAGS setting, 8)
+        min_coverage: README chunk coverage needed to skip the LLM (default: CASCADE_MIN_COVERAGE setting, 0.5)
+        min_confidence: Confidence for a local tag to count (default: CASCADE_MIN_CONFIDENCE setting, 0.6)
+        max_concurrency: Passed to generate_tag_candidates
+        packing: Passed to generate_tag_candidates
+        routing: Passed to generate_tag_candidates
+        on_tags: Passed to generate_tag_candidates
+        hedging: Passed to generate_tag_candidates
+
+    Returns:
+        Dictionary containing the candidate tags, the tier of each tag and the gate decision
+    """
+    # Input validation
+    if not isinstance(readme_content, str):
+        return {
+            "success": False,
+            "error": "Invalid readme_content: must be a string",
+            "agent": "candidate_cascade_agent"
+        }
+
+    topics = [t for t in (topics or []) if isinstance(t, str) and t.strip()]
+    technologies = [t for t in (technologies or []) if isinstance(t, str) and t.strip()]
+    min_tags = CASCADE_MIN_TAGS if min_tags is None else min_tags
+    min_coverage = CASCADE_MIN_COVERAGE if min_coverage is None else min_coverage
+    min_confidence = CASCADE_MIN_CONFIDENCE if min_confidence is None else min_confidence
+
+    # Step 1: Local tiers; a tag seen by several tiers keeps the first and its best confidence
+    entries: Dict[str, Dict[str, Any]] = {}
+    for candidate in _tier_candidates(readme_content, topics, technologies):
+        key = candidate["tag"].strip().lower()
+        if key in entries:
+            entries[key]["confidence"] = max(entries[key]["confidence"], candidate["confidence"])
+        else:
+            entries[key] = candidate
+
+    # Step 2: Gate on how much of the README the confident local tags explain
+    confident = [e["tag"] for e in entries.values() if e["confidence"] >= min_confidence]
+    chunks = chunk_text(readme_content, chunk_size=1000, overlap=200) if readme_content.strip() else []
+    coverage = _chunk_coverage(chunks, confident)
+
+    reasons = []
+    if len(confident) < min_tags:
+        reasons.append(f"{len(confident)} confident local tags < {min_tags}")
+    if chunks and coverage < min_coverage:
+        reasons.append(f"chunk coverage {coverage:.2f} < {min_coverage}")
+
+    # Step 3: LLM tier only when the cheap tiers fall short
+    llm_called = bool(reasons) and bool(readme_content.strip())
+    if llm_called:
+        print(f"[candidate_cascade_agent] Calling LLM candidate generation: {'; '.join(reasons)}")
+        for tag in generate_tag_candidates(
+            readme_content, max_concurrency=max_concurrency, packing=packing, routing=routing, on_tags=on_tags,
+            hedging=hedging
+        ):
+            key = tag.strip().lower()
+            if key not in entries:
+                entries[key] = {"tag": tag, "tier": "llm", "confidence": None}
+    else:
+        print(f"[candidate_cascade_agent] Skipping LLM candidate generation: {len(confident)} confident tags, coverage {coverage:.2f}")
+
+    tags = [e["tag"] for e in entries.values()]
+    return {
+        "success": True,
+        "agent": "candidate_cascade_agent",
+        "tags": tags,
+        "tiers": {e["tag"]: e["tier"] for e in entries.values()},
+        "tier_counts": {tier: sum(1 for e in entries.values() if e["tier"] == tier) for tier in TIERS},
+        "llm_called": llm_called,
+        "gate": {
+            "confident_tags": len(confident),
+            "coverage": round(coverage, 4),
+            "min_tags": min_tags,
+            "min_coverage": min_coverage,
+            "min_confidence": min_confidence,
+            "reasons": reasons
+        },
+        "candidates": list(entries.values())
+    }
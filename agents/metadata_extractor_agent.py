@@ -1,18 +1,18 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 import os
+import time
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from typing import List, Optional
+from tool.llm_registry import get_structured_llm
+from tool.model_router import MODEL_ROUTING, model_router
+from tool.llm_usage import llm_usage_stage, track_llm_usage
+from tool.extractive_summary import extractive_summary
 from .prompts import metadata_extractor_prompt
 
 load_dotenv()
 
-# Initialize LLM with Google Gemini
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0.7,
-    google_api_key=os.getenv("GOOGLE_API_KEY")
-)
+METADATA_SUMMARIZATION = os.getenv("METADATA_SUMMARIZATION", "true").lower() in ("1", "true", "yes")
+METADATA_TOKEN_BUDGET = int(os.getenv("METADATA_TOKEN_BUDGET", "4000"))  # Content tokens sent to the LLM
 
 class MetadataExtractorResponse(BaseModel):
     title: Optional[str]
@@ -25,8 +25,25 @@ class MetadataExtractorResponse(BaseModel):
     word_count: Optional[int]
 
 
-def extract_metadata(content: str) -> dict:
-    """Metadata Extractor Agent - Extracts structured metadata from content"""
+def extract_metadata(
+    content: str,
+    routing: Optional[bool] = None,
+    summarize: Optional[bool] = None,
+    token_budget: Optional[int] = None
+) -> dict:
+    """
+    Metadata Extractor Agent - Extracts structured metadata from content
+    
+    With summarize (default: METADATA_SUMMARIZATION setting, on) content longer than
+    ``token_budget`` tokens (default: METADATA_TOKEN_BUDGET setting, 4000) is condensed
+    locally with extractive TextRank summarization, keeping headings and key sentences
+    from the whole document, instead of being cut off. Details are returned under
+    "summarization" and word_count is the word count of the original content.
+    
+    With routing (default: MODEL_ROUTING setting) the content is sent to the fast or the
+    strong model by its difficulty, and the decision is returned under "model_routing".
+    The call's tokens, latency and estimated cost are returned under "llm_usage".
+    """
     # Input validation
     if not content or not isinstance(content, str):
         return {
@@ -40,9 +57,23 @@ def extract_metadata(content: str) -> dict:
             "agent": "metadata_extractor_agent"
         }
     
-    # Check content length and truncate if necessary (LLM token limits)
+    # Condense long content to the token budget before building the prompt
     MAX_CONTENT_LENGTH = 50000  # Reasonable limit for most LLMs
     truncated = False
+    summarization = None
+    word_count = len(content.split())
+    
+    summarize = METADATA_SUMMARIZATION if summarize is None else summarize
+    if summarize:
+        try:
+            summarization = extractive_summary(content, token_budget or METADATA_TOKEN_BUDGET)
+            if summarization["summarized"]:
+                print(f"[metadata_extractor_agent] Summarized content from {summarization['source_tokens']} "
+                      f"to {summarization['tokens']} tokens")
+                content = summarization["summary"]
+        except Exception as e:
+            print(f"[metadata_extractor_agent] Warning: Summarization failed, falling back to truncation: {str(e)}")
+            summarization = None
     
     if len(content) > MAX_CONTENT_LENGTH:
         print(f"[metadata_extractor_agent] Warning: Content length {len(content)} exceeds max {MAX_CONTENT_LENGTH}, truncating")
@@ -51,10 +82,26 @@ def extract_metadata(content: str) -> dict:
     
     prompt = metadata_extractor_prompt.format(content=content)
     
+    routing = MODEL_ROUTING if routing is None else routing
+    decision = model_router.route(content, agent="metadata_extractor_agent") if routing else None
+    
     try:
-        structured_llm = llm.with_structured_output(MetadataExtractorResponse)
-        metadata = structured_llm.invoke(prompt)
-        
+        structured_llm = get_structured_llm(
+            MetadataExtractorResponse,
+            agent="metadata_extractor_agent",
+            model=decision["model"] if decision else None
+        )
+        start = time.perf_counter()
+        try:
+            with llm_usage_stage("metadata_extractor"), track_llm_usage() as usage:
+                metadata = structured_llm.invoke(prompt)
+        except Exception:
+            if decision:
+                model_router.record(decision, time.perf_counter() - start, failed=True)
+            raise
+        if decision:
+            model_router.record(decision, time.perf_counter() - start)
+
         if not metadata:
             return {
                 "error": "LLM returned empty metadata",
@@ -67,6 +114,15 @@ def extract_metadata(content: str) -> dict:
         if truncated:
             result["warning"] = "Content was truncated due to length"
         
+        if summarization and summarization["summarized"]:
+            result["word_count"] = word_count
+            result["summarization"] = {key: value for key, value in summarization.items() if key != "summary"}
+        
+        result["llm_usage"] = usage.summary()["totals"]
+        
+        if decision:
+            result["model_routing"] = {key: decision[key] for key in ("tier", "model", "score")}
+        
         return result
         
     except Exception as e:
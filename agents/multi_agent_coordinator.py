@@ -1,16 +1,8 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-import os
 from dotenv import load_dotenv
+from tool.llm_registry import get_llm
 
 load_dotenv()
 
-# Initialize LLM with Google Gemini
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0.7,
-    google_api_key=os.getenv("GOOGLE_API_KEY")
-)
-
 def run_multi_agent_system(task: str) -> str:
     """Run optimized multi-agent system with a single comprehensive call"""
     # Input validation
@@ -51,7 +43,7 @@ Format your response as:
 Begin processing now."""
     
     try:
-        response = llm.invoke(prompt)
+        response = get_llm("multi_agent_coordinator").invoke(prompt)
         
         if not response or not hasattr(response, 'content'):
             return "Error: LLM returned empty or invalid response"
@@ -45,12 +45,37 @@ tag_critic_revise_prompt = (
     "You are a tag improvement assistant. Given the failing tags and critiques, propose improved versions "
     "that address relevance, clarity, quality, specificity, coverage, and distinctiveness. "
     "Return JSON array with objects "
-    "[{\"original\":\"...\",\"revised\":\"...\",\"reason\":\"...\"}, ...].\n\n"
+    "[{{\"original\":\"...\",\"revised\":\"...\",\"reason\":\"...\"}}, ...].\n\n"
     "Context:\n{context}\n\n"
     "Failing tags and their current evaluations:\n{failing_tags}\n\n"
     "Only return JSON."
 )
 
+tag_critic_eval_revise_prompt = (
+    "You are a tag quality evaluator and improvement assistant. Given the context and a set of tags, evaluate each tag on "
+    "Relevance, Clarity, Quality, Specificity, Coverage, and Distinctiveness as numbers between 0.000 and 100.000 "
+    "(percentage, 3 digits after decimal point), and provide an overall score (0.000-100.000) as the average. "
+    "Then, for every tag whose overall score is below {threshold}, propose an improved version that addresses "
+    "relevance, clarity, quality, specificity, coverage, and distinctiveness.\n\n"
+    "Output a JSON object with two arrays: \n"
+    "{{\n"
+    "  \"evaluations\": [\n"
+    "    {{\"tag\": \"<tag_name>\", \"relevance\": 0.000, \"clarity\": 0.000, \"quality\": 0.000, "
+    "\"specificity\": 0.000, \"coverage\": 0.000, \"distinctiveness\": 0.000, \"score\": 0.000}}\n"
+    "  ],\n"
+    "  \"revisions\": [\n"
+    "    {{\"original\": \"<failing_tag>\", \"revised\": \"<improved_tag>\", \"reason\": \"...\"}}\n"
+    "  ]\n"
+    "}}\n\n"
+    "Instructions:\n"
+    "- Include **one evaluation per tag provided**, do not add extra tags.\n"
+    "- Only propose revisions for tags scoring below {threshold}.\n"
+    "- All numbers must be in percentage format with exactly 3 digits after the decimal.\n"
+    "- Return **only JSON**, nothing else.\n\n"
+    "Context:\n{context}\n\n"
+    "Tags (comma-separated):\n{tags_str}"
+)
+
 tag_candidate_prompt = (
     "You are a Tag Candidate Generator Agent. Based on the provided metadata and content, generate relevant tags.\n\n"
     "Metadata:\n{metadata}\n\n"
@@ -119,3 +144,60 @@ Generate 5–10 high-quality tags that:
 5. Make sure each tag could realistically appear in a GitHub repository's "Topics" section.
 
 Return ONLY an array of strings. No explanations."""
+
+packed_chunk_tag_prompt = """You are a GitHub repository tag generator. Analyze each of the following README chunks independently and generate tags that match real GitHub repository topic/tag conventions.
+
+Text Chunks:
+{chunks}
+
+For EACH chunk, generate 5–10 high-quality tags that:
+
+1. Align with common GitHub topics (e.g., "javascript", "machine-learning", "react", "api", "docker").
+2. Follow GitHub standards:
+   - lowercase only
+   - no spaces (use hyphens if needed)
+   - avoid punctuation/special characters
+   - avoid duplicates
+3. Cover:
+   - technologies, frameworks, or languages mentioned
+   - domain or use case (e.g., "web-app", "data-analysis")
+   - key features, capabilities, or patterns (e.g., "authentication", "rest-api")
+4. Prefer widely-used tags over overly-specific or custom ones.
+5. Make sure each tag could realistically appear in a GitHub repository's "Topics" section.
+
+Return one entry per chunk with its chunk_id and its tags. No explanations."""
+
+packed_repo_tag_prompt = """You are a GitHub repository tag generator. Analyze each of the following repository READMEs independently and generate tags that match real GitHub repository topic/tag conventions.
+
+Repositories:
+{sections}
+
+For EACH repository, generate 5–10 high-quality tags that:
+
+1. Align with common GitHub topics (e.g., "javascript", "machine-learning", "react", "api", "docker").
+2. Follow GitHub standards:
+   - lowercase only
+   - no spaces (use hyphens if needed)
+   - avoid punctuation/special characters
+   - avoid duplicates
+3. Cover:
+   - technologies, frameworks, or languages mentioned
+   - domain or use case (e.g., "web-app", "data-analysis")
+   - key features, capabilities, or patterns (e.g., "authentication", "rest-api")
+4. Prefer widely-used tags over overly-specific or custom ones.
+5. Make sure each tag could realistically appear in a GitHub repository's "Topics" section.
+
+Base each repository's tags only on its own README. Return one entry per repository with its section_id and its tags. No explanations."""
+
+packed_repo_eval_prompt = (
+    "You are a tag quality evaluator. Each section below is a different repository with its own context "
+    "and set of tags. Judge every section independently, using only that section's context. For each tag, "
+    "evaluate Relevance, Clarity, Quality, Specificity, Coverage, and Distinctiveness as numbers between "
+    "0.000 and 100.000 (percentage, 3 digits after decimal point), and provide an overall score "
+    "(0.000-100.000) as the average.\n\n"
+    "Instructions:\n"
+    "- Return one entry per section with its section_id and exactly one evaluation per tag of that section.\n"
+    "- Do not add extra tags or move tags between sections.\n"
+    "- All numbers must be in percentage format with exactly 3 digits after the decimal.\n\n"
+    "{sections}"
+)
@@ -1,30 +1,252 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
+import json
 import os
+import time
 from dotenv import load_dotenv
 from pydantic import BaseModel
-from typing import List
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from langchain_core.runnables import RunnableLambda
 from tool.readme_chunking import chunk_text
-from .prompts import chunk_tag_prompt
+from tool.llm_registry import get_structured_llm
+from tool.llm_hedging import LLM_HEDGING, hedged
+from tool.batch_packing import BatchPacker, get_batch_packer
+from tool.model_router import MODEL_ROUTING, model_router
+from tool.prompt_packing import AdaptivePackSizer, estimate_tokens
+from .prompts import chunk_tag_prompt, packed_chunk_tag_prompt, packed_repo_tag_prompt
 
 load_dotenv()
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash",
-    temperature=0.7,
-    google_api_key=os.getenv("GOOGLE_API_KEY")
+CANDIDATE_MAX_CONCURRENCY = int(os.getenv("CANDIDATE_MAX_CONCURRENCY", "5"))  # Parallel Gemini calls per README
+CANDIDATE_PACKING = os.getenv("CANDIDATE_PACKING", "false").lower() in ("1", "true", "yes")
+CANDIDATE_PACK_TOKEN_BUDGET = int(os.getenv("CANDIDATE_PACK_TOKEN_BUDGET", "6000"))  # Input tokens per packed request
+CANDIDATE_PACK_TARGET_LATENCY = float(os.getenv("CANDIDATE_PACK_TARGET_LATENCY", "8.0"))  # Seconds per packed request
+
+# Shared across requests so the learned pack size carries over
+pack_sizer = AdaptivePackSizer(
+    token_budget=CANDIDATE_PACK_TOKEN_BUDGET,
+    target_latency=CANDIDATE_PACK_TARGET_LATENCY
 )
 
 # Pydantic model for structured output
 class ChunkTags(BaseModel):
     tags: List[str]
 
+class PackedChunkEntry(BaseModel):
+    chunk_id: int
+    tags: List[str]
+
+class PackedChunkTags(BaseModel):
+    chunks: List[PackedChunkEntry]
+
+class RepoTagSection(BaseModel):
+    section_id: int
+    tags: List[str]
+
+class PackedRepoTags(BaseModel):
+    sections: List[RepoTagSection]
+
+
+def _routed_invoke(schema, prompt: str, route_text: str, hedging: bool = False):
+    """Invoke the model the router picks for ``route_text`` and record the call's latency"""
+    decision = model_router.route(route_text, agent="tag_candidate_agent")
+    structured_llm = get_structured_llm(schema, agent="tag_candidate_agent", model=decision["model"])
+    if hedging:
+        # Each model has its own latency profile, so each gets its own hedging policy
+        structured_llm = hedged(structured_llm, f"tag_candidate_agent/{schema.__name__}/{decision['model']}")
+    start = time.perf_counter()
+    try:
+        response = structured_llm.invoke(prompt)
+    except Exception:
+        model_router.record(decision, time.perf_counter() - start, failed=True)
+        raise
+    model_router.record(decision, time.perf_counter() - start)
+    return response
+
+
+def _emit_tags(on_tags: Optional[Callable[[List[str]], None]], tags: List[str]) -> None:
+    """Hand freshly generated tags to a consumer; a failing consumer never fails generation"""
+    if not on_tags or not tags:
+        return
+    try:
+        on_tags([tag.lower().strip() for tag in tags if isinstance(tag, str) and tag.strip()])
+    except Exception as e:
+        print(f"[tag_candidate_agent] Warning: on_tags callback failed: {str(e)}")
+
+
+def pack_repo_candidates(items: List[Tuple[str, str]]) -> Dict[int, ChunkTags]:
+    """
+    Tag README chunks of several repositories in one structured request.
+
+    Args:
+        items: (repository, chunk) pairs, one section each
+
+    Returns:
+        {index into items: ChunkTags} for every section answered with tags
+    """
+    sections = "\n\n".join(
+        f"[section_id: {i + 1}] [repository: {repo}]\n{chunk}" for i, (repo, chunk) in enumerate(items)
+    )
+    response = get_structured_llm(PackedRepoTags, agent="tag_candidate_agent").invoke(
+        packed_repo_tag_prompt.format(sections=sections)
+    )
+    results: Dict[int, ChunkTags] = {}
+    for section in (response.sections if response else []):
+        i = section.section_id - 1
+        if 0 <= i < len(items) and section.tags and i not in results:
+            results[i] = ChunkTags(tags=section.tags)
+    return results
+
+
+def _tag_chunks_individually(
+    chunks: List[str],
+    max_concurrency: int,
+    routing: bool = False,
+    on_tags: Optional[Callable[[List[str]], None]] = None,
+    hedging: bool = False,
+    batch: Optional[Tuple[BatchPacker, str]] = None
+) -> List[Union[ChunkTags, Exception, None]]:
+    """
+    One structured LLM call per chunk, run concurrently; results in chunk order.
+    
+    In a batch run (``batch`` is the packer and this repository's label) each chunk is
+    first offered to the packer, which shares one request among several repositories'
+    chunks; chunks it hands back are tagged with their own call.
+    """
+    prompts = [chunk_tag_prompt.format(chunk=chunk) for chunk in chunks]
+    if routing:
+        runnable = RunnableLambda(lambda i: _routed_invoke(ChunkTags, prompts[i], chunks[i], hedging))
+        inputs = list(range(len(chunks)))
+    else:
+        runnable = get_structured_llm(ChunkTags, agent="tag_candidate_agent")
+        if hedging:
+            runnable = hedged(runnable, "tag_candidate_agent/ChunkTags")
+        inputs = prompts
+    
+    if batch:
+        packer, repo = batch
+        single, single_inputs = runnable, inputs
+        runnable = RunnableLambda(
+            lambda i: packer.submit(repo, chunks[i], estimate_tokens(chunks[i])) or single.invoke(single_inputs[i])
+        )
+        inputs = list(range(len(chunks)))
+    
+    results: List[Union[ChunkTags, Exception, None]] = [None] * len(chunks)
+    # A failing chunk yields its exception instead of cancelling the others; each
+    # chunk's tags are emitted as soon as it completes
+    for i, response in runnable.batch_as_completed(
+        inputs,
+        config={"max_concurrency": max_concurrency},
+        return_exceptions=True
+    ):
+        results[i] = response
+        if not isinstance(response, Exception) and response is not None:
+            _emit_tags(on_tags, getattr(response, 'tags', []))
+    return results
+
+
+def _format_packed_chunks(chunks: List[str], pack: List[int]) -> str:
+    return "\n\n".join(f"[chunk_id: {i + 1}]\n{chunks[i]}" for i in pack)
+
+
+def _tag_chunks_packed(
+    chunks: List[str],
+    max_concurrency: int,
+    routing: bool = False,
+    on_tags: Optional[Callable[[List[str]], None]] = None,
+    hedging: bool = False
+) -> List[Union[ChunkTags, Exception, None]]:
+    """
+    Several chunks per structured LLM call, each answered under its own chunk_id.
+    
+    Pack sizes come from the shared AdaptivePackSizer (token budget and observed
+    latency). Chunks a pack fails to answer for are retried with one call per chunk.
+    With routing, a pack goes to the model its hardest chunk is routed to.
+    """
+    structured_llm = get_structured_llm(PackedChunkTags, agent="tag_candidate_agent")
+    if hedging:
+        structured_llm = hedged(structured_llm, "tag_candidate_agent/PackedChunkTags")
+    overhead_tokens = estimate_tokens(packed_chunk_tag_prompt.format(chunks=""))
+    packs = pack_sizer.pack(chunks, overhead_tokens=overhead_tokens)
+    
+    def invoke_pack(pack: List[int]) -> PackedChunkTags:
+        prompt = packed_chunk_tag_prompt.format(chunks=_format_packed_chunks(chunks, pack))
+        start = time.perf_counter()
+        try:
+            if routing:
+                hardest = max(pack, key=lambda i: model_router.route(chunks[i])["score"])
+                response = _routed_invoke(PackedChunkTags, prompt, chunks[hardest], hedging)
+            else:
+                response = structured_llm.invoke(prompt)
+        except Exception:
+            pack_sizer.observe(len(pack), time.perf_counter() - start, failed=True)
+            raise
+        pack_sizer.observe(len(pack), time.perf_counter() - start)
+        if response:
+            _emit_tags(on_tags, [tag for entry in response.chunks for tag in entry.tags])
+        return response
+    
+    responses = RunnableLambda(invoke_pack).batch(
+        packs,
+        config={"max_concurrency": max_concurrency},
+        return_exceptions=True
+    )
+    
+    results: List[Union[ChunkTags, Exception, None]] = [None] * len(chunks)
+    for pack, response in zip(packs, responses):
+        if isinstance(response, Exception):
+            print(f"[tag_candidate_agent] Packed request for chunks {[i + 1 for i in pack]} failed: {str(response)}")
+            continue
+        for entry in (response.chunks if response else []):
+            i = entry.chunk_id - 1
+            if i in pack and results[i] is None:
+                results[i] = ChunkTags(tags=entry.tags)
+    
+    # Fall back to per-chunk calls for anything the packed responses did not cover
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        print(f"[tag_candidate_agent] Retrying {len(missing)} unanswered chunk(s) individually")
+        retried = _tag_chunks_individually(
+            [chunks[i] for i in missing], max_concurrency, routing, on_tags, hedging
+        )
+        for i, result in zip(missing, retried):
+            results[i] = result
+    
+    print(f"[tag_candidate_agent] Packed {len(chunks)} chunks into {len(packs)} request(s), "
+          f"next pack size {pack_sizer.pack_size}")
+    return results
+
 
-def generate_tag_candidates(readme_content: str) -> List[str]:
+def generate_tag_candidates(
+    readme_content: str,
+    max_concurrency: Optional[int] = None,
+    packing: Optional[bool] = None,
+    routing: Optional[bool] = None,
+    on_tags: Optional[Callable[[List[str]], None]] = None,
+    hedging: Optional[bool] = None
+) -> List[str]:
     """
     Tag Candidate Agent - Generates potential tags by chunking README and analyzing each chunk.
     
+    Chunks are sent to the LLM concurrently through the runnable's ``batch`` API, so
+    candidate latency tracks the slowest chunk rather than the sum of all of them.
+    Tags are collected in chunk order, so the output does not depend on completion order.
+    
+    In packed mode several chunks share one request (and one copy of the instructions)
+    and the structured output returns a tag list per chunk ID, cutting the number of
+    requests and repeated prompt tokens for long READMEs. In a batch run (see
+    run_batch_analysis_workflow) the chunks of a short README are instead packed with
+    other repositories' chunks, one section per chunk.
+    
     Args:
         readme_content: Full README text content
+        max_concurrency: Maximum number of LLM requests in flight, 1 for sequential calls
+                         (default: CANDIDATE_MAX_CONCURRENCY setting, 5)
+        packing: Pack several chunks per request (default: CANDIDATE_PACKING setting, off)
+        routing: Send each chunk to the fast or strong model by its difficulty
+                 (default: MODEL_ROUTING setting, off)
+        on_tags: Called with each chunk's (or pack's) tags as soon as they arrive, so a
+                 downstream stage can start on them before every chunk is done
+        hedging: Duplicate calls still pending past their usual (p95) latency and use the
+                 first valid response, within a budget (default: LLM_HEDGING setting, off)
         
     Returns:
         List of unique tag strings
@@ -38,6 +260,11 @@ def generate_tag_candidates(readme_content: str) -> List[str]:
         print("[tag_candidate_agent] Error: README content is empty")
         return []
     
+    max_concurrency = max(1, max_concurrency or CANDIDATE_MAX_CONCURRENCY)
+    packing = CANDIDATE_PACKING if packing is None else packing
+    routing = MODEL_ROUTING if routing is None else routing
+    hedging = LLM_HEDGING if hedging is None else hedging
+    
     try:
         # Step 1: Chunk the README content
         try:
@@ -50,51 +277,57 @@ def generate_tag_candidates(readme_content: str) -> List[str]:
             print("[tag_candidate_agent] Error: No chunks generated from README")
             return []
         
-        # Create structured LLM (moved here to avoid re-creation in loop)
-        structured_llm = llm.with_structured_output(TagCandidateResponse)
-        
         all_tags = []
         failed_chunks = 0
         
-        # Step 2: Analyze each chunk with LLM
-        for i, chunk in enumerate(chunks):
-            try:
-                # Using the correct prompt variable as per the original code's import
-                prompt = chunk_tag_prompt.format(chunk=chunk) 
-                
-                response = structured_llm.invoke(prompt)
-                
-                # Validate response
-                if not response:
-                    print(f"[tag_candidate_agent] Warning: Empty response for chunk {i+1}")
-                    failed_chunks += 1
-                    continue
-                
-                # Extract tags from response
-                chunk_tags = response.tags if hasattr(response, 'tags') else []
-                
-                # Validate tags are strings
-                valid_chunk_tags = [
-                    tag for tag in chunk_tags 
-                    if isinstance(tag, str) and tag.strip()
-                ]
-                
-                all_tags.extend(valid_chunk_tags)
-                
-            except json.JSONDecodeError as e:
-                print(f"[tag_candidate_agent] JSON parse error for chunk {i+1}: {str(e)}")
+        # In a batch run, chunks of short READMEs share requests with other repositories
+        batch = get_batch_packer("candidate")
+        if batch and not batch[0].accepts(estimate_tokens(readme_content)):
+            batch = None
+        
+        # Step 2: Analyze all chunks concurrently; results come back in chunk order
+        if batch:
+            responses = _tag_chunks_individually(chunks, max_concurrency, routing, on_tags, hedging, batch)
+        elif packing and len(chunks) > 1:
+            responses = _tag_chunks_packed(chunks, max_concurrency, routing, on_tags, hedging)
+        else:
+            responses = _tag_chunks_individually(chunks, max_concurrency, routing, on_tags, hedging)
+        
+        for i, response in enumerate(responses):
+            if isinstance(response, json.JSONDecodeError):
+                print(f"[tag_candidate_agent] JSON parse error for chunk {i+1}: {str(response)}")
+                failed_chunks += 1
+                continue
+            if isinstance(response, Exception):
+                print(f"[tag_candidate_agent] Error processing chunk {i+1}: {str(response)}")
                 failed_chunks += 1
                 continue
-            except Exception as e:
-                print(f"[tag_candidate_agent] Error processing chunk {i+1}: {str(e)}")
+            
+            # Validate response
+            if not response:
+                print(f"[tag_candidate_agent] Warning: Empty response for chunk {i+1}")
                 failed_chunks += 1
                 continue
+            
+            # Extract tags from response
+            chunk_tags = response.tags if hasattr(response, 'tags') else []
+            
+            # Validate tags are strings
+            valid_chunk_tags = [
+                tag for tag in chunk_tags 
+                if isinstance(tag, str) and tag.strip()
+            ]
+            
+            all_tags.extend(valid_chunk_tags)
         
         # Log if many chunks failed
         if failed_chunks > len(chunks) / 2:
             print(f"[tag_candidate_agent] Warning: {failed_chunks}/{len(chunks)} chunks failed to process")
         
         # Step 3: Deduplicate tags (case-insensitive)
+        seen_tags_lower = set()
+        unique_tags = []
+        for tag in all_tags:
             if isinstance(tag, str):
                 tag_lower = tag.lower().strip()
                 if tag_lower and tag_lower not in seen_tags_lower:
@@ -104,5 +337,6 @@ def generate_tag_candidates(readme_content: str) -> List[str]:
         return unique_tags
         
     except Exception as e:
+        print(f"[tag_candidate_agent] Error generating tag candidates: {str(e)}")
         # Return empty list on error
         return []
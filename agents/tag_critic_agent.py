@@ -1,23 +1,92 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 import os
 from dotenv import load_dotenv
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pydantic import BaseModel, Field
 import json
 import re
-from .prompts import tag_critic_eval_prompt, tag_critic_revise_prompt
-from tool.tag_critic_rubric import TagCriticResponse, TagEvaluation, RevisionModel, IterationLog, evaluate_tags_rubric
+import time
+from .prompts import tag_critic_eval_prompt, tag_critic_revise_prompt, tag_critic_eval_revise_prompt, packed_repo_eval_prompt
+from tool.llm_registry import get_llm, get_structured_llm
+from tool.batch_packing import get_batch_packer
+from tool.prompt_packing import estimate_tokens
+from tool.tag_critic_models import PackedRepoEvaluations, TagEvaluationList
+from tool.critic_context import get_context_digest, ShardContextBuilder, CRITIC_CONTEXT_TOKEN_BUDGET
+from tool.llm_hedging import LLM_HEDGING
+from tool.model_router import MODEL_ROUTING, model_router
+from tool.tag_critic_rubric import TagCriticResponse, TagEvaluation, RevisionModel, IterationLog, evaluate_tags_rubric, MIN_SCORE_DELTA
 
 load_dotenv()
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0.4,
-    google_api_key=os.getenv("GOOGLE_API_KEY")
-)
+CRITIC_COMBINED_MODE = os.getenv("CRITIC_COMBINED_MODE", "false").lower() in ("1", "true", "yes")
+CRITIC_SHARD_SIZE = int(os.getenv("CRITIC_SHARD_SIZE", "15"))  # Tags per evaluation prompt
+CRITIC_MAX_CONCURRENCY = int(os.getenv("CRITIC_MAX_CONCURRENCY", "4"))  # Shards evaluated at once
 
-def critique_tags(tags: list, context: str = "", threshold: float = 0.7, max_iterations: int = 3) -> dict:
-    """Tag Critic Agent - Evaluates tag quality and attempts improvement"""
+def pack_repo_evaluations(items: List[Tuple[str, Tuple[str, List[str]]]]) -> Dict[int, TagEvaluationList]:
+    """
+    Evaluate the tag sets of several repositories in one structured request.
+
+    Args:
+        items: (repository, (context, tags)) pairs, one section each
+
+    Returns:
+        {index into items: TagEvaluationList} for every section answered with evaluations
+    """
+    sections = "\n\n".join(
+        f"[section_id: {i + 1}] [repository: {repo}]\nContext:\n{context}\n\nTags:\n"
+        + "\n".join(f"- {tag}" for tag in tags)
+        for i, (repo, (context, tags)) in enumerate(items)
+    )
+    response = get_structured_llm(PackedRepoEvaluations, agent="tag_critic_agent").invoke(
+        packed_repo_eval_prompt.format(sections=sections)
+    )
+    results: Dict[int, TagEvaluationList] = {}
+    for section in (response.sections if response else []):
+        i = section.section_id - 1
+        if 0 <= i < len(items) and section.evaluations and i not in results:
+            results[i] = TagEvaluationList(evaluations=section.evaluations)
+    return results
+
+def critique_tags(
+    tags: list,
+    context: str = "",
+    threshold: float = 0.7,
+    max_iterations: int = 3,
+    min_score_delta: Optional[float] = MIN_SCORE_DELTA,
+    context_token_budget: Optional[int] = CRITIC_CONTEXT_TOKEN_BUDGET,
+    combined: Optional[bool] = None,
+    shard_size: Optional[int] = None,
+    supporting_chunks: Optional[Dict[str, List[int]]] = None,
+    hedging: Optional[bool] = None,
+    routing: Optional[bool] = None
+) -> dict:
+    """
+    Tag Critic Agent - Evaluates tag quality and attempts improvement
+    
+    The context is condensed once per run into a digest of about
+    ``context_token_budget`` tokens (heading outline plus the chunks most relevant
+    to the tags) that every evaluate and revise prompt reuses. Pass None to send
+    the full context instead.
+    
+    With ``combined`` (default: CRITIC_COMBINED_MODE setting) each iteration makes a
+    single structured call that returns scores and revisions together.
+    
+    Tags are evaluated in concurrent shards of ``shard_size`` tags (default:
+    CRITIC_SHARD_SIZE setting, 15), so large tag sets are not squeezed into one prompt.
+    
+    When ``supporting_chunks`` (tag -> README chunk indices from the similarity stage)
+    is given, each shard's prompt carries only the union of its tags' supporting chunks
+    instead of the shared digest.
+    
+    With ``hedging`` (default: LLM_HEDGING setting) evaluate and revise calls that run
+    past their usual latency are duplicated and the first valid response wins.
+    
+    With ``routing`` (default: MODEL_ROUTING setting) the critique runs on the fast or
+    the strong model by the difficulty of the context and tags it is given, and the
+    decision is returned under "model_routing".
+    
+    In a batch run (see run_batch_analysis_workflow) evaluation prompts of repositories
+    with small contexts are packed together with other repositories' (separate calls only).
+    """
     # Input validation
     if not tags or not isinstance(tags, list):
         return {
@@ -48,16 +117,52 @@ def critique_tags(tags: list, context: str = "", threshold: float = 0.7, max_ite
         print(f"[tag_critic_agent] Warning: Invalid max_iterations {max_iterations}, using default 3")
         max_iterations = 3
     
+    context_digest = None
+    context_provider = None
+    if context and supporting_chunks:
+        context_provider = ShardContextBuilder(
+            context,
+            supporting_chunks,
+            token_budget=context_token_budget or CRITIC_CONTEXT_TOKEN_BUDGET
+        )
+    elif context and context_token_budget:
+        context_digest = get_context_digest(context, valid_tags, token_budget=context_token_budget)
+        context = context_digest["digest"]
+    
+    eval_packer = None
+    batch = get_batch_packer("critic")
+    if batch:
+        packer, repo = batch
+        
+        def eval_packer(shard_context: str, shard_tags: List[str]):
+            tokens = estimate_tokens(shard_context) + estimate_tokens("\n".join(shard_tags))
+            return packer.submit(repo, (shard_context, shard_tags), tokens)
+    
+    routing = MODEL_ROUTING if routing is None else routing
+    decision = model_router.route(context + "\n" + "\n".join(valid_tags), agent="tag_critic_agent") if routing else None
+    
+    start = time.perf_counter()
     try:
         model_result = evaluate_tags_rubric(
             valid_tags,
             context=context,
             threshold=threshold,
             max_iterations=max_iterations,
-            llm=llm,
+            llm=get_llm("tag_critic_agent", model=decision["model"] if decision else None),
             tag_critic_eval_prompt=tag_critic_eval_prompt,
-            tag_critic_revise_prompt=tag_critic_revise_prompt
+            tag_critic_revise_prompt=tag_critic_revise_prompt,
+            min_score_delta=min_score_delta,
+            combined=CRITIC_COMBINED_MODE if combined is None else combined,
+            tag_critic_eval_revise_prompt=tag_critic_eval_revise_prompt,
+            shard_size=shard_size or CRITIC_SHARD_SIZE,
+            max_concurrency=CRITIC_MAX_CONCURRENCY,
+            context_provider=context_provider,
+            hedging=LLM_HEDGING if hedging is None else hedging,
+            eval_packer=eval_packer
         )
+        if decision:
+            # One routed unit: every evaluate and revise call of the critique
+            model_router.record(decision, time.perf_counter() - start)
         
         if not model_result:
             return {
@@ -68,9 +173,18 @@ def critique_tags(tags: list, context: str = "", threshold: float = 0.7, max_ite
             }
         
         print("model result...", model_result)
-        return model_result.dict()
+        result = model_result.dict()
+        if context_provider:
+            result["context_digest"] = context_provider.stats()
+        elif context_digest:
+            result["context_digest"] = {"mode": "digest", **{k: v for k, v in context_digest.items() if k != "digest"}}
+        if decision:
+            result["model_routing"] = {key: decision[key] for key in ("tier", "model", "score")}
+        return result
         
     except Exception as e:
+        if decision:
+            model_router.record(decision, time.perf_counter() - start, failed=True)
         return {
             "original_tags": valid_tags,
             "final_tags": valid_tags,  # Return original tags on error
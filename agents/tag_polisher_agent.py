@@ -1,18 +1,20 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-import os
+import time
+from typing import Optional
 from dotenv import load_dotenv
+from tool.llm_registry import get_llm
+from tool.model_router import MODEL_ROUTING, model_router
 import json
 
 load_dotenv()
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0.2,
-    google_api_key=os.getenv("GOOGLE_API_KEY")
-)
-
-def polish_tags(tags: list, critique: str = "") -> dict:
-    """Tag Polisher Agent - Refines tags"""
+def polish_tags(tags: list, critique: str = "", routing: Optional[bool] = None) -> dict:
+    """
+    Tag Polisher Agent - Refines tags
+    
+    With routing (default: MODEL_ROUTING setting) the call goes to the fast or the strong
+    model by the difficulty of the tags and critique, and the decision is returned under
+    "model_routing".
+    """
     # Input validation
     if not tags or not isinstance(tags, list):
         return {
@@ -38,8 +40,20 @@ Critique: {critique}
 
 Return JSON: {{"polished_tags": ["tag1", "tag2"]}}"""
     
+    routing = MODEL_ROUTING if routing is None else routing
+    decision = model_router.route(tags_str + "\n" + (critique or ""), agent="tag_polisher_agent") if routing else None
+    
     try:
-        response = llm.invoke(prompt)
+        llm = get_llm("tag_polisher_agent", model=decision["model"] if decision else None)
+        start = time.perf_counter()
+        try:
+            response = llm.invoke(prompt)
+        except Exception:
+            if decision:
+                model_router.record(decision, time.perf_counter() - start, failed=True)
+            raise
+        if decision:
+            model_router.record(decision, time.perf_counter() - start)
         
         if not response or not hasattr(response, 'content'):
             return {
@@ -75,6 +89,8 @@ Return JSON: {{"polished_tags": ["tag1", "tag2"]}}"""
             
             result["polished_tags"] = polished if polished else valid_tags
             result["agent"] = "tag_polisher_agent"
+            if decision:
+                result["model_routing"] = {key: decision[key] for key in ("tier", "model", "score")}
             return result
             
         except json.JSONDecodeError as e:
@@ -0,0 +1,99 @@
+import os
+from typing import List, Dict, Any, Union, Optional
+from dotenv import load_dotenv
+from tool.embedding_backends import EmbeddingBackend, get_embedding_backend, backend_label
+from tool.mmr import mmr_select
+
+load_dotenv()
+
+CRITIC_TOP_N = int(os.getenv("CRITIC_TOP_N", "20"))  # Tags forwarded to the LLM critic
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))  # 1.0 = pure relevance, 0.0 = pure diversity
+
+
+def prune_tags_mmr(
+    tag_similarities: List[Dict[str, Any]],
+    top_n: Optional[int] = None,
+    lambda_mult: float = MMR_LAMBDA,
+    embedding_backend: Union[str, EmbeddingBackend, None] = None
+) -> Dict[str, Any]:
+    """
+    Tag Pruning Agent - Selects a diverse, relevant top-N of scored tags before the critic.
+
+    Uses Maximal Marginal Relevance over tag embeddings, with the similarity stage's
+    score as relevance, so near-synonyms do not crowd out other topics. Tags accepted
+    lexically (no similarity_score) count as relevant as the best-scoring tag.
+    Nothing is embedded when the tag list already fits the budget.
+
+    Args:
+        tag_similarities: "tag_similarities" entries from tag_similarity_agent
+        top_n: Maximum number of tags to keep (default: CRITIC_TOP_N setting, 20)
+        lambda_mult: MMR relevance/diversity trade-off (default: 0.7)
+        embedding_backend: "auto", "ollama", "local" or an EmbeddingBackend instance
+                           (default: EMBEDDING_BACKEND setting)
+
+    Returns:
+        Dictionary containing the selected and pruned tags
+    """
+    # Input validation
+    if not isinstance(tag_similarities, list):
+        return {
+            "success": False,
+            "error": "Invalid tag_similarities: must be a list",
+            "agent": "tag_pruning_agent"
+        }
+
+    top_n = top_n or CRITIC_TOP_N
+    if top_n < 1:
+        return {
+            "success": False,
+            "error": f"top_n must be at least 1, got {top_n}",
+            "agent": "tag_pruning_agent"
+        }
+
+    entries = [t for t in tag_similarities if isinstance(t, dict) and isinstance(t.get("tag"), str) and t["tag"].strip()]
+    tags = [t["tag"] for t in entries]
+
+    if len(tags) <= top_n:
+        return {
+            "success": True,
+            "agent": "tag_pruning_agent",
+            "method": "passthrough",
+            "top_n": top_n,
+            "total_tags_input": len(tags),
+            "selected_tags": tags,
+            "pruned_tags": [],
+            "embedding_backend": None
+        }
+
+    scores = [t.get("similarity_score") for t in entries]
+    numeric_scores = [s for s in scores if isinstance(s, (int, float))]
+    best_score = max(numeric_scores) if numeric_scores else 1.0
+    relevance = [float(s) if isinstance(s, (int, float)) else best_score for s in scores]
+
+    try:
+        backend = get_embedding_backend(embedding_backend)
+        vectors = backend.embed(tags)
+        if len(vectors) != len(tags):
+            raise Exception("Embedding count mismatch for tags")
+        selected = mmr_select(relevance, vectors, top_n, lambda_mult=lambda_mult)
+        method = "mmr"
+        embedding_backend_used = backend_label(backend)
+    except Exception as e:
+        # Pruning must never block the critic: fall back to the top-N by relevance
+        print(f"[tag_pruning_agent] Warning: MMR failed, keeping top {top_n} by score: {str(e)}")
+        selected = sorted(range(len(tags)), key=lambda i: relevance[i], reverse=True)[:top_n]
+        method = "top_n"
+        embedding_backend_used = None
+
+    selected_set = set(selected)
+    return {
+        "success": True,
+        "agent": "tag_pruning_agent",
+        "method": method,
+        "top_n": top_n,
+        "lambda_mult": lambda_mult,
+        "total_tags_input": len(tags),
+        "selected_tags": [tags[i] for i in selected],
+        "pruned_tags": [tag for i, tag in enumerate(tags) if i not in selected_set],
+        "embedding_backend": embedding_backend_used
+    }
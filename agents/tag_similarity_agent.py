@@ -1,21 +1,47 @@
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union, Optional
 from tool.readme_chunking import chunk_text
-from tool.ollama_embeddings import get_ollama_embeddings
-from tool.similarity_calculator import calculate_tag_chunk_similarity
+from tool.embedding_backends import EmbeddingBackend, get_embedding_backend, backend_label
+from tool.similarity_calculator import calculate_tag_chunk_similarity, top_supporting_chunks
 from tool.semantic_deduplication import deduplicate_tags_semantically
+from tool.lexical_scorer import is_lexically_specific, lexical_tag_scores
 
+LEXICAL_ACCEPT_THRESHOLD = 0.5  # Normalized BM25 score at which a literal tag skips embeddings
+SUPPORTING_CHUNKS_TOP_K = 3  # Best-matching README chunks reported per tag for downstream context
 
-def calculate_tag_similarity(readme_content: str, candidate_tags: List[str]) -> Dict[str, Any]:
+
+def calculate_tag_similarity(
+    readme_content: str,
+    candidate_tags: List[str],
+    embedding_backend: Union[str, EmbeddingBackend, None] = None,
+    lexical_accept_threshold: Optional[float] = LEXICAL_ACCEPT_THRESHOLD,
+    lexical_reject_threshold: Optional[float] = None
+) -> Dict[str, Any]:
     """
-    Tag Similarity Agent - Calculates cosine similarity between README chunks and tags using Ollama embeddings.
+    Tag Similarity Agent - Calculates cosine similarity between README chunks and tags using embeddings.
     
     Uses a chunking strategy to better capture semantic meaning across long README files.
     Each tag is compared against all README chunks and the maximum similarity is used.
     
+    A vectorized BM25 pass runs first: specific tags (see is_lexically_specific) whose
+    terms all appear in one chunk with a normalized score of at least
+    ``lexical_accept_threshold`` are accepted as high relevance without being scored
+    against the README chunks. They still join the semantic deduplication, so "golang"
+    accepted lexically and "go" scored by embedding cannot both survive. Tags scoring
+    below ``lexical_reject_threshold`` are dropped without being embedded (disabled by
+    default, since abstract tags such as "machine-learning" often never appear literally).
+    
+    Each tag_similarities entry lists ``supporting_chunks``: indices of the README chunks
+    (as produced by chunk_text(readme_content, 1000, 200)) that match the tag best, so
+    later stages can scope their context without re-embedding anything.
+    
     Args:
         readme_content: Plain text content from README
         candidate_tags: List of candidate tags from tag_candidate_agent
+        embedding_backend: "auto" (Ollama with local fallback), "ollama", "local" or an
+                           EmbeddingBackend instance (default: EMBEDDING_BACKEND setting)
+        lexical_accept_threshold: Normalized BM25 score for lexical acceptance, None to disable (default: 0.5)
+        lexical_reject_threshold: Normalized BM25 score below which tags are rejected, None to disable (default: None)
     
     Returns:
         Dictionary containing similarity scores and analysis
@@ -70,120 +96,178 @@ def calculate_tag_similarity(readme_content: str, candidate_tags: List[str]) ->
                 "agent": "tag_similarity_agent"
             }
         
-        # Step 2: Embed README chunks using Ollama
-        try:
-            readme_embeddings = get_ollama_embeddings(readme_chunks)
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"Failed to generate README embeddings: {str(e)}",
-                "agent": "tag_similarity_agent"
-            }
+        # Step 2: Lexical (BM25) pass - settle tags that literally appear in the README
+        # without paying for an embedding call
+        lexical = lexical_tag_scores(readme_chunks, valid_tags)
+        lexical_by_tag = {tag: result for tag, result in zip(valid_tags, lexical)}
         
-        if not readme_embeddings or len(readme_embeddings) != len(readme_chunks):
-            return {
-                "success": False,
-                "error": "Embedding count mismatch for README chunks",
-                "agent": "tag_similarity_agent"
-            }
+        accepted_tags = []
+        rejected_tags = []
+        pending_tags = []
+        seen_lexical = set()
+        lexical_duplicates = 0
+        for tag, result in zip(valid_tags, lexical):
+            if lexical_accept_threshold is not None and result["coverage"] == 1.0 \
+                    and result["lexical_score"] >= lexical_accept_threshold and is_lexically_specific(tag):
+                if tag.strip().lower() in seen_lexical:
+                    lexical_duplicates += 1
+                    continue
+                seen_lexical.add(tag.strip().lower())
+                accepted_tags.append(tag)
+            elif lexical_reject_threshold is not None and result["lexical_score"] < lexical_reject_threshold:
+                rejected_tags.append(tag)
+            else:
+                pending_tags.append(tag)
         
-        # Step 3: Embed candidate tags using Ollama
+        lexical_accepted = list(accepted_tags)
+        
+        # Step 3: Embed README chunks and the undecided tags in a single backend call so
+        # both always come from the same embedding space, even after a fallback
         try:
-            tag_embeddings = get_ollama_embeddings(valid_tags)
-        except Exception as e:
+            backend = get_embedding_backend(embedding_backend)
+        except ValueError as e:
             return {
                 "success": False,
-                "error": f"Failed to generate tag embeddings: {str(e)}",
+                "error": str(e),
                 "agent": "tag_similarity_agent"
             }
         
-        if not tag_embeddings or len(tag_embeddings) != len(valid_tags):
-            return {
-                "success": False,
-                "error": "Embedding count mismatch for tags",
-                "agent": "tag_similarity_agent"
-            }
+        ranked_tags = []
+        supporting_chunks = {}
+        deduplicated_tags = []
+        embedding_backend_used = None
+        method = "lexical_bm25"
         
-        # Step 4: Prepare data structures for similarity calculation
-        tag_data = [
-            {"tag": tag, "vector": vector}
-            for tag, vector in zip(valid_tags, tag_embeddings)
-        ]
+        # Accepted tags are embedded only for deduplication, which needs at least two tags
+        dedup_accepted = accepted_tags if len(accepted_tags) + len(pending_tags) > 1 else []
+        accepted_data = []
         
-        # Step 4.5: Semantic deduplication - Remove semantically identical tags
-        try:
-            deduplicated_tags = deduplicate_tags_semantically(tag_data, similarity_threshold=0.8)
-        except Exception as e:
-            print(f"[tag_similarity_agent] Warning: Deduplication failed, using all tags: {str(e)}")
-            deduplicated_tags = valid_tags
+        if not pending_tags and dedup_accepted:
+            # Nothing to score: a failed embedding only costs the deduplication
+            try:
+                accepted_data = [
+                    {"tag": tag, "vector": vector}
+                    for tag, vector in zip(dedup_accepted, backend.embed(dedup_accepted))
+                ]
+                embedding_backend_used = backend_label(backend)
+            except Exception as e:
+                print(f"[tag_similarity_agent] Warning: Could not embed accepted tags for deduplication: {str(e)}")
+            
+            if len(accepted_data) == len(dedup_accepted):
+                try:
+                    kept = set(deduplicate_tags_semantically(accepted_data, similarity_threshold=0.8))
+                    accepted_tags = [tag for tag in accepted_tags if tag in kept]
+                except Exception as e:
+                    print(f"[tag_similarity_agent] Warning: Deduplication failed, using all tags: {str(e)}")
         
-        # Filter tag_data to only include deduplicated tags
-        tag_data_deduplicated = [
-            item for item in tag_data if item["tag"] in deduplicated_tags
-        ]
+        if pending_tags:
+            try:
+                embeddings = backend.embed(readme_chunks + pending_tags + dedup_accepted)
+            except Exception as e:
+                return {
+                    "success": False,
+                    "error": f"Failed to generate embeddings: {str(e)}",
+                    "agent": "tag_similarity_agent"
+                }
+            
+            if not embeddings or len(embeddings) != len(readme_chunks) + len(pending_tags) + len(dedup_accepted):
+                return {
+                    "success": False,
+                    "error": "Embedding count mismatch for README chunks and tags",
+                    "agent": "tag_similarity_agent"
+                }
+            
+            readme_embeddings = embeddings[:len(readme_chunks)]
+            tag_embeddings = embeddings[len(readme_chunks):len(readme_chunks) + len(pending_tags)]
+            accepted_embeddings = embeddings[len(readme_chunks) + len(pending_tags):]
+            embedding_backend_used = backend_label(backend)
+            method = f"{embedding_backend_used}_embeddings_with_chunking_and_deduplication"
+            
+            # Step 4: Prepare data structures for similarity calculation
+            tag_data = [
+                {"tag": tag, "vector": vector}
+                for tag, vector in zip(pending_tags, tag_embeddings)
+            ]
+            accepted_data = [
+                {"tag": tag, "vector": vector}
+                for tag, vector in zip(dedup_accepted, accepted_embeddings)
+            ]
+            
+            # Step 4.5: Semantic deduplication - Remove semantically identical tags.
+            # Accepted tags go first, so a duplicate pair keeps the literal one
+            try:
+                kept = deduplicate_tags_semantically(accepted_data + tag_data, similarity_threshold=0.8)
+                accepted_tags = [tag for tag in accepted_tags if tag in kept]
+                deduplicated_tags = [tag for tag in kept if tag in pending_tags]
+            except Exception as e:
+                print(f"[tag_similarity_agent] Warning: Deduplication failed, using all tags: {str(e)}")
+                deduplicated_tags = pending_tags
+            
+            # Filter tag_data to only include deduplicated tags
+            tag_data_deduplicated = [
+                item for item in tag_data if item["tag"] in deduplicated_tags
+            ]
+            
+            readme_chunk_data = [
+                {"chunk": chunk, "vector": vector}
+                for chunk, vector in zip(readme_chunks, readme_embeddings)
+            ]
+            
+            # Step 5: Calculate similarity using the similarity calculator tool
+            try:
+                ranked_tags = calculate_tag_chunk_similarity(tag_data_deduplicated, readme_chunk_data)
+                supporting_chunks = top_supporting_chunks(
+                    tag_data_deduplicated, readme_chunk_data, top_k=SUPPORTING_CHUNKS_TOP_K
+                )
+            except Exception as e:
+                return {
+                    "success": False,
+                    "error": f"Failed to calculate tag similarities: {str(e)}",
+                    "agent": "tag_similarity_agent"
+                }
         
         # Track how many duplicates were removed
-        duplicates_removed = len(valid_tags) - len(deduplicated_tags)
-        
-        readme_chunk_data = [
-            {"chunk": chunk, "vector": vector}
-            for chunk, vector in zip(readme_chunks, readme_embeddings)
-        ]
+        duplicates_removed = lexical_duplicates + len(lexical_accepted) - len(accepted_tags) \
+            + len(pending_tags) - len(deduplicated_tags)
         
-        # Step 5: Calculate similarity using the similarity calculator tool
-        try:
-            ranked_tags = calculate_tag_chunk_similarity(tag_data_deduplicated, readme_chunk_data)
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"Failed to calculate tag similarities: {str(e)}",
-                "agent": "tag_similarity_agent"
-            }
+        # Step 6: Format results to match expected output structure
+        # Relevance cut-offs depend on the backend's cosine scale (0.5 / 0.7 for Ollama)
+        medium_cutoff = backend.medium_relevance_threshold
+        high_cutoff = backend.high_relevance_threshold
         
-        if not ranked_tags:
-            return {
-                "success": True,
-                "agent": "tag_similarity_agent",
-                "method": "ollama_embeddings_with_chunking_and_deduplication",
-                "total_tags_input": len(candidate_tags),
-                "total_tags_after_dedup": len(deduplicated_tags),
-                "duplicates_removed": duplicates_removed,
-                "total_chunks": len(readme_chunks),
-                "tag_similarities": [],
-                "categorized_tags": {
-                    "high_relevance": [],
-                    "medium_relevance": [],
-                    "low_relevance": []
-                },
-                "statistics": {
-                    "average_similarity": 0.0,
-                    "max_similarity": 0.0,
-                    "min_similarity": 0.0,
-                    "high_relevance_count": 0,
-                    "medium_relevance_count": 0,
-                    "low_relevance_count": 0
-                },
-                "recommended_tags": []
+        # Lexically accepted tags were never embedded: they carry no similarity_score
+        lexical_similarities = [
+            {
+                "tag": tag,
+                "similarity_score": None,
+                "lexical_score": lexical_by_tag[tag]["lexical_score"],
+                "relevance": "high",
+                "decided_by": "lexical",
+                "supporting_chunks": [lexical_by_tag[tag]["best_chunk"]]
             }
-        
-        # Step 6: Format results to match expected output structure
-        tag_similarities = [
+            for tag in sorted(accepted_tags, key=lambda t: lexical_by_tag[t]["lexical_score"], reverse=True)
+        ]
+        embedding_similarities = [
             {
                 "tag": tag,
                 "similarity_score": float(score),
-                "relevance": "high" if score > 0.7 else "medium" if score > 0.5 else "low"
+                "lexical_score": lexical_by_tag[tag]["lexical_score"],
+                "relevance": "high" if score > high_cutoff else "medium" if score > medium_cutoff else "low",
+                "decided_by": "embedding",
+                "supporting_chunks": supporting_chunks.get(tag, [])
             }
             for tag, score in ranked_tags
-            if float(score) > 0.5
+            if float(score) > medium_cutoff
         ]
+        tag_similarities = lexical_similarities + embedding_similarities
         
         # Categorize tags by relevance
-        high_relevance = [t for t in tag_similarities if t["similarity_score"] > 0.7]
-        medium_relevance = [t for t in tag_similarities if 0.5 < t["similarity_score"] <= 0.7]
-        low_relevance = [t for t in tag_similarities if t["similarity_score"] <= 0.5]
+        high_relevance = [t for t in tag_similarities if t["relevance"] == "high"]
+        medium_relevance = [t for t in tag_similarities if t["relevance"] == "medium"]
+        low_relevance = [t for t in tag_similarities if t["relevance"] == "low"]
         
         # Calculate statistics with zero-division protection
-        scores = [t["similarity_score"] for t in tag_similarities]
+        scores = [t["similarity_score"] for t in embedding_similarities]
         avg_similarity = float(np.mean(scores)) if scores else 0.0
         max_similarity = float(np.max(scores)) if scores else 0.0
         min_similarity = float(np.min(scores)) if scores else 0.0
@@ -191,11 +275,18 @@ def calculate_tag_similarity(readme_content: str, candidate_tags: List[str]) ->
         return {
             "success": True,
             "agent": "tag_similarity_agent",
-            "method": "ollama_embeddings_with_chunking_and_deduplication",
+            "method": method,
+            "embedding_backend": embedding_backend_used,
             "total_tags_input": len(candidate_tags),
-            "total_tags_after_dedup": len(deduplicated_tags),
+            "total_tags_after_dedup": len(accepted_tags) + len(deduplicated_tags),
             "duplicates_removed": duplicates_removed,
             "total_chunks": len(readme_chunks),
+            "lexical_decisions": {
+                "accepted": accepted_tags,
+                "dropped_as_duplicates": [tag for tag in lexical_accepted if tag not in accepted_tags],
+                "rejected": rejected_tags,
+                "embedded_count": len(pending_tags)
+            },
             "tag_similarities": tag_similarities,
             "categorized_tags": {
                 "high_relevance": [t["tag"] for t in high_relevance],
@@ -0,0 +1,52 @@
+from typing import Dict, Any
+from tool.topic_dictionary import get_topic_matcher
+
+
+def match_dictionary_candidates(readme_content: str, min_count: int = 1) -> Dict[str, Any]:
+    """
+    Topic Dictionary Agent - Generates candidate tags without an LLM by finding known
+    GitHub topics, aliases and language names in the README.
+
+    All dictionary terms are matched in one linear pass (Aho-Corasick), so this costs
+    milliseconds even for long READMEs; it only finds stacks the README names explicitly.
+
+    Args:
+        readme_content: Full README text content
+        min_count: Minimum number of mentions for a tag to be returned (default: 1)
+
+    Returns:
+        Dictionary containing the normalized tags (most mentioned first) with their
+        match counts and [start, end) character positions
+    """
+    # Input validation
+    if not readme_content or not isinstance(readme_content, str):
+        return {
+            "success": False,
+            "error": "Invalid readme_content: must be a non-empty string",
+            "agent": "topic_dictionary_agent"
+        }
+
+    try:
+        mentions = get_topic_matcher().match(readme_content)
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Dictionary matching failed: {str(e)}",
+            "agent": "topic_dictionary_agent"
+        }
+
+    matches = [
+        {"tag": tag, "count": mention["count"], "positions": mention["positions"]}
+        for tag, mention in mentions.items()
+        if mention["count"] >= min_count
+    ]
+    # Stable sort keeps first-mention order among equally frequent tags
+    matches.sort(key=lambda match: -match["count"])
+
+    return {
+        "success": True,
+        "agent": "topic_dictionary_agent",
+        "tags": [match["tag"] for match in matches],
+        "matches": matches,
+        "total_mentions": sum(match["count"] for match in matches)
+    }
@@ -0,0 +1,202 @@
+import hashlib
+import os
+import re
+import threading
+import numpy as np
+from typing import List, Dict, Any, Optional, Union
+from tool.ann_index import IVFIndex
+from tool.embedding_backends import EmbeddingBackend, get_embedding_backend, backend_label
+from tool.topic_vocabulary import CANONICAL_TOPICS, resolve_topic_alias, slugify_topic
+
+TOPIC_INDEX_DIR = os.getenv("TOPIC_INDEX_DIR", ".cache")
+
+# One index per embedding model, since vectors from different models are not comparable.
+# Each model has its own build lock, so building one index never blocks lookups in another
+_topic_indexes: Dict[str, IVFIndex] = {}
+_topic_index_locks: Dict[str, threading.Lock] = {}
+_topic_index_lock = threading.Lock()  # Guards _topic_index_locks
+
+
+def _model_lock(model: str) -> threading.Lock:
+    with _topic_index_lock:
+        return _topic_index_locks.setdefault(model, threading.Lock())
+
+
+def _vocabulary_fingerprint(model: str) -> Dict[str, Any]:
+    """Identify the vocabulary and embedding model an index was built from"""
+    digest = hashlib.sha256("\n".join(CANONICAL_TOPICS).encode("utf-8")).hexdigest()
+    return {"embed_model": model, "vocabulary_hash": digest}
+
+
+def _topic_index_path(model: str) -> str:
+    safe_model = re.sub(r"[^A-Za-z0-9._-]+", "_", model)
+    return os.path.join(TOPIC_INDEX_DIR, f"topic_index_{safe_model}.npz")
+
+
+def get_topic_index(backend: EmbeddingBackend, rebuild: bool = False) -> IVFIndex:
+    """
+    Return the process-wide ANN index over the canonical topic vocabulary for a backend.
+
+    The index is loaded from ``TOPIC_INDEX_DIR`` when it matches the current vocabulary
+    and embedding model; otherwise the vocabulary is embedded with ``backend`` and the
+    rebuilt index is persisted.
+
+    Args:
+        backend: Embedding backend whose vector space the index must live in
+        rebuild: Force re-embedding the vocabulary and rebuilding the index
+
+    Returns:
+        IVFIndex over CANONICAL_TOPICS
+
+    Raises:
+        Exception: If the index has to be built and embedding the vocabulary fails
+    """
+    model = backend.model
+    if model in _topic_indexes and not rebuild:
+        return _topic_indexes[model]
+
+    with _model_lock(model):
+        # Another request may have built it while this one waited
+        if model in _topic_indexes and not rebuild:
+            return _topic_indexes[model]
+
+        fingerprint = _vocabulary_fingerprint(model)
+        path = _topic_index_path(model)
+
+        if not rebuild and os.path.exists(path):
+            try:
+                index = IVFIndex.load(path)
+                if index.metadata == fingerprint:
+                    _topic_indexes[model] = index
+                    return index
+                print("[topic_snapping_agent] Stored topic index is stale, rebuilding")
+            except Exception as e:
+                print(f"[topic_snapping_agent] Warning: Failed to load topic index: {str(e)}")
+
+        vectors = backend.embed(CANONICAL_TOPICS)
+        if backend.model != model:
+            raise Exception(f"Embedding backend switched to {backend.model} while building the topic index")
+        index = IVFIndex.build(np.vstack(vectors), CANONICAL_TOPICS, metadata=fingerprint)
+
+        try:
+            index.save(path)
+        except Exception as e:
+            print(f"[topic_snapping_agent] Warning: Failed to persist topic index: {str(e)}")
+
+        _topic_indexes[model] = index
+        return index
+
+
+def snap_tags_to_topics(
+    candidate_tags: List[str],
+    similarity_threshold: Optional[float] = None,
+    n_probe: int = 4,
+    embedding_backend: Union[str, EmbeddingBackend, None] = None
+) -> Dict[str, Any]:
+    """
+    Topic Snapping Agent - Maps free-form candidate tags onto canonical GitHub topics.
+
+    Exact topics and known aliases are resolved directly. Remaining tags are embedded and
+    looked up in the ANN index; tags whose nearest topic clears ``similarity_threshold``
+    are replaced by that topic, the rest are kept as their normalized slug.
+
+    Args:
+        candidate_tags: List of candidate tags from tag_candidate_agent
+        similarity_threshold: Minimum cosine similarity to snap a tag (default: the
+                              backend's snap_similarity_threshold, 0.85 for Ollama)
+        n_probe: Number of index clusters scanned per lookup (default: 4)
+        embedding_backend: "auto", "ollama", "local" or an EmbeddingBackend instance
+                           (default: EMBEDDING_BACKEND setting)
+
+    Returns:
+        Dictionary containing the snapped tag list and per-tag mappings
+    """
+    # Input validation
+    if not candidate_tags or not isinstance(candidate_tags, list):
+        return {
+            "success": False,
+            "error": "Invalid candidate_tags: must be a non-empty list",
+            "agent": "topic_snapping_agent"
+        }
+
+    if similarity_threshold is not None and not (0.0 <= similarity_threshold <= 1.0):
+        return {
+            "success": False,
+            "error": f"similarity_threshold must be between 0 and 1, got {similarity_threshold}",
+            "agent": "topic_snapping_agent"
+        }
+
+    valid_tags = [tag for tag in candidate_tags if isinstance(tag, str) and slugify_topic(tag)]
+
+    if not valid_tags:
+        return {
+            "success": False,
+            "error": "No valid tags found in candidate_tags after filtering",
+            "agent": "topic_snapping_agent"
+        }
+
+    mappings: List[Dict[str, Any]] = []
+    pending: List[int] = []
+    embedding_backend_used = None
+    threshold_used = similarity_threshold
+
+    # Step 1: Resolve exact topics and aliases without embeddings
+    for tag in valid_tags:
+        topic = resolve_topic_alias(tag)
+        if topic:
+            method = "exact" if slugify_topic(tag) == topic else "alias"
+            mappings.append({"tag": tag, "topic": topic, "score": 1.0, "method": method})
+        else:
+            mappings.append({"tag": tag, "topic": slugify_topic(tag), "score": None, "method": "unmatched"})
+            pending.append(len(mappings) - 1)
+
+    # Step 2: Snap the remaining tags through the ANN index
+    if pending:
+        try:
+            backend = get_embedding_backend(embedding_backend)
+            pending_tags = [mappings[i]["tag"] for i in pending]
+            vectors = backend.embed(pending_tags)
+
+            if len(vectors) != len(pending_tags):
+                raise Exception("Embedding count mismatch for tags")
+
+            # Resolve the index after embedding so it matches the backend actually used
+            index = get_topic_index(backend)
+            embedding_backend_used = backend_label(backend)
+            # Cosine scales differ between embedding models
+            if threshold_used is None:
+                threshold_used = backend.snap_similarity_threshold
+
+            ids, scores = index.search(np.vstack(vectors), k=1, n_probe=n_probe)
+
+            for row, i in enumerate(pending):
+                best_id, best_score = int(ids[row, 0]), float(scores[row, 0])
+                if best_id < 0:
+                    continue
+                mappings[i]["score"] = best_score
+                if best_score >= threshold_used:
+                    mappings[i]["topic"] = index.labels[best_id]
+                    mappings[i]["method"] = "ann"
+        except Exception as e:
+            print(f"[topic_snapping_agent] Warning: ANN snapping failed, keeping unmatched tags: {str(e)}")
+
+    # Step 3: Deduplicate snapped topics, preserving first-seen order
+    snapped_tags = []
+    seen = set()
+    for mapping in mappings:
+        topic = mapping["topic"]
+        if topic and topic not in seen:
+            seen.add(topic)
+            snapped_tags.append(topic)
+
+    return {
+        "success": True,
+        "agent": "topic_snapping_agent",
+        "total_tags_input": len(candidate_tags),
+        "total_tags_output": len(snapped_tags),
+        "snapped_count": sum(1 for m in mappings if m["method"] != "unmatched"),
+        "snapped_tags": snapped_tags,
+        "mappings": mappings,
+        "embedding_backend": embedding_backend_used,
+        "similarity_threshold": threshold_used
+    }
@@ -0,0 +1,107 @@
+"""
+Benchmark: Matryoshka embedding truncation trade-off.
+
+Embeds a local corpus (the repository's markdown files, chunked like the workflow does)
+and the canonical topic vocabulary once at full width, then for each target dimension
+reports similarity latency, vector memory and how well the tag ranking agrees with the
+full-width ranking.
+
+Usage:
+    python benchmarks/embedding_dimensions.py --backend ollama --dims 768 512 256 128 64
+    python benchmarks/embedding_dimensions.py --backend local
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+import numpy as np
+
+# Add the repository root to sys.path so we can import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tool.embedding_backends import get_embedding_backend, backend_label
+from tool.readme_chunking import chunk_text
+from tool.topic_vocabulary import CANONICAL_TOPICS
+from tool.vector_utils import truncate_embeddings, cosine_similarity_matrix
+
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[np.argsort(values)] = np.arange(len(values))
+    return ranks
+
+
+def spearman_correlation(a: np.ndarray, b: np.ndarray) -> float:
+    """Spearman rank correlation between two score vectors"""
+    return float(np.corrcoef(_ranks(a), _ranks(b))[0, 1])
+
+
+def top_k_overlap(a: np.ndarray, b: np.ndarray, k: int) -> float:
+    """Fraction of the top-k items by ``a`` that are also in the top-k by ``b``"""
+    top_a = set(np.argsort(-a)[:k].tolist())
+    top_b = set(np.argsort(-b)[:k].tolist())
+    return len(top_a & top_b) / float(k)
+
+
+def load_corpus(pattern: str) -> list:
+    chunks = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "r", encoding="utf-8") as f:
+            chunks.extend(chunk_text(f.read(), chunk_size=1000, overlap=200))
+    return chunks
+
+
+def run_benchmark(backend_name: str, dims: list, corpus: str, repeats: int, top_k: int) -> None:
+    chunks = load_corpus(corpus)
+    if not chunks:
+        print(f"No corpus chunks found for pattern '{corpus}'")
+        return
+
+    backend = get_embedding_backend(backend_name)
+    start = time.perf_counter()
+    chunk_vectors = backend.embed(chunks)
+    tag_vectors = backend.embed(CANONICAL_TOPICS)
+    embed_seconds = time.perf_counter() - start
+
+    full_dim = len(chunk_vectors[0])
+    print(f"Backend: {backend_label(backend)} ({backend.model}), full width {full_dim}")
+    print(f"Corpus: {len(chunks)} chunks, {len(CANONICAL_TOPICS)} tags, embedded in {embed_seconds:.2f}s")
+    print()
+    print(f"{'dims':>6} {'similarity ms':>14} {'memory KiB':>11} {'spearman':>9} {'top-' + str(top_k):>7}")
+
+    reference = None
+    for dim in sorted({d for d in dims if d <= full_dim} | {full_dim}, reverse=True):
+        tags = truncate_embeddings(tag_vectors, dim)
+        chunk_rows = truncate_embeddings(chunk_vectors, dim)
+
+        timings = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            scores = cosine_similarity_matrix(tags, chunk_rows).max(axis=1)
+            timings.append(time.perf_counter() - t0)
+
+        memory_kib = (len(tags) + len(chunk_rows)) * dim * np.dtype(np.float32).itemsize / 1024.0
+        if reference is None:
+            reference = scores
+
+        print(
+            f"{dim:>6} {np.median(timings) * 1000:>14.3f} {memory_kib:>11.1f} "
+            f"{spearman_correlation(reference, scores):>9.3f} {top_k_overlap(reference, scores, top_k):>7.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Matryoshka embedding truncation benchmark")
+    parser.add_argument("--backend", default="auto", help="Embedding backend: auto, ollama or local")
+    parser.add_argument("--dims", type=int, nargs="+", default=[768, 512, 256, 128, 64])
+    parser.add_argument("--corpus", default="*.md", help="Glob of local documents to chunk")
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=20)
+    args = parser.parse_args()
+
+    run_benchmark(args.backend, args.dims, args.corpus, args.repeats, args.top_k)
+
+
+if __name__ == "__main__":
+    main()
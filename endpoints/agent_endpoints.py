@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException
 from schemas import TaskRequest, TaskResponse, MetadataRequest, MetadataResponseWrapper
 from agents import run_multi_agent_system, extract_metadata
+from tool.llm_cache import llm_cache_bypass
+from tool.semantic_cache import get_semantic_cache
 import os
 
 router = APIRouter(prefix="/agent", tags=["agents"])
@@ -15,8 +17,23 @@ async def execute_agent_task(request: TaskRequest):
                 detail="GOOGLE_API_KEY not configured. Please set it in .env file"
             )
         
-        result = run_multi_agent_system(request.task)
-        return TaskResponse(result=result, status="success")
+        cache = get_semantic_cache("agent_execute")
+        with llm_cache_bypass(request.bypass_cache):
+            if cache:
+                result, cache_info = cache.get_or_compute(
+                    request.task,
+                    lambda: run_multi_agent_system(request.task),
+                    bypass=request.bypass_cache,
+                    cacheable=lambda r: not r.startswith("Error:")
+                )
+            else:
+                result, cache_info = run_multi_agent_system(request.task), {"hit": False}
+        return TaskResponse(
+            result=result,
+            status="success",
+            cache_hit=cache_info["hit"],
+            cache_similarity=cache_info.get("similarity")
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -30,10 +47,22 @@ async def extract_metadata_endpoint(request: MetadataRequest):
                 detail="GOOGLE_API_KEY not configured. Please set it in .env file"
             )
         
-        metadata = extract_metadata(request.content)
+        cache = get_semantic_cache("agent_metadata")
+        with llm_cache_bypass(request.bypass_cache):
+            if cache:
+                metadata, cache_info = cache.get_or_compute(
+                    request.content,
+                    lambda: extract_metadata(request.content),
+                    bypass=request.bypass_cache,
+                    cacheable=lambda m: "error" not in m
+                )
+            else:
+                metadata, cache_info = extract_metadata(request.content), {"hit": False}
         return MetadataResponseWrapper(
             status="success",
-            metadata=metadata
+            metadata=metadata,
+            cache_hit=cache_info["hit"],
+            cache_similarity=cache_info.get("similarity")
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
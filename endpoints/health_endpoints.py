@@ -1,6 +1,12 @@
 from fastapi import APIRouter
 from schemas import HealthResponse
 import os
+from tool.llm_cache import llm_cache_stats
+from tool.model_router import model_router
+from tool.llm_concurrency import llm_limiter
+from tool.llm_hedging import hedging_stats
+from tool.llm_usage import llm_usage
+from tool.semantic_cache import semantic_cache_stats
 
 router = APIRouter(tags=["health"])
 
@@ -19,10 +25,46 @@ def health_check():
             "POST /workflow/github/analyze",
             "GET /workflow/github/analyze/{owner}/{repo}",
             "POST /test",
-            "GET /health"
+            "GET /health",
+            "GET /health/llm-cache",
+            "GET /health/model-router",
+            "GET /health/llm-concurrency",
+            "GET /health/llm-hedging",
+            "GET /health/llm-usage",
+            "GET /health/semantic-cache"
         ]
     )
 
+@router.get("/health/llm-cache")
+def llm_cache_health():
+    """LLM response cache hit-rate metrics"""
+    return llm_cache_stats()
+
+@router.get("/health/model-router")
+def model_router_health():
+    """Fast/strong model routing decisions and their latency"""
+    return model_router.stats()
+
+@router.get("/health/llm-concurrency")
+def llm_concurrency_health():
+    """Adaptive LLM concurrency limit, queue and retry metrics"""
+    return llm_limiter.stats()
+
+@router.get("/health/llm-hedging")
+def llm_hedging_health():
+    """Hedged LLM request counts, budget use and latency percentiles per call type"""
+    return hedging_stats()
+
+@router.get("/health/llm-usage")
+def llm_usage_health():
+    """LLM tokens, latency, retries and estimated cost per stage and model since startup"""
+    return llm_usage.summary(include_calls=True)
+
+@router.get("/health/semantic-cache")
+def semantic_cache_health():
+    """Semantic response cache hit-rate metrics for /agent/execute and /agent/metadata"""
+    return semantic_cache_stats()
+
 @router.get("/")
 def hello_world():
     """Root endpoint"""
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException
-from schemas.simple_workflow_schemas import SimpleAnalysisRequest, SimpleAnalysisResponse
-from workflows import run_simple_analysis_workflow
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional, Literal
+from schemas.simple_workflow_schemas import SimpleAnalysisRequest, SimpleAnalysisResponse, SimpleBatchAnalysisRequest, SimpleBatchAnalysisResponse
+from workflows import run_simple_analysis_workflow, run_batch_analysis_workflow
 import os
 from tool.json_response import JsonResponse
 
@@ -35,7 +36,11 @@ async def simple_analysis_workflow(request: SimpleAnalysisRequest):
                 detail="GOOGLE_API_KEY not configured. Please set it in .env file"
             )
         
-        result = run_simple_analysis_workflow(request.owner, request.repo)
+        result = run_simple_analysis_workflow(
+            request.owner,
+            request.repo,
+            options=request.workflow_options()
+        )
         
         if not result.get("success"):
             raise HTTPException(
@@ -49,8 +54,58 @@ async def simple_analysis_workflow(request: SimpleAnalysisRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/simple/analyze/batch", response_model=SimpleBatchAnalysisResponse)
+def simple_analysis_workflow_batch(request: SimpleBatchAnalysisRequest):
+    """
+    Simple Analysis Workflow for several repositories
+    
+    Runs the workflow for every repository concurrently. Candidate and critic requests
+    of small repositories are packed into shared LLM requests with one section per
+    repository; large inputs fall back to per-repository calls. A repository that fails
+    does not fail the batch: its result has success=false and an error. The endpoint is
+    a plain function, so FastAPI runs the blocking batch in its threadpool instead of
+    stalling the event loop.
+    
+    Example:
+    ```json
+    {
+        "repositories": [
+            {"owner": "pallets", "repo": "click"},
+            {"owner": "psf", "repo": "requests"}
+        ]
+    }
+    ```
+    """
+    try:
+        if not os.getenv("GOOGLE_API_KEY"):
+            raise HTTPException(
+                status_code=500,
+                detail="GOOGLE_API_KEY not configured. Please set it in .env file"
+            )
+        
+        result = run_batch_analysis_workflow(
+            [(ref.owner, ref.repo) for ref in request.repositories],
+            options=request.workflow_options(),
+            max_parallel=request.max_parallel,
+            packing=request.batch_packing
+        )
+        return SimpleBatchAnalysisResponse(**result)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/simple/analyze/{owner}/{repo}", response_model=JsonResponse)
-async def simple_analysis_workflow_path(owner: str, repo: str):
+async def simple_analysis_workflow_path(
+    owner: str,
+    repo: str,
+    embedding_backend: Optional[Literal["auto", "ollama", "local"]] = Query(
+        None, description="Embedding backend: 'auto', 'ollama' or 'local'"
+    ),
+    embedding_dimensions: Optional[int] = Query(
+        None, ge=16, le=4096, description="Truncate embeddings to this many leading dimensions"
+    )
+):
     """
     Simple Analysis Workflow (GET method with path parameters)
     
@@ -68,7 +123,13 @@ async def simple_analysis_workflow_path(owner: str, repo: str):
                 detail="GOOGLE_API_KEY not configured. Please set it in .env file"
             )
         
-        result = run_simple_analysis_workflow(owner, repo)
+        options = SimpleAnalysisRequest(
+            owner=owner,
+            repo=repo,
+            embedding_backend=embedding_backend,
+            embedding_dimensions=embedding_dimensions
+        ).workflow_options()
+        result = run_simple_analysis_workflow(owner, repo, options=options)
         
         if not result.get("success"):
             raise HTTPException(
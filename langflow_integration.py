@@ -25,7 +25,7 @@ class TaskRequest(BaseModel):
         }
 
 class MetadataRequest(BaseModel):
-    content: str = Field(..., min_length=1, max_length=10000, description="Content to extract metadata from")
+    content: str = Field(..., min_length=1, max_length=200000, description="Content to extract metadata from (content over METADATA_TOKEN_BUDGET tokens is summarized)")
     
     class Config:
         json_schema_extra = {
@@ -8,6 +8,10 @@ class TaskRequest(BaseModel):
         max_length=5000,
         description="Task to be processed by the multi-agent system"
     )
+    bypass_cache: bool = Field(
+        default=False,
+        description="Skip cached LLM responses and call the model again"
+    )
     
     class Config:
         json_schema_extra = {
@@ -20,8 +24,12 @@ class MetadataRequest(BaseModel):
     content: str = Field(
         ...,
         min_length=1,
-        max_length=10000,
-        description="Content to extract metadata from"
+        max_length=200000,
+        description="Content to extract metadata from (content over METADATA_TOKEN_BUDGET tokens is summarized)"
+    )
+    bypass_cache: bool = Field(
+        default=False,
+        description="Skip cached LLM responses and call the model again"
     )
     
     class Config:
@@ -4,6 +4,8 @@ from typing import List, Optional, Dict, Any
 class TaskResponse(BaseModel):
     result: str = Field(..., description="Result from the multi-agent system")
     status: str = Field(..., description="Status of the operation")
+    cache_hit: bool = Field(False, description="Whether the result was served from the semantic response cache")
+    cache_similarity: Optional[float] = Field(None, description="Similarity to the cached request on a cache hit")
     
     class Config:
         json_schema_extra = {
@@ -28,6 +30,8 @@ class MetadataResponse(BaseModel):
 class MetadataResponseWrapper(BaseModel):
     status: str = Field(..., description="Status of the operation")
     metadata: Dict[str, Any] = Field(..., description="Extracted metadata")
+    cache_hit: bool = Field(False, description="Whether the metadata was served from the semantic response cache")
+    cache_similarity: Optional[float] = Field(None, description="Similarity to the cached request on a cache hit")
 
 class TestResponse(BaseModel):
     status: str = Field(..., description="Status of the test")
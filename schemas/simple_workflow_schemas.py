@@ -1,7 +1,76 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Literal
 
-class SimpleAnalysisRequest(BaseModel):
+class SimpleAnalysisOptions(BaseModel):
+    """Per-request workflow tuning knobs shared by single and batch analysis"""
+    embedding_backend: Optional[Literal["auto", "ollama", "local"]] = Field(
+        None,
+        description="Embedding backend: 'auto' (Ollama with local fallback), 'ollama' or 'local'"
+    )
+    embedding_dimensions: Optional[int] = Field(
+        None,
+        ge=16,
+        le=4096,
+        description="Truncate embeddings to this many leading dimensions (e.g. 768, 256, 128)"
+    )
+    embedding_prefetch: Optional[bool] = Field(
+        None,
+        description="Embed README chunks, and the tags topic snapping will look up, in the background while candidates are still being generated"
+    )
+    candidate_cascade: Optional[bool] = Field(
+        None,
+        description="Try GitHub topics, dictionary matches and keyphrases before LLM candidate generation"
+    )
+    candidate_concurrency: Optional[int] = Field(
+        None,
+        ge=1,
+        le=32,
+        description="Maximum number of README chunks sent to the LLM at once during candidate generation"
+    )
+    candidate_packing: Optional[bool] = Field(
+        None,
+        description="Pack several README chunks into each candidate generation request"
+    )
+    model_routing: Optional[bool] = Field(
+        None,
+        description="Send easy README chunks and critiques to the fast model and escalate hard ones to the strong model"
+    )
+    llm_hedging: Optional[bool] = Field(
+        None,
+        description="Duplicate candidate and critic LLM calls that run past their usual latency and keep the first answer"
+    )
+    critic_combined: Optional[bool] = Field(
+        None,
+        description="Score tags and propose revisions in a single critic call per iteration"
+    )
+    critic_shard_size: Optional[int] = Field(
+        None,
+        ge=1,
+        le=100,
+        description="Number of tags per critic evaluation prompt; shards are evaluated concurrently"
+    )
+    critic_top_n: Optional[int] = Field(
+        None,
+        ge=1,
+        le=200,
+        description="Maximum number of tags passed to the critic, picked by relevance and diversity (MMR)"
+    )
+    mmr_lambda: Optional[float] = Field(
+        None,
+        ge=0.0,
+        le=1.0,
+        description="MMR trade-off when pruning tags: 1.0 favours relevance only, 0.0 diversity only"
+    )
+    llm_cache_bypass: Optional[bool] = Field(
+        None,
+        description="Skip cached LLM responses for this run (fresh answers are still cached)"
+    )
+    
+    def workflow_options(self) -> Dict[str, Any]:
+        """Per-request workflow options, omitting unset fields"""
+        return self.dict(include=set(SimpleAnalysisOptions.model_fields), exclude_none=True)
+
+class SimpleAnalysisRequest(SimpleAnalysisOptions):
     owner: str = Field(..., min_length=1, description="GitHub repository owner")
     repo: str = Field(..., min_length=1, description="GitHub repository name")
     
@@ -13,6 +82,33 @@ class SimpleAnalysisRequest(BaseModel):
             }
         }
 
+class RepositoryRef(BaseModel):
+    owner: str = Field(..., min_length=1, description="GitHub repository owner")
+    repo: str = Field(..., min_length=1, description="GitHub repository name")
+
+class SimpleBatchAnalysisRequest(SimpleAnalysisOptions):
+    repositories: List[RepositoryRef] = Field(..., min_length=1, max_length=50, description="Repositories to analyze")
+    max_parallel: Optional[int] = Field(
+        None,
+        ge=1,
+        le=32,
+        description="Repositories analyzed at once; requests are only packed across repositories in flight together"
+    )
+    batch_packing: Optional[bool] = Field(
+        None,
+        description="Pack small repositories' candidate and critic requests into shared LLM requests"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "repositories": [
+                    {"owner": "pallets", "repo": "click"},
+                    {"owner": "psf", "repo": "requests"}
+                ]
+            }
+        }
+
 class SimpleAnalysisResponse(BaseModel):
     success: bool = Field(..., description="Whether the workflow completed successfully")
     owner: str = Field(..., description="Repository owner")
@@ -23,9 +119,20 @@ class SimpleAnalysisResponse(BaseModel):
     technologies: List[str] = Field(default_factory=list, description="GitHub repository technologies/languages")
     topics: List[str] = Field(default_factory=list, description="GitHub repository topics")
     candidate_tags: List[str] = Field(default_factory=list, description="Generated candidate tags")
+    candidate_cascade: Optional[Dict[str, Any]] = Field(None, description="Candidate tier per tag and LLM gate decision")
+    topic_snap: Optional[Dict[str, Any]] = Field(None, description="Canonical topic snapping output")
     similarity_analysis: Optional[Dict[str, Any]] = Field(None, description="Cosine similarity analysis")
+    tag_pruning: Optional[Dict[str, Any]] = Field(None, description="MMR pruning of tags before the critic")
     tag_rule: Optional[Dict[str, Any]] = Field(None, description="Tag rule agent output")
     tag_critic: Optional[Dict[str, Any]] = Field(None, description="Tag critic agent output")
     summary: Dict[str, Any] = Field(..., description="Summary of the analysis")
+    llm_usage: Optional[Dict[str, Any]] = Field(None, description="LLM tokens, latency, retries and estimated cost per stage, with LLM cache hits and the cost they saved")
     error: Optional[str] = Field(None, description="Error message if workflow failed")
     failed_at_step: Optional[str] = Field(None, description="Step where workflow failed")
+
+class SimpleBatchAnalysisResponse(BaseModel):
+    success: bool = Field(..., description="Whether every repository was analyzed successfully")
+    succeeded: int = Field(..., description="Number of repositories analyzed successfully")
+    failed: int = Field(..., description="Number of repositories whose workflow failed")
+    results: List[Dict[str, Any]] = Field(..., description="Workflow result per repository, in request order")
+    batch_packing: Dict[str, Any] = Field(default_factory=dict, description="Cross-repository packing stats per request kind")
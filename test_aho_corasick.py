@@ -0,0 +1,48 @@
+import random
+
+from tool.aho_corasick import AhoCorasick
+from tool.topic_dictionary import TopicMatcher
+
+
+def _naive(patterns, text):
+    return sorted(
+        (start, start + len(pattern), index)
+        for index, pattern in enumerate(patterns) if pattern
+        for start in range(len(text) - len(pattern) + 1)
+        if text.startswith(pattern, start)
+    )
+
+
+def test_classic_example_with_overlaps():
+    assert list(AhoCorasick(["he", "she", "hers"]).iter("ushers")) == [(1, 4, 1), (2, 4, 0), (2, 6, 2)]
+
+
+def test_matches_naive_search_on_random_texts():
+    rng = random.Random(7)
+    for _ in range(50):
+        patterns = ["".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(6)]
+        text = "".join(rng.choice("abc") for _ in range(60))
+
+        assert sorted(AhoCorasick(patterns).iter(text)) == _naive(patterns, text)
+
+
+def test_duplicate_and_empty_patterns():
+    matches = list(AhoCorasick(["", "ab", "ab"]).iter("xab"))
+
+    assert sorted(matches) == [(1, 3, 1), (1, 3, 2)]
+    assert list(AhoCorasick([]).iter("anything")) == []
+
+
+def test_matches_are_ordered_by_end_offset():
+    ends = [end for _, end, _ in AhoCorasick(["a", "aa", "aaa"]).iter("aaaa")]
+
+    assert ends == sorted(ends)
+
+
+def test_topic_matcher_respects_word_boundaries_and_prefers_longest():
+    matcher = TopicMatcher({"go": "go", "react": "react", "react native": "react-native"})
+
+    matches = matcher.match("A good React Native app, written in Go and React.")
+
+    assert list(matches) == ["react-native", "go", "react"]
+    assert matches["react"]["count"] == 1
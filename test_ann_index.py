@@ -0,0 +1,67 @@
+import numpy as np
+
+from tool.ann_index import IVFIndex
+
+
+def _clustered_vectors(n_clusters=8, per_cluster=20, dim=16, seed=1):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+    vectors = np.vstack([center + 0.05 * rng.normal(size=(per_cluster, dim)) for center in centers])
+    labels = [f"item-{i}" for i in range(len(vectors))]
+    return vectors, labels
+
+
+def test_search_returns_the_vector_itself_as_nearest():
+    vectors, labels = _clustered_vectors()
+    index = IVFIndex.build(vectors, labels)
+
+    ids, scores = index.search(vectors[:10], k=1, n_probe=2)
+
+    assert list(ids[:, 0]) == list(range(10))
+    assert np.allclose(scores[:, 0], 1.0, atol=1e-5)
+
+
+def test_search_with_every_list_probed_matches_brute_force():
+    vectors, labels = _clustered_vectors()
+    index = IVFIndex.build(vectors, labels, n_lists=8)
+    queries = np.random.default_rng(2).normal(size=(5, vectors.shape[1]))
+
+    ids, scores = index.search(queries, k=3, n_probe=8)
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    exact = normalized @ (queries / np.linalg.norm(queries, axis=1, keepdims=True)).T
+    for qi in range(len(queries)):
+        assert list(ids[qi]) == list(np.argsort(-exact[:, qi])[:3])
+
+
+def test_missing_neighbours_are_padded():
+    index = IVFIndex.build(np.eye(3), labels=["python", "react", "docker"], n_lists=3)
+
+    ids, scores = index.search(np.array([1.0, 0.0, 0.0]), k=2, n_probe=1)
+
+    assert ids[0, 0] == 0
+    assert ids[0, 1] == -1
+    assert scores[0, 1] == -np.inf
+
+
+def test_save_and_load_round_trip(tmp_path):
+    vectors, labels = _clustered_vectors()
+    index = IVFIndex.build(vectors, labels, metadata={"model": "test", "count": len(labels)})
+    path = str(tmp_path / "nested" / "index.npz")
+
+    index.save(path)
+    loaded = IVFIndex.load(path)
+
+    assert loaded.labels == index.labels
+    assert loaded.metadata == {"model": "test", "count": len(labels)}
+    assert np.array_equal(loaded.vectors, index.vectors)
+    for a, b in zip(loaded.search(vectors[:5], k=2), index.search(vectors[:5], k=2)):
+        assert np.array_equal(a, b)
+
+
+def test_build_rejects_mismatched_labels():
+    try:
+        IVFIndex.build(np.eye(3), labels=["python"])
+    except ValueError:
+        return
+    raise AssertionError("Expected ValueError")
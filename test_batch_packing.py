@@ -0,0 +1,72 @@
+import threading
+
+from tool.batch_packing import BatchPacker, batch_packing, batch_repo, get_batch_packer
+
+
+def _submit_all(packer, requests):
+    results = {}
+
+    def run(repo, tokens):
+        results[repo] = packer.submit(repo, repo.upper(), tokens=tokens)
+
+    threads = [threading.Thread(target=run, args=request) for request in requests]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_requests_share_one_pack():
+    calls = []
+
+    def pack_fn(items):
+        calls.append(items)
+        return {i: f"answer for {payload}" for i, (_, payload) in enumerate(items)}
+
+    packer = BatchPacker("candidate", pack_fn, max_items=3, window=2.0)
+    results = _submit_all(packer, [("a/one", 10), ("b/two", 10), ("c/three", 10)])
+
+    assert len(calls) == 1
+    assert results == {"a/one": "answer for A/ONE", "b/two": "answer for B/TWO", "c/three": "answer for C/THREE"}
+    assert packer.stats()["requests_saved"] == 2
+
+
+def test_missing_sections_and_failed_packs_fall_back():
+    packer = BatchPacker("critic", lambda items: {0: "only the first"}, max_items=2, window=2.0)
+    results = _submit_all(packer, [("a/one", 10), ("b/two", 10)])
+
+    assert sorted(results.values(), key=str) == [None, "only the first"]
+    assert packer.stats()["missing_sections"] == 1
+
+    def fail(items):
+        raise RuntimeError("quota")
+
+    packer = BatchPacker("critic", fail, max_items=2, window=2.0)
+    assert _submit_all(packer, [("a/one", 10), ("b/two", 10)]) == {"a/one": None, "b/two": None}
+    assert packer.stats()["pack_failures"] == 1
+
+
+def test_sections_over_the_budget_start_a_new_pack():
+    calls = []
+
+    def pack_fn(items):
+        calls.append(len(items))
+        return {i: repo for i, (repo, _) in enumerate(items)}
+
+    packer = BatchPacker("candidate", pack_fn, token_budget=100, max_item_tokens=100, max_items=8, window=0.3)
+    _submit_all(packer, [("a/one", 60), ("b/two", 60)])
+
+    assert packer.stats()["alone"] == 2
+    assert calls == []
+
+
+def test_packer_lookup_needs_packers_and_a_repository():
+    packer = BatchPacker("candidate", lambda items: {})
+
+    assert get_batch_packer("candidate") is None
+    with batch_packing({"candidate": packer}):
+        assert get_batch_packer("candidate") is None
+        with batch_repo("a/one"):
+            assert get_batch_packer("candidate") == (packer, "a/one")
+            assert get_batch_packer("critic") is None
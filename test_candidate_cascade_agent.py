@@ -0,0 +1,89 @@
+import pytest
+
+import agents.candidate_cascade_agent as cascade
+from agents.candidate_cascade_agent import _chunk_coverage, cascade_tag_candidates
+
+README = (
+    "# Fast API\nA Python web framework built on Starlette and Pydantic. "
+    "Python web apps with Docker and PostgreSQL."
+)
+TOPICS = ["python", "web", "api", "framework", "starlette", "pydantic", "docker", "postgresql"]
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+
+    def fake_generate(readme_content, **kwargs):
+        calls.append(readme_content)
+        return ["asgi", "Python"]
+
+    monkeypatch.setattr(cascade, "generate_tag_candidates", fake_generate)
+    return calls
+
+
+def test_confident_local_tags_skip_the_llm(llm_calls):
+    result = cascade_tag_candidates(README, topics=TOPICS)
+
+    assert result["llm_called"] is False
+    assert llm_calls == []
+    assert result["gate"]["reasons"] == []
+    assert result["tier_counts"]["llm"] == 0
+
+
+def test_low_confidence_tags_do_not_pass_the_gate(llm_calls):
+    # Technologies are 0.8 confident, dictionary matches seen once 0.5
+    result = cascade_tag_candidates(README, technologies=TOPICS, min_confidence=0.9)
+
+    assert result["llm_called"] is True
+    assert result["gate"]["confident_tags"] == 0
+    assert "0 confident local tags < 8" in result["gate"]["reasons"]
+
+
+def test_a_tag_keeps_its_cheapest_tier_and_best_confidence(llm_calls):
+    result = cascade_tag_candidates(README, topics=["docker"], technologies=["Docker", "Python"])
+
+    assert result["tiers"]["docker"] == "topics"
+    assert result["tiers"]["Python"] == "technologies"
+    entry = next(c for c in result["candidates"] if c["tag"] == "Python")
+    assert entry["confidence"] == 0.8
+
+
+def test_llm_fallback_adds_only_new_tags(llm_calls):
+    result = cascade_tag_candidates(README, topics=["python"])
+
+    assert len(llm_calls) == 1
+    assert result["tiers"]["asgi"] == "llm"
+    # Already found locally, so it keeps the local tier
+    assert result["tiers"]["python"] == "topics"
+    assert "Python" not in result["tiers"]
+
+
+def test_uncovered_readme_calls_the_llm(llm_calls):
+    readme = "Python web framework.\n\n" + "Kubernetes operators reconcile custom resources. " * 80
+    # Above the keyphrase (0.7) and repeated dictionary match (0.8) confidences
+    result = cascade_tag_candidates(readme, topics=TOPICS, min_tags=1, min_confidence=0.9)
+
+    assert result["gate"]["coverage"] < 0.5
+    assert result["llm_called"] is True
+    assert any(reason.startswith("chunk coverage") for reason in result["gate"]["reasons"])
+
+
+def test_empty_readme_never_calls_the_llm(llm_calls):
+    result = cascade_tag_candidates("", topics=["python"])
+
+    assert result["llm_called"] is False
+    assert llm_calls == []
+
+
+def test_chunk_coverage_needs_every_tag_token():
+    chunks = ["a python web framework", "a rust command line tool", "notes"]
+
+    assert _chunk_coverage(chunks, ["python"]) == pytest.approx(1 / 3)
+    assert _chunk_coverage(chunks, ["python", "command-line"]) == pytest.approx(2 / 3)
+    assert _chunk_coverage(chunks, ["rust-web"]) == 0.0
+    assert _chunk_coverage([], ["python"]) == 0.0
+
+
+def test_invalid_readme_is_rejected():
+    assert cascade_tag_candidates(None)["success"] is False
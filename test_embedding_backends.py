@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from agents.tag_similarity_agent import calculate_tag_similarity
+from tool.embedding_backends import (
+    EmbeddingBackend, FallbackEmbeddingBackend, HashingEmbeddingBackend, OllamaEmbeddingBackend,
+    backend_label, get_embedding_backend
+)
+
+README = "Gin is a HTTP web framework written in Golang, with a martini-like API and fast routing."
+
+
+class DownBackend(EmbeddingBackend):
+    name = "ollama"
+
+    @property
+    def model(self):
+        return "neural"
+
+    def embed(self, texts):
+        raise Exception("connection refused")
+
+
+def test_named_backends_resolve_with_their_dimensions():
+    assert isinstance(get_embedding_backend("ollama", dimensions=256), OllamaEmbeddingBackend)
+    assert get_embedding_backend("ollama", dimensions=256).dimensions == 256
+    assert get_embedding_backend("local", dimensions=64).embed(["python"])[0].shape == (64,)
+    assert isinstance(get_embedding_backend(" AUTO "), FallbackEmbeddingBackend)
+
+    backend = HashingEmbeddingBackend()
+    assert get_embedding_backend(backend) is backend
+
+    with pytest.raises(ValueError):
+        get_embedding_backend("openai")
+
+
+def test_each_backend_has_thresholds_for_its_cosine_scale():
+    neural, local = OllamaEmbeddingBackend(), HashingEmbeddingBackend()
+
+    assert (neural.medium_relevance_threshold, neural.high_relevance_threshold) == (0.5, 0.7)
+    assert (local.medium_relevance_threshold, local.high_relevance_threshold) == (0.12, 0.2)
+
+
+def test_fallback_reports_the_thresholds_of_the_backend_that_answered():
+    backend = FallbackEmbeddingBackend(DownBackend(), HashingEmbeddingBackend())
+    assert backend.medium_relevance_threshold == 0.5
+
+    backend.embed(["python"])
+
+    assert backend_label(backend) == "local"
+    assert backend.medium_relevance_threshold == 0.12
+    assert backend.high_relevance_threshold == 0.2
+
+
+def test_relevance_buckets_follow_the_backend_thresholds():
+    class Strict(HashingEmbeddingBackend):
+        medium_relevance_threshold = -1.0
+        high_relevance_threshold = 0.99
+
+    class Lenient(HashingEmbeddingBackend):
+        medium_relevance_threshold = -1.0
+        high_relevance_threshold = -0.5
+
+    tags = ["web framework", "routing library"]
+    strict = calculate_tag_similarity(README, tags, embedding_backend=Strict(), lexical_accept_threshold=None)
+    lenient = calculate_tag_similarity(README, tags, embedding_backend=Lenient(), lexical_accept_threshold=None)
+
+    assert strict["categorized_tags"]["high_relevance"] == []
+    assert sorted(lenient["categorized_tags"]["high_relevance"]) == sorted(tags)
+    assert np.isclose(strict["statistics"]["max_similarity"], lenient["statistics"]["max_similarity"])
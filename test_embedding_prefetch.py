@@ -0,0 +1,81 @@
+import numpy as np
+
+from tool.embedding_backends import EmbeddingBackend
+from tool.embedding_prefetch import PrefetchingEmbeddingBackend
+
+
+class SwitchingBackend(EmbeddingBackend):
+    """Embeds with the current model's marker value; can switch model on the n-th call"""
+
+    name = "auto"
+
+    def __init__(self, switch_on_call=None):
+        self.current = "neural"
+        self.calls = []
+        self.switch_on_call = switch_on_call
+
+    @property
+    def model(self):
+        return self.current
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        if self.switch_on_call == len(self.calls):
+            self.current = "local"
+        marker = 1.0 if self.current == "neural" else 2.0
+        return [np.full(4, marker, dtype=np.float32) for _ in texts]
+
+
+def _wait_for_worker(prefetcher):
+    prefetcher.close()
+    prefetcher._worker.join(timeout=5)
+
+
+def test_prefetched_vectors_are_reused():
+    backend = SwitchingBackend()
+    prefetcher = PrefetchingEmbeddingBackend(backend)
+    prefetcher.submit(["chunk one", "chunk two"])
+    _wait_for_worker(prefetcher)
+
+    vectors = prefetcher.embed(["chunk one", "chunk two", "tag"])
+
+    assert len(vectors) == 3
+    assert backend.calls[-1] == ["tag"]
+    assert prefetcher.stats()["reused"] == 2
+    assert prefetcher.stats()["embedded_on_demand"] == 1
+
+
+def test_vectors_from_a_previous_model_are_not_reused():
+    backend = SwitchingBackend()
+    prefetcher = PrefetchingEmbeddingBackend(backend)
+    prefetcher.submit(["chunk"])
+    _wait_for_worker(prefetcher)
+    backend.current = "local"
+
+    vectors = prefetcher.embed(["chunk"])
+
+    assert vectors[0][0] == 2.0
+    assert prefetcher.stats()["reused"] == 0
+
+
+def test_fallback_while_embedding_missing_texts_re_embeds_everything():
+    backend = SwitchingBackend(switch_on_call=2)
+    prefetcher = PrefetchingEmbeddingBackend(backend)
+    prefetcher.submit(["chunk"])
+    _wait_for_worker(prefetcher)
+
+    vectors = prefetcher.embed(["chunk", "tag"])
+
+    assert [v[0] for v in vectors] == [2.0, 2.0]
+    assert backend.calls[-1] == ["chunk", "tag"]
+
+
+def test_closed_prefetcher_ignores_submissions_but_still_embeds():
+    backend = SwitchingBackend()
+    prefetcher = PrefetchingEmbeddingBackend(backend)
+    _wait_for_worker(prefetcher)
+
+    prefetcher.submit(["late"])
+
+    assert prefetcher.stats()["submitted"] == 0
+    assert len(prefetcher.embed(["late"])) == 1
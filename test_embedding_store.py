@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from tool.embedding_store import EmbeddingStore
+
+
+def _vectors(count, dim=16, seed=0):
+    return list(np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32))
+
+
+@pytest.mark.parametrize("dtype, tolerance", [("float16", 1e-2), ("int8", 5e-2)])
+def test_round_trip_is_close_after_quantization(tmp_path, dtype, tolerance):
+    store = EmbeddingStore(str(tmp_path), "model", dtype=dtype)
+    vectors = _vectors(3)
+
+    assert store.put(["a", "b", "c"], vectors) == 3
+    stored = store.get(["a", "b", "c", "missing"])
+
+    assert stored[3] is None
+    for original, restored in zip(vectors, stored[:3]):
+        assert np.max(np.abs(original - restored)) <= tolerance * np.max(np.abs(original))
+
+
+def test_put_skips_texts_already_stored(tmp_path):
+    store = EmbeddingStore(str(tmp_path), "model")
+    store.put(["a"], _vectors(1))
+
+    assert store.put(["a", "b", "b"], _vectors(3, seed=1)) == 1
+    assert len(store) == 2
+
+
+def test_rows_are_shared_with_another_instance(tmp_path):
+    writer = EmbeddingStore(str(tmp_path), "model")
+    reader = EmbeddingStore(str(tmp_path), "model")
+    vectors = _vectors(2)
+
+    writer.put(["a", "b"], vectors)
+
+    assert np.allclose(reader.get(["b"])[0], vectors[1], atol=1e-2)
+
+
+def test_dimension_mismatch_is_rejected(tmp_path):
+    store = EmbeddingStore(str(tmp_path), "model")
+    store.put(["a"], _vectors(1, dim=16))
+
+    with pytest.raises(ValueError):
+        store.put(["b"], _vectors(1, dim=8))
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_interrupted_append_does_not_shift_later_rows(tmp_path, dtype):
+    store = EmbeddingStore(str(tmp_path), "model", dtype=dtype)
+    store.put(["a"], _vectors(1))
+
+    # A writer that died after appending its vectors (and scales) but before its keys
+    orphan, _ = store._quantize(np.vstack(_vectors(2, seed=7)))
+    with open(store._vecs_path, "ab") as f:
+        f.write(orphan.tobytes())
+    if dtype == "int8":
+        with open(store._scales_path, "ab") as f:
+            f.write(np.ones(2, dtype=np.float32).tobytes())
+
+    vectors = _vectors(2, seed=3)
+    store.put(["b", "c"], vectors)
+    fresh = EmbeddingStore(str(tmp_path), "model", dtype=dtype)
+
+    assert len(fresh) == 3
+    for original, restored in zip(vectors, fresh.get(["b", "c"])):
+        assert np.allclose(original, restored, atol=5e-2 * np.max(np.abs(original)))
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_compaction_keeps_the_newest_rows(tmp_path, dtype):
+    store = EmbeddingStore(str(tmp_path), "model", dtype=dtype, max_entries=8)
+    reader = EmbeddingStore(str(tmp_path), "model", dtype=dtype)
+    vectors = _vectors(10)
+    texts = [f"text {i}" for i in range(10)]
+    for text, vector in zip(texts[:8], vectors[:8]):
+        store.put([text], [vector])
+    assert reader.get(["text 0"])[0] is not None
+
+    # The 9th row compacts the store down to 5 rows before it is appended
+    for text, vector in zip(texts[8:], vectors[8:]):
+        store.put([text], [vector])
+    assert len(store) == 7
+    assert store.get(texts[:3]) == [None, None, None]
+    for original, restored in zip(vectors[3:], store.get(texts[3:])):
+        assert np.allclose(original, restored, atol=5e-2 * np.max(np.abs(original)))
+
+    # Another instance re-maps the replaced files instead of reading stale rows
+    assert reader.get(["text 0"])[0] is None
+    assert np.allclose(reader.get(["text 9"])[0], vectors[9], atol=5e-2 * np.max(np.abs(vectors[9])))
+    assert len(reader) == 7
+
+
+def test_batch_larger_than_the_bound_keeps_its_newest_texts(tmp_path):
+    store = EmbeddingStore(str(tmp_path), "model", max_entries=4)
+    store.put(["old"], _vectors(1))
+
+    assert store.put([f"text {i}" for i in range(6)], _vectors(6, seed=1)) == 4
+    assert len(store) == 4
+    assert store.get(["old", "text 1", "text 2"])[:2] == [None, None]
@@ -0,0 +1,136 @@
+import numpy as np
+
+from tool.extractive_summary import extractive_summary, split_sentences, textrank_scores
+from tool.prompt_packing import estimate_tokens
+
+README = """# Gin
+
+Gin is a HTTP web framework written in Go. It features a martini-like API with much better performance.
+
+```go
+r := gin.Default()
+```
+
+## Installation
+
+- Install Go 1.21 or newer first.
+- Then run go get to add Gin to your module.
+
+## Benchmarks
+
+| Benchmark | Ops |
+|-----------|-----|
+| GinRouter | 100 |
+
+Gin uses a custom version of HttpRouter. Routing is zero allocation and very fast.
+"""
+
+
+def _long_readme(sections=40):
+    parts = ["# Project\n\nProject is a toolkit for building fast data pipelines in Python."]
+    for i in range(sections):
+        parts.append(
+            f"## Section {i}\n\nSection {i} explains topic{i} in depth. "
+            f"It covers configuration of topic{i} and common pitfalls. "
+            "Read the docs for more details about every option."
+        )
+    return "\n\n".join(parts)
+
+
+def test_split_sentences_drops_code_and_table_rules():
+    headings, sentences = split_sentences(README)
+
+    assert [h["text"] for h in headings] == ["Gin", "Installation", "Benchmarks"]
+    texts = [s["text"] for s in sentences]
+    assert texts[0] == "Gin is a HTTP web framework written in Go."
+    assert "Install Go 1.21 or newer first." in texts
+    assert not any("gin.Default" in text for text in texts)
+    assert not any("---" in text for text in texts)
+    assert sentences[-1]["section"] == 2
+
+
+def test_text_that_fits_is_returned_unchanged():
+    result = extractive_summary(README, token_budget=10_000)
+
+    assert result["summary"] == README
+    assert result["summarized"] is False
+
+
+def test_summary_respects_budget_and_keeps_the_opening_sentence():
+    text = _long_readme()
+    budget = 300
+
+    result = extractive_summary(text, token_budget=budget)
+
+    assert result["summarized"] is True
+    assert result["tokens"] <= budget * 1.1
+    assert result["source_tokens"] > budget
+    assert "Project is a toolkit for building fast data pipelines in Python." in result["summary"]
+    assert result["summary"].startswith("# Project")
+
+
+def test_repeated_sentence_is_only_used_once():
+    result = extractive_summary(_long_readme(), token_budget=400)
+
+    assert result["summary"].count("Read the docs for more details about every option.") <= 1
+
+
+def test_textrank_ranks_the_hub_sentence_highest():
+    vectors = np.array([[1.0, 0.0], [0.7071, 0.7071], [0.0, 1.0]], dtype=np.float32)
+
+    scores = textrank_scores(vectors)
+
+    assert int(np.argmax(scores)) == 1
+    assert abs(scores.sum() - 1.0) < 1e-5
+    assert textrank_scores(np.zeros((0, 2))).size == 0
+
+
+def test_empty_text():
+    assert extractive_summary("", token_budget=10)["tokens"] == estimate_tokens("")
+
+
+def _assert_filled(text, budget=1000):
+    result = extractive_summary(text, token_budget=budget)
+
+    assert result["summarized"] is True
+    assert result["summary"].strip()
+    assert budget * 0.5 <= result["tokens"] <= budget * 1.1
+    return result
+
+
+def test_cjk_text_is_summarized():
+    text = "这是一个用于构建数据管道的工具包。它支持多种数据源和输出格式。" * 2000
+
+    _assert_filled(text)
+
+
+def test_unpunctuated_lowercase_prose_is_wrapped_into_pieces():
+    words = [f"term{i}" for i in range(500)]
+    text = " ".join(words[(i * 7) % len(words)] for i in range(20000))
+
+    result = _assert_filled(text)
+
+    assert result["method"] == "textrank"
+    assert result["sentences_used"] > 1
+
+
+def test_code_only_readme_falls_back_to_the_head():
+    text = "# Title\n\n```python\n" + "x = compute(1, 2)\n" * 5000 + "```\n"
+
+    result = _assert_filled(text)
+
+    assert result["method"] == "head"
+    assert result["summary"].startswith("# Title")
+
+
+def test_csv_is_summarized():
+    text = "name,age,city\n" + "".join(f"user{i},{20 + i % 50},city{i % 30}\n" for i in range(5000))
+
+    _assert_filled(text)
+
+
+def test_repeated_single_word_falls_back_to_the_head():
+    result = _assert_filled("word " * 100000)
+
+    assert result["method"] == "head"
+    assert result["summary"].startswith("word word")
@@ -0,0 +1,41 @@
+from tool.keyphrase_extractor import tfidf_keyphrases
+
+
+def test_repeated_phrase_beats_its_words():
+    text = "Vector search engine. The vector search engine is fast. Search it."
+
+    phrases = tfidf_keyphrases(text, top_k=3)
+
+    assert next(iter(phrases)) == "vector-search-engine"
+    assert phrases["vector-search-engine"] == 1.0
+    # Contained in the better-ranked phrase
+    assert "vector-search" not in phrases
+
+
+def test_stopwords_code_and_urls_are_ignored():
+    text = (
+        "Install the package and see the documentation at https://example.com/docs.\n\n"
+        "```bash\npip install graphql-client\n```\n"
+        "Use `graphql_client.connect()` to build GraphQL queries. GraphQL queries are typed."
+    )
+
+    phrases = tfidf_keyphrases(text)
+
+    assert "graphql-queries" in phrases
+    assert not any(word in phrase for phrase in phrases for word in ("install", "documentation", "example", "pip"))
+
+
+def test_terms_spread_over_every_section_rank_lower():
+    padding = " and the " * 150
+    sections = ["Toolkit overview." + padding, "Toolkit storage." + padding, "Toolkit raft, raft and raft." + padding]
+
+    phrases = tfidf_keyphrases("\n\n".join(sections))
+
+    # Both appear three times, but only raft is concentrated in one section
+    assert phrases["raft"] > phrases["toolkit"]
+
+
+def test_empty_and_invalid_input():
+    assert tfidf_keyphrases("") == {}
+    assert tfidf_keyphrases(None) == {}
+    assert tfidf_keyphrases("the and of") == {}
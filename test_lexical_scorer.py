@@ -0,0 +1,43 @@
+import numpy as np
+
+from tool.lexical_scorer import bm25_tag_chunk_scores, is_lexically_specific, lexical_tag_scores, tokenize
+
+
+def test_tokenize_keeps_plus_and_hash_suffixes():
+    assert tokenize("Written in C++, C# and F#; a+b") == ["written", "in", "c++", "c#", "and", "f#", "a", "b"]
+
+
+def test_cpp_does_not_match_plain_c():
+    results = lexical_tag_scores(["A small library written in C."], ["c++", "c#", "c"])
+
+    assert [r["coverage"] for r in results] == [0.0, 0.0, 1.0]
+
+
+def test_bm25_prefers_the_chunk_that_repeats_the_term():
+    chunks = ["Install with pip.", "Uses FastAPI. FastAPI routes are async.", "Licensed under MIT."]
+
+    matrices = bm25_tag_chunk_scores(chunks, ["fastapi", "docker"])
+
+    assert matrices["scores"].shape == (2, 3)
+    assert int(np.argmax(matrices["scores"][0])) == 1
+    assert not matrices["scores"][1].any()
+    assert 0.0 < matrices["scores"][0, 1] <= 1.0
+
+
+def test_partial_coverage_for_multi_term_tags():
+    results = lexical_tag_scores(["Machine translation models."], ["machine-learning"])
+
+    assert results[0]["coverage"] == 0.5
+
+
+def test_empty_inputs_give_empty_matrices():
+    assert bm25_tag_chunk_scores([], ["python"])["scores"].shape == (1, 0)
+    assert lexical_tag_scores([], ["python"]) == [{"lexical_score": 0.0, "coverage": 0.0, "best_chunk": None}]
+
+
+def test_short_and_generic_tags_are_not_lexically_specific():
+    assert not is_lexically_specific("go")
+    assert not is_lexically_specific("api")
+    assert not is_lexically_specific("web-framework")
+    assert is_lexically_specific("golang")
+    assert is_lexically_specific("rest-client")
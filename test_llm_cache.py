@@ -0,0 +1,90 @@
+import time
+
+from langchain_core.outputs import Generation
+
+import tool.llm_cache as llm_cache
+from tool.llm_cache import SQLiteLLMCache, llm_cache_bypass
+
+
+def _cache(tmp_path, **kwargs):
+    return SQLiteLLMCache(str(tmp_path / "llm_cache.sqlite"), **kwargs)
+
+
+def test_round_trip_is_keyed_by_prompt_and_llm_string(tmp_path):
+    cache = _cache(tmp_path)
+    cache.update("prompt", "model-a", [Generation(text="answer")])
+
+    assert cache.lookup("prompt", "model-a")[0].text == "answer"
+    assert cache.lookup("prompt", "model-b") is None
+    assert cache.lookup("other prompt", "model-a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_expired_entries_are_misses_and_deleted(tmp_path, monkeypatch):
+    cache = _cache(tmp_path, ttl_seconds=60)
+    cache.update("prompt", "llm", [Generation(text="answer")])
+
+    now = time.time()
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now + 61)
+
+    assert cache.lookup("prompt", "llm") is None
+    stats = cache.stats()
+    assert stats["expired"] == 1
+    assert stats["entries"] == 0
+
+
+def test_zero_ttl_never_expires(tmp_path, monkeypatch):
+    cache = _cache(tmp_path, ttl_seconds=0)
+    cache.update("prompt", "llm", [Generation(text="answer")])
+
+    now = time.time()
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now + 10 * 365 * 24 * 3600)
+
+    assert cache.lookup("prompt", "llm")[0].text == "answer"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: clock[0])
+    cache = _cache(tmp_path, max_entries=2)
+
+    for prompt in ("a", "b"):
+        clock[0] += 1
+        cache.update(prompt, "llm", [Generation(text=prompt)])
+    clock[0] += 1
+    assert cache.lookup("a", "llm") is not None  # "b" is now the least recently used
+    clock[0] += 1
+    cache.update("c", "llm", [Generation(text="c")])
+
+    assert cache.lookup("b", "llm") is None
+    assert cache.lookup("a", "llm") is not None
+    assert cache.lookup("c", "llm") is not None
+    assert cache.stats()["evicted"] == 1
+    assert cache.stats()["entries"] == 2
+
+
+def test_bypass_skips_lookup_but_still_writes(tmp_path):
+    cache = _cache(tmp_path)
+    cache.update("prompt", "llm", [Generation(text="old")])
+
+    with llm_cache_bypass():
+        assert cache.lookup("prompt", "llm") is None
+        cache.update("prompt", "llm", [Generation(text="new")])
+
+    assert cache.lookup("prompt", "llm")[0].text == "new"
+    assert cache.stats()["bypassed"] == 1
+
+
+def test_entries_are_shared_through_the_file(tmp_path):
+    _cache(tmp_path).update("prompt", "llm", [Generation(text="answer")])
+
+    assert _cache(tmp_path).lookup("prompt", "llm")[0].text == "answer"
+
+
+def test_rejects_empty_capacity(tmp_path):
+    try:
+        _cache(tmp_path, max_entries=0)
+    except ValueError:
+        return
+    raise AssertionError("Expected ValueError")
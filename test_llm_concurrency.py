@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+
+from tool.llm_concurrency import AIMDLimiter, classify_llm_error
+
+
+class ResourceExhausted(Exception):
+    pass
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def _failing(errors, result="ok"):
+    """Callable raising the given errors in turn, then returning ``result``"""
+    errors = list(errors)
+    calls = []
+
+    def fn():
+        calls.append(time.monotonic())
+        if errors:
+            raise errors.pop(0)
+        return result
+    return fn, calls
+
+
+def test_classify_llm_error():
+    assert classify_llm_error(ResourceExhausted("quota")) == "throttled"
+    assert classify_llm_error(Exception("429 Too Many Requests")) == "throttled"
+    assert classify_llm_error(DeadlineExceeded("slow")) == "timeout"
+    assert classify_llm_error(TimeoutError()) == "timeout"
+    assert classify_llm_error(ValueError("bad schema")) == "error"
+
+    try:
+        try:
+            raise ResourceExhausted("quota")
+        except ResourceExhausted as e:
+            raise RuntimeError("wrapped") from e
+    except RuntimeError as wrapped:
+        assert classify_llm_error(wrapped) == "throttled"
+
+
+def test_success_increases_limit_additively():
+    limiter = AIMDLimiter(initial=4, max_limit=8)
+    for _ in range(4):
+        limiter.call(lambda: None)
+
+    assert 4.9 < limiter.limit < 5.1
+
+
+def test_throttling_decreases_limit_once_per_window():
+    limiter = AIMDLimiter(initial=8, decrease=0.5, retry_base_delay=0.0)
+    epochs = [limiter._acquire(1.0) for _ in range(3)]
+    for epoch in epochs:
+        limiter._release(epoch, "throttled")
+
+    assert limiter.limit == 4
+    assert limiter.stats()["decreases"] == 1
+
+
+def test_limit_never_drops_below_min():
+    limiter = AIMDLimiter(initial=2, min_limit=1, decrease=0.5, max_retries=0)
+    for _ in range(3):
+        with pytest.raises(ResourceExhausted):
+            limiter.call(_failing([ResourceExhausted("quota")])[0])
+
+    assert limiter.limit == 1
+
+
+def test_throttled_calls_are_retried_and_plain_errors_are_not():
+    limiter = AIMDLimiter(retry_base_delay=0.0)
+    fn, calls = _failing([ResourceExhausted("quota")] * 2)
+    assert limiter.call(fn) == "ok"
+    assert len(calls) == 3
+
+    fn, calls = _failing([ValueError("bad schema")])
+    with pytest.raises(ValueError):
+        limiter.call(fn)
+    assert len(calls) == 1
+
+
+def test_timeouts_are_retried_at_most_max_timeout_retries():
+    limiter = AIMDLimiter(retry_base_delay=0.0, max_retries=5, max_timeout_retries=1)
+    fn, calls = _failing([DeadlineExceeded("slow")] * 3)
+
+    with pytest.raises(DeadlineExceeded):
+        limiter.call(fn)
+    assert len(calls) == 2
+    assert limiter.stats()["gave_up"] == 1
+
+
+def test_no_retry_starts_after_the_deadline():
+    limiter = AIMDLimiter(retry_base_delay=0.05, max_retries=50, deadline=0.2)
+    fn, calls = _failing([ResourceExhausted("quota")] * 50)
+
+    start = time.monotonic()
+    with pytest.raises(ResourceExhausted):
+        limiter.call(fn)
+
+    assert time.monotonic() - start < 0.3
+    assert limiter.stats()["deadline_exceeded"] == 1
+
+
+def test_calls_beyond_the_limit_wait_for_a_slot():
+    limiter = AIMDLimiter(initial=2, max_limit=2)
+    release = threading.Event()
+    threads = [threading.Thread(target=limiter.call, args=(release.wait,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+
+    assert limiter.stats()["in_flight"] == 2
+    assert limiter.stats()["waiting"] == 2
+
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert limiter.stats()["successes"] == 4
@@ -0,0 +1,130 @@
+import threading
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+from langchain_core.runnables import RunnableLambda
+
+from tool.llm_concurrency import AIMDLimiter
+from tool.llm_hedging import HedgedRunnable, HedgingPolicy
+from tool.llm_usage import record_llm_call, track_llm_usage
+
+
+def _warm_policy(latency=0.01, samples=5, budget=1.0):
+    policy = HedgingPolicy("test", min_samples=samples, budget=budget)
+    for _ in range(samples):
+        policy.record(latency)
+    return policy
+
+
+def test_no_hedge_before_enough_samples():
+    policy = HedgingPolicy("test", min_samples=5)
+
+    assert policy.hedge_delay() is None
+    assert HedgedRunnable(RunnableLambda(lambda x: x + 1), policy).invoke(1) == 2
+    assert policy.stats()["hedged"] == 0
+
+
+def test_slow_primary_loses_to_the_hedge():
+    calls = []
+    lock = threading.Lock()
+
+    def call(prompt):
+        with lock:
+            calls.append(prompt)
+            first = len(calls) == 1
+        if first:
+            time.sleep(0.5)
+            return "slow"
+        return "fast"
+
+    policy = _warm_policy()
+    assert HedgedRunnable(RunnableLambda(call), policy).invoke("prompt") == "fast"
+
+    stats = policy.stats()
+    assert stats["hedged"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_budget_limits_hedges():
+    policy = _warm_policy(budget=0.0)
+
+    result = HedgedRunnable(RunnableLambda(lambda x: time.sleep(0.05) or x), policy).invoke("prompt")
+
+    assert result == "prompt"
+    assert policy.stats()["budget_denied"] == 1
+    assert policy.stats()["hedged"] == 0
+
+
+def test_errors_propagate_when_every_attempt_fails():
+    def fail(_):
+        raise RuntimeError("boom")
+
+    policy = HedgingPolicy("test")
+    try:
+        HedgedRunnable(RunnableLambda(fail), policy).invoke("prompt")
+    except RuntimeError:
+        assert policy.stats()["failures"] == 1
+        return
+    raise AssertionError("Expected RuntimeError")
+
+
+class BusyLimiter:
+    waiting = 3
+
+    def slot_acquired_at(self):
+        return None
+
+
+def test_latency_is_measured_from_slot_acquisition():
+    limiter = AIMDLimiter(initial=1, max_limit=1)
+    policy = HedgingPolicy("test", min_samples=100)
+    runnable = HedgedRunnable(RunnableLambda(lambda x: limiter.call(lambda: time.sleep(0.05) or x)), policy, limiter)
+
+    holder = threading.Thread(target=limiter.call, args=(lambda: time.sleep(0.3),))
+    holder.start()
+    time.sleep(0.02)
+    assert runnable.invoke("prompt") == "prompt"
+    holder.join()
+
+    # Queued ~0.3s for the only slot, but the model answered in ~0.05s
+    assert policy.stats()["p50"] < 0.2
+
+
+def test_no_hedge_while_calls_queue_for_the_limiter():
+    policy = _warm_policy()
+
+    result = HedgedRunnable(RunnableLambda(lambda x: time.sleep(0.05) or x), policy, BusyLimiter()).invoke("prompt")
+
+    assert result == "prompt"
+    assert policy.stats()["hedged"] == 0
+    assert policy.stats()["limiter_busy"] == 1
+
+
+def test_loser_cost_is_recorded():
+    calls = []
+    lock = threading.Lock()
+    generation = ChatGeneration(message=AIMessage(
+        content="", usage_metadata={"input_tokens": 900, "output_tokens": 100, "total_tokens": 1000}
+    ))
+
+    def call(prompt):
+        with lock:
+            calls.append(prompt)
+            first = len(calls) == 1
+        if first:
+            time.sleep(0.3)
+        record_llm_call("gemini-2.5-flash", 0.1, result=[generation])
+        return "slow" if first else "fast"
+
+    policy = _warm_policy()
+    with track_llm_usage() as ledger:
+        assert HedgedRunnable(RunnableLambda(call), policy).invoke("prompt") == "fast"
+        time.sleep(0.5)
+
+    stats = policy.stats()
+    assert stats["losers_finished"] == 1
+    assert stats["loser_tokens"] == 1000
+    assert stats["loser_cost_usd"] > 0
+    # Both requests still show up in the run's ledger
+    assert ledger.summary()["totals"]["calls"] == 2
@@ -0,0 +1,28 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+import tool.llm_registry as llm_registry
+from tool.llm_usage import track_llm_usage
+
+
+def test_async_calls_go_through_the_limiter(monkeypatch):
+    def fake_generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+    async def native_agenerate(self, *args, **kwargs):
+        raise AssertionError("the native async client bypasses the limiter")
+
+    monkeypatch.setattr(ChatGoogleGenerativeAI, "_generate", fake_generate)
+    monkeypatch.setattr(ChatGoogleGenerativeAI, "_agenerate", native_agenerate)
+    llm = llm_registry._limited_chat_class()(model="models/gemini-2.5-flash", google_api_key="dummy")
+    calls = llm_registry.llm_limiter.stats()["calls"]
+
+    with track_llm_usage() as ledger:
+        message = asyncio.run(llm.ainvoke([HumanMessage(content="hi")]))
+
+    assert message.content == "ok"
+    assert llm_registry.llm_limiter.stats()["calls"] == calls + 1
+    assert ledger.summary()["totals"]["calls"] == 1
@@ -0,0 +1,86 @@
+import threading
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from tool.batch_packing import BatchPacker
+from tool.llm_cache import SQLiteLLMCache
+from tool.llm_usage import llm_usage_stage, record_llm_call, split_llm_call, track_llm_usage
+
+LLM_STRING = '{"kwargs": {"model": "models/gemini-2.5-flash", "temperature": 0.4}}---[]'
+
+
+def _generation(prompt_tokens, completion_tokens):
+    usage = {
+        "input_tokens": prompt_tokens,
+        "output_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+    return ChatGeneration(message=AIMessage(content="{}", usage_metadata=usage))
+
+
+def test_cache_hit_is_a_zero_cost_call_with_saved_cost(tmp_path):
+    cache = SQLiteLLMCache(str(tmp_path / "cache.sqlite"))
+    cache.update("prompt", LLM_STRING, [_generation(1000, 100)])
+
+    with track_llm_usage() as ledger, llm_usage_stage("candidate"):
+        assert cache.lookup("prompt", LLM_STRING) is not None
+        record_llm_call("gemini-2.5-flash", 1.0, result=[_generation(1000, 100)])
+
+    totals = ledger.summary()["totals"]
+    assert totals["calls"] == 2
+    assert totals["cached_calls"] == 1
+    assert totals["cached_tokens"] == 1100
+    assert totals["prompt_tokens"] == 1000
+    assert totals["cache_hit_rate"] == 0.5
+    assert totals["saved_cost_usd"] == totals["cost_usd"] > 0
+    assert ledger.calls()[0]["model"] == "gemini-2.5-flash"
+
+
+def test_cache_miss_records_nothing(tmp_path):
+    cache = SQLiteLLMCache(str(tmp_path / "cache.sqlite"))
+
+    with track_llm_usage() as ledger:
+        assert cache.lookup("prompt", LLM_STRING) is None
+
+    assert ledger.summary()["totals"]["calls"] == 0
+
+
+def test_split_keeps_token_totals_and_splits_cost():
+    call = {
+        "stage": "candidate", "model": "gemini-2.5-flash", "prompt_tokens": 1001, "completion_tokens": 7,
+        "total_tokens": 1008, "latency_seconds": 2.0, "retries": 0, "failed": False,
+        "cached": False, "cost_usd": 0.9, "saved_cost_usd": 0.0
+    }
+
+    shares = split_llm_call(call, [100, 200, 300])
+
+    assert sum(share["prompt_tokens"] for share in shares) == 1001
+    assert sum(share["completion_tokens"] for share in shares) == 7
+    assert [round(share["cost_usd"], 6) for share in shares] == [0.15, 0.3, 0.45]
+    assert all(share["latency_seconds"] == 2.0 for share in shares)
+
+
+def test_packed_call_is_billed_to_every_repository_by_token_share():
+    def pack_fn(items):
+        record_llm_call("gemini-2.5-flash", 0.5, result=[_generation(3000, 300)])
+        return {i: repo for i, (repo, _) in enumerate(items)}
+
+    packer = BatchPacker("candidate", pack_fn, max_items=2, window=2.0)
+    ledgers = {}
+
+    def run(repo, tokens):
+        with track_llm_usage() as ledger:
+            packer.submit(repo, None, tokens=tokens)
+        ledgers[repo] = ledger.summary()["totals"]
+
+    threads = [threading.Thread(target=run, args=args) for args in (("a/one", 500), ("b/two", 1000))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert ledgers["a/one"]["prompt_tokens"] == 1000
+    assert ledgers["b/two"]["prompt_tokens"] == 2000
+    assert ledgers["a/one"]["calls"] == ledgers["b/two"]["calls"] == 1
+    assert packer.stats()["packs"] == 1
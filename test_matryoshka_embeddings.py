@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+import tool.embedding_store as embedding_store
+import tool.ollama_embeddings as ollama_embeddings
+from tool.embedding_backends import OllamaEmbeddingBackend
+from tool.ollama_embeddings import embedding_store_name, get_ollama_embeddings
+from tool.vector_utils import truncate_embeddings
+
+FULL = [3.0, 4.0, 12.0, 0.0]
+
+
+class FakeResponse:
+    def __init__(self, texts):
+        self.texts = texts
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"embeddings": [FULL for _ in self.texts]}
+
+
+@pytest.fixture
+def ollama(monkeypatch, tmp_path):
+    requests_sent = []
+
+    def post(url, json, timeout):
+        requests_sent.append(json["input"])
+        return FakeResponse(json["input"])
+
+    monkeypatch.setattr(ollama_embeddings, "_check_ollama_health", lambda **kwargs: True)
+    monkeypatch.setattr(ollama_embeddings.requests, "post", post)
+    monkeypatch.setattr(embedding_store, "EMBEDDING_STORE_DIR", str(tmp_path))
+    monkeypatch.setattr(embedding_store, "EMBEDDING_STORE_ENABLED", True)
+    monkeypatch.setattr(embedding_store, "_stores", {})
+    return requests_sent
+
+
+def test_truncation_keeps_the_prefix_and_renormalizes():
+    (vector,) = truncate_embeddings([np.array(FULL)], 2)
+
+    assert vector.dtype == np.float32
+    assert np.allclose(vector, [0.6, 0.8])
+    assert np.isclose(np.linalg.norm(vector), 1.0)
+
+
+def test_truncation_wider_than_the_vector_only_normalizes():
+    (vector,) = truncate_embeddings([np.array(FULL)], 16)
+
+    assert vector.shape == (4,)
+    assert np.allclose(vector, np.array(FULL) / 13.0)
+
+
+@pytest.mark.parametrize("dimensions", [0, -1, 2.5])
+def test_truncation_rejects_invalid_widths(dimensions):
+    with pytest.raises(ValueError):
+        truncate_embeddings([np.array(FULL)], dimensions)
+
+
+def test_store_names_key_model_and_width():
+    assert embedding_store_name("nomic-embed-text") == "nomic-embed-text"
+    assert embedding_store_name("nomic-embed-text", 256) == "nomic-embed-text@256"
+    assert OllamaEmbeddingBackend(model="nomic-embed-text", dimensions=128).model == "nomic-embed-text@128"
+
+
+def test_each_width_has_its_own_store(ollama):
+    full = get_ollama_embeddings(["python"], dimensions=None)
+    truncated = get_ollama_embeddings(["python"], dimensions=2)
+    again = get_ollama_embeddings(["python"], dimensions=2)
+
+    assert full[0].shape == (4,)
+    assert truncated[0].shape == again[0].shape == (2,)
+    assert np.allclose(again[0], [0.6, 0.8], atol=1e-2)
+    # The truncated vector is not served from the full-width store, and is stored once
+    assert ollama == [["python"], ["python"]]
+    model = ollama_embeddings.EMBED_MODEL
+    assert set(embedding_store._stores) == {model, f"{model}@2"}
@@ -0,0 +1,59 @@
+from langchain_core.runnables import RunnableLambda
+
+import agents.metadata_extractor_agent as metadata_extractor_agent
+from schemas import MetadataRequest
+from tool.prompt_packing import estimate_tokens
+
+
+def _long_readme(sections=60):
+    parts = ["# Tagger\n\nTagger suggests GitHub topics for a repository from its README."]
+    for i in range(sections):
+        parts.append(
+            f"## Section {i}\n\n"
+            f"Section {i} explains how the tagger handles component{i} in detail. "
+            f"It covers configuration, caching and deployment of component{i} for large teams. "
+            + " ".join(f"Step {j} of component{i} validates input number {j}." for j in range(12))
+        )
+    return "\n\n".join(parts)
+
+
+def _fake_llm(prompts):
+    def respond(prompt):
+        prompts.append(prompt)
+        return metadata_extractor_agent.MetadataExtractorResponse(
+            title="Tagger", keywords=["tags"], category="tools", summary="", entities=[],
+            sentiment="neutral", language="en", word_count=0
+        )
+    return RunnableLambda(respond)
+
+
+def test_over_budget_content_is_summarized_before_the_llm_call(monkeypatch):
+    prompts = []
+    monkeypatch.setattr(metadata_extractor_agent, "get_structured_llm", lambda *args, **kwargs: _fake_llm(prompts))
+    content = _long_readme()
+    assert estimate_tokens(content) > 2 * metadata_extractor_agent.METADATA_TOKEN_BUDGET
+
+    result = metadata_extractor_agent.extract_metadata(content, routing=False)
+
+    assert result["summarization"]["summarized"]
+    assert result["summarization"]["tokens"] <= metadata_extractor_agent.METADATA_TOKEN_BUDGET
+    assert result["word_count"] == len(content.split())
+    assert "warning" not in result
+    assert "Tagger suggests GitHub topics" in prompts[0]
+    assert estimate_tokens(prompts[0]) < estimate_tokens(content)
+
+
+def test_short_content_is_sent_unchanged(monkeypatch):
+    prompts = []
+    monkeypatch.setattr(metadata_extractor_agent, "get_structured_llm", lambda *args, **kwargs: _fake_llm(prompts))
+
+    result = metadata_extractor_agent.extract_metadata("A small library for parsing dates.", routing=False)
+
+    assert "summarization" not in result
+    assert "A small library for parsing dates." in prompts[0]
+
+
+def test_metadata_request_accepts_content_long_enough_to_summarize():
+    content = _long_readme()
+
+    assert MetadataRequest(content=content).content == content
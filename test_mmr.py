@@ -0,0 +1,82 @@
+import numpy as np
+
+from agents.tag_pruning_agent import prune_tags_mmr
+from tool.embedding_backends import EmbeddingBackend
+from tool.mmr import mmr_select
+
+
+class FixedBackend(EmbeddingBackend):
+    """Returns a preset vector per tag; raises for tags it does not know"""
+
+    name = "fixed"
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    @property
+    def model(self):
+        return "fixed"
+
+    def embed(self, texts):
+        return [np.asarray(self.vectors[text], dtype=np.float32) for text in texts]
+
+
+def test_lambda_one_is_pure_relevance():
+    vectors = [np.array([1.0, 0.0]), np.array([1.0, 0.01]), np.array([0.0, 1.0])]
+
+    assert mmr_select([0.9, 0.85, 0.6], vectors, top_n=3, lambda_mult=1.0) == [0, 1, 2]
+
+
+def test_near_duplicate_is_passed_over_for_a_different_item():
+    vectors = [np.array([1.0, 0.0]), np.array([1.0, 0.01]), np.array([0.0, 1.0])]
+
+    assert mmr_select([0.9, 0.85, 0.6], vectors, top_n=2, lambda_mult=0.5) == [0, 2]
+
+
+def test_top_n_larger_than_input_and_empty_input():
+    vectors = [np.array([1.0, 0.0]), np.array([0.0, 1.0])]
+
+    assert sorted(mmr_select([0.5, 0.4], vectors, top_n=5)) == [0, 1]
+    assert mmr_select([], [], top_n=3) == []
+    assert mmr_select([0.5], [np.array([1.0])], top_n=0) == []
+
+
+def test_invalid_arguments_raise():
+    for args, kwargs in (
+        (([0.5], [np.array([1.0])], 1), {"lambda_mult": 1.5}),
+        (([0.5, 0.4], [np.array([1.0])], 1), {}),
+    ):
+        try:
+            mmr_select(*args, **kwargs)
+        except ValueError:
+            continue
+        raise AssertionError(f"Expected ValueError for {args} {kwargs}")
+
+
+def test_pruning_drops_the_synonym_and_keeps_order_of_selection():
+    backend = FixedBackend({
+        "react": [1.0, 0.0, 0.0], "reactjs": [1.0, 0.02, 0.0],
+        "typescript": [0.0, 1.0, 0.0], "testing": [0.0, 0.0, 1.0]
+    })
+    tag_similarities = [
+        {"tag": "react", "similarity_score": None},
+        {"tag": "reactjs", "similarity_score": 0.8},
+        {"tag": "typescript", "similarity_score": 0.7},
+        {"tag": "testing", "similarity_score": 0.6},
+    ]
+
+    result = prune_tags_mmr(tag_similarities, top_n=3, lambda_mult=0.5, embedding_backend=backend)
+
+    assert result["method"] == "mmr"
+    assert result["selected_tags"] == ["react", "typescript", "testing"]
+    assert result["pruned_tags"] == ["reactjs"]
+
+
+def test_pruning_passes_through_short_lists_and_falls_back_without_embeddings():
+    tag_similarities = [{"tag": t, "similarity_score": s} for t, s in (("a", 0.5), ("b", 0.9), ("c", 0.7))]
+
+    assert prune_tags_mmr(tag_similarities, top_n=3)["method"] == "passthrough"
+
+    result = prune_tags_mmr(tag_similarities, top_n=2, embedding_backend=FixedBackend({}))
+    assert result["method"] == "top_n"
+    assert result["selected_tags"] == ["b", "c"]
@@ -0,0 +1,71 @@
+from langchain_core.runnables import RunnableLambda
+
+import agents.tag_critic_agent as tag_critic_agent
+import agents.tag_polisher_agent as tag_polisher_agent
+from tool.model_router import ModelRouter, difficulty_features
+from tool.tag_critic_models import TagEvaluation, TagEvaluationList
+
+ENGLISH = "Tagger suggests GitHub topics for a repository from the text of its README file."
+CODE = "\n".join(["```python", "def main(argv):", "    return {k: v for k, v in argv.items()}", "```"] * 5)
+GERMAN = " ".join(["Dieses Werkzeug schlägt Themen für ein Projekt anhand seiner Beschreibung vor."] * 4)
+
+
+def test_difficulty_features():
+    assert difficulty_features(ENGLISH)["code"] == 0.0
+    assert difficulty_features(ENGLISH)["language"] == 0.0
+    assert difficulty_features(CODE)["code"] == 1.0
+    assert difficulty_features(GERMAN)["language"] > 0.5
+
+
+def test_route_escalates_hard_inputs():
+    router = ModelRouter(fast_model="fast-model", strong_model="strong-model", threshold=0.3)
+
+    assert router.route(ENGLISH)["model"] == "fast-model"
+    assert router.route(CODE)["model"] == "strong-model"
+    assert router.route(GERMAN)["tier"] == "strong"
+
+
+def test_stats_report_observed_latency_per_agent_and_tier():
+    router = ModelRouter(threshold=0.3)
+    router.record(router.route(ENGLISH, agent="tag_critic_agent"), 2.0)
+    router.record(router.route(ENGLISH, agent="tag_critic_agent"), 4.0, failed=True)
+    router.record(router.route(CODE, agent="metadata_extractor_agent"), 1.0)
+
+    stats = router.stats()
+
+    assert stats["agents"]["tag_critic_agent"]["fast"] == {"calls": 2, "failures": 1, "mean_latency": 3.0}
+    assert stats["agents"]["metadata_extractor_agent"]["strong"]["calls"] == 1
+    assert stats["escalation_rate"] == 1 / 3
+    assert "estimated_seconds_saved" not in stats
+
+
+class _FakeLLM:
+    def __init__(self, model):
+        self.model = model
+
+    def with_structured_output(self, schema):
+        return RunnableLambda(lambda prompt: TagEvaluationList(evaluations=[TagEvaluation(tag="python", score=90)]))
+
+    def invoke(self, prompt):
+        return type("Message", (), {"content": '{"polished_tags": ["python"]}'})()
+
+
+def test_critic_and_polisher_calls_are_routed(monkeypatch):
+    router = ModelRouter(fast_model="fast-model", strong_model="strong-model")
+    models = []
+
+    def fake_get_llm(agent, model=None):
+        models.append((agent, model))
+        return _FakeLLM(model)
+
+    for module in (tag_critic_agent, tag_polisher_agent):
+        monkeypatch.setattr(module, "model_router", router)
+        monkeypatch.setattr(module, "get_llm", fake_get_llm)
+
+    critic = tag_critic_agent.critique_tags(["python"], context=ENGLISH, context_token_budget=None, routing=True)
+    polisher = tag_polisher_agent.polish_tags(["python"], routing=True)
+
+    assert critic["model_routing"]["model"] == "fast-model"
+    assert polisher["model_routing"]["model"] == "fast-model"
+    assert models == [("tag_critic_agent", "fast-model"), ("tag_polisher_agent", "fast-model")]
+    assert set(router.stats()["agents"]) == {"tag_critic_agent", "tag_polisher_agent"}
@@ -0,0 +1,43 @@
+from tool.prompt_packing import AdaptivePackSizer, estimate_tokens
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abc") == 1
+    assert estimate_tokens("a" * 400) == 100
+
+
+def test_packs_close_on_size_and_budget():
+    sizer = AdaptivePackSizer(token_budget=1000, initial_pack_size=3)
+
+    assert sizer.pack(["a" * 40] * 7) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert sizer.pack(["a" * 1600, "a" * 1600, "a" * 1600]) == [[0, 1], [2]]
+
+
+def test_oversized_item_gets_its_own_pack_and_overhead_counts():
+    sizer = AdaptivePackSizer(token_budget=1000, initial_pack_size=8)
+
+    assert sizer.pack(["a" * 40, "a" * 8000, "a" * 40]) == [[0], [1], [2]]
+    assert sizer.pack(["a" * 1600] * 2, overhead_tokens=700) == [[0], [1]]
+
+
+def test_pack_size_halves_when_slow_or_failed_and_grows_when_fast():
+    sizer = AdaptivePackSizer(max_pack_size=6, target_latency=8.0, initial_pack_size=4)
+
+    assert sizer.observe(4, 9.0) == 2
+    assert sizer.observe(2, 1.0, failed=True) == 1
+    assert sizer.observe(1, 1.0) == 2
+    assert sizer.observe(1, 1.0) == 2  # A pack that was not full says nothing about a larger one
+    assert sizer.observe(2, 5.0) == 2  # Neither slow nor fast
+    for _ in range(10):
+        sizer.observe(sizer.pack_size, 1.0)
+    assert sizer.pack_size == 6
+
+
+def test_rejects_invalid_settings():
+    for kwargs in ({"token_budget": 0}, {"max_pack_size": 0}, {"target_latency": 0}):
+        try:
+            AdaptivePackSizer(**kwargs)
+        except ValueError:
+            continue
+        raise AssertionError(f"Expected ValueError for {kwargs}")
@@ -0,0 +1,164 @@
+import time
+
+import numpy as np
+
+import tool.semantic_cache as semantic_cache
+from tool.embedding_backends import EmbeddingBackend, FallbackEmbeddingBackend, HashingEmbeddingBackend
+from tool.semantic_cache import SemanticCache, normalize_request
+
+
+class CountingBackend(HashingEmbeddingBackend):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        return super().embed(texts)
+
+
+class FlakyNeuralBackend(EmbeddingBackend):
+    """Stands in for Ollama: one fixed direction per text, failing while ``down``"""
+
+    name = "ollama"
+    down = False
+
+    @property
+    def model(self):
+        return "neural-8"
+
+    def embed(self, texts):
+        if FlakyNeuralBackend.down:
+            raise Exception("connection refused")
+        return [np.eye(8, dtype=np.float32)[len(text) % 8] for text in texts]
+
+
+class TruncatingBackend(HashingEmbeddingBackend):
+    """Stands in for a neural model with a context window: only the first 200 characters count"""
+
+    def embed(self, texts):
+        return super().embed([text[:200] for text in texts])
+
+
+def test_normalize_request_ignores_case_width_and_whitespace():
+    assert normalize_request("  What IS\tLangGraph ") == normalize_request("what is langgraph")
+
+
+def test_near_duplicate_hits_and_different_request_misses():
+    cache = SemanticCache("t", threshold=0.9, backend=HashingEmbeddingBackend())
+    cache.get_or_compute("research ai trends in 2024, write a summary, and review it", lambda: "first")
+
+    result, info = cache.get_or_compute("research ai trends in 2024 write a summary and review it please", lambda: "second")
+    assert (result, info["hit"]) == ("first", True)
+    assert 0.9 <= info["similarity"] < 1.0
+
+    assert cache.get_or_compute("explain kubernetes operators", lambda: "third") == ("third", {"hit": False})
+
+
+def test_threshold_defaults_to_the_backend_near_duplicate_threshold():
+    cache = SemanticCache("t", backend=HashingEmbeddingBackend())
+    cache.get_or_compute("extract metadata from this react ui library readme", lambda: "react")
+
+    # ~0.93 with hashing vectors: close, but a different request
+    result, info = cache.get_or_compute("extract metadata from this vue ui library readme", lambda: "vue")
+
+    assert (result, info["hit"]) == ("vue", False)
+
+
+def test_entries_expire_after_ttl():
+    cache = SemanticCache("t", ttl_seconds=0.05, backend=HashingEmbeddingBackend())
+    cache.get_or_compute("a request", lambda: 1)
+    time.sleep(0.1)
+
+    assert cache.get_or_compute("a request", lambda: 2) == (2, {"hit": False})
+    assert cache.stats()["expired"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticCache("t", max_entries=2, backend=HashingEmbeddingBackend())
+    cache.get_or_compute("alpha request", lambda: "a")
+    cache.get_or_compute("beta request", lambda: "b")
+    cache.get_or_compute("alpha request", lambda: "unused")  # alpha is now the most recent
+    cache.get_or_compute("gamma request", lambda: "c")
+
+    assert cache.get_or_compute("alpha request", lambda: "a2")[0] == "a"
+    assert cache.get_or_compute("beta request", lambda: "b2")[0] == "b2"
+    assert cache.stats()["evicted"] >= 1
+
+
+def test_bypass_skips_lookup_and_embedding():
+    backend = CountingBackend()
+    cache = SemanticCache("t", backend=backend)
+    cache.get_or_compute("a request", lambda: "old")
+
+    calls = backend.calls
+    assert cache.get_or_compute("a request", lambda: "new", bypass=True) == ("new", {"hit": False})
+    assert backend.calls == calls
+    assert cache.get_or_compute("A  request", lambda: "unused")[0] == "new"
+
+
+def test_uncacheable_results_are_not_stored():
+    cache = SemanticCache("t", backend=HashingEmbeddingBackend())
+    cache.get_or_compute("a request", lambda: "Error: boom", cacheable=lambda r: not r.startswith("Error:"))
+
+    assert cache.get_or_compute("a request", lambda: "ok") == ("ok", {"hit": False})
+
+
+def test_auto_backend_fallback_lasts_one_lookup(monkeypatch):
+    monkeypatch.setattr(
+        semantic_cache, "get_embedding_backend",
+        lambda backend, use_store=True: FallbackEmbeddingBackend(FlakyNeuralBackend(), HashingEmbeddingBackend())
+    )
+    cache = SemanticCache("t", backend="auto")
+    cache.get_or_compute("first request", lambda: 1)
+
+    FlakyNeuralBackend.down = True
+    try:
+        cache.get_or_compute("second request", lambda: 2)
+    finally:
+        FlakyNeuralBackend.down = False
+    cache.get_or_compute("third request", lambda: 3)
+
+    assert cache.stats()["embedding_models"] == {"neural-8": 2, "hashing-ngram-512": 1}
+
+
+def test_long_documents_sharing_a_prefix_do_not_collide():
+    prefix = "fastapi service that extracts repository metadata with langgraph agents. " * 40
+    cache = SemanticCache("t", backend=TruncatingBackend())
+    cache.get_or_compute(prefix + "Written in Python.", lambda: "python")
+
+    result, info = cache.get_or_compute(prefix + "Ported to Rust.", lambda: "rust")
+
+    assert (result, info["hit"]) == ("rust", False)
+    assert cache.stats()["exact_only_lookups"] == 2
+    assert cache.get_or_compute(prefix + "Written in  python.", lambda: "unused")[0] == "python"
+
+
+def test_semantic_matching_applies_to_short_requests_only():
+    prefix = "fastapi service that extracts repository metadata. "
+    cache = SemanticCache("t", backend=TruncatingBackend(), max_semantic_chars=10000)
+    cache.get_or_compute(prefix * 10 + "Written in Python.", lambda: "python")
+
+    # Without the length guard the truncated vectors are identical
+    assert cache.get_or_compute(prefix * 10 + "Ported to Rust.", lambda: "rust")[1]["hit"] is True
+
+
+def test_content_namespaces_are_exact_only(monkeypatch):
+    monkeypatch.setattr(semantic_cache, "SEMANTIC_CACHE_ENABLED", True)
+    monkeypatch.setattr(semantic_cache, "_caches", {})
+
+    assert semantic_cache.get_semantic_cache("agent_metadata").semantic is False
+    assert semantic_cache.get_semantic_cache("agent_execute").semantic is True
+
+
+def test_requests_are_embedded_without_the_shared_store(monkeypatch):
+    calls = []
+
+    def fake_backend(backend, use_store=True):
+        calls.append(use_store)
+        return HashingEmbeddingBackend()
+
+    monkeypatch.setattr(semantic_cache, "get_embedding_backend", fake_backend)
+    SemanticCache("t", backend="auto").get_or_compute("a request", lambda: 1)
+
+    assert calls == [False]
@@ -0,0 +1,63 @@
+import threading
+import time
+
+from langchain_core.runnables import RunnableLambda
+
+import agents.tag_candidate_agent as tag_candidate_agent
+from agents.tag_candidate_agent import ChunkTags, _tag_chunks_individually, generate_tag_candidates
+
+# The first chunk answers last, the third fails
+CHUNKS = ["alpha chunk", "beta chunk", "broken chunk", "delta chunk"]
+DELAYS = {"alpha": 0.3, "beta": 0.1, "broken": 0.05, "delta": 0.0}
+
+
+def _fake_structured_llm(monkeypatch):
+    lock = threading.Lock()
+    state = {"current": 0, "peak": 0}
+
+    def call(prompt):
+        name = next(word for word in DELAYS if f"{word} chunk" in prompt)
+        with lock:
+            state["current"] += 1
+            state["peak"] = max(state["peak"], state["current"])
+        try:
+            time.sleep(DELAYS[name])
+            if name == "broken":
+                raise RuntimeError("model error")
+            return ChunkTags(tags=[name, "shared"])
+        finally:
+            with lock:
+                state["current"] -= 1
+
+    monkeypatch.setattr(tag_candidate_agent, "get_structured_llm", lambda schema, **kwargs: RunnableLambda(call))
+    return state
+
+
+def test_results_keep_chunk_order_while_tags_stream_in_completion_order(monkeypatch):
+    _fake_structured_llm(monkeypatch)
+    emitted = []
+
+    results = _tag_chunks_individually(CHUNKS, max_concurrency=4, on_tags=emitted.append)
+
+    assert [r.tags[0] for r in results if isinstance(r, ChunkTags)] == ["alpha", "beta", "delta"]
+    assert isinstance(results[2], RuntimeError)
+    # Completion order: the slow first chunk is emitted last
+    assert [tags[0] for tags in emitted] == ["delta", "beta", "alpha"]
+
+
+def test_max_concurrency_bounds_calls_in_flight(monkeypatch):
+    state = _fake_structured_llm(monkeypatch)
+
+    _tag_chunks_individually(CHUNKS, max_concurrency=2)
+
+    assert state["peak"] == 2
+
+
+def test_a_failing_chunk_does_not_fail_the_others(monkeypatch, capsys):
+    _fake_structured_llm(monkeypatch)
+    monkeypatch.setattr(tag_candidate_agent, "chunk_text", lambda text, **kwargs: CHUNKS)
+
+    tags = generate_tag_candidates("readme", max_concurrency=4, packing=False, routing=False, hedging=False)
+
+    assert tags == ["alpha", "shared", "beta", "delta"]
+    assert "Error processing chunk 3: model error" in capsys.readouterr().out
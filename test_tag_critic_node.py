@@ -0,0 +1,48 @@
+from langchain_core.runnables import RunnableLambda
+
+import agents.tag_critic_agent as tag_critic_agent
+from tool.tag_critic_models import TagEvaluation, TagEvaluationList
+from workflows.nodes import tag_critic_node
+
+README = "\n\n".join(
+    f"## Section {i}\nA Python web framework with async request handling and typed routes. " * 3
+    for i in range(20)
+)
+
+
+class _FakeLLM:
+    def with_structured_output(self, schema):
+        return RunnableLambda(lambda prompt: TagEvaluationList(
+            evaluations=[TagEvaluation(tag=tag, score=90) for tag in ("python", "web-framework")]
+        ))
+
+
+def _state(tag_similarities):
+    return {
+        "readme_content": README,
+        "similarity_analysis": {"tag_similarities": tag_similarities},
+        "options": {"critic_combined": False}
+    }
+
+
+def _run(monkeypatch, tag_similarities):
+    monkeypatch.setattr(tag_critic_agent, "get_llm", lambda agent, model=None: _FakeLLM())
+    return tag_critic_node(_state(tag_similarities))["tag_critic"]
+
+
+def test_digest_is_used_when_no_tag_has_supporting_chunks(monkeypatch):
+    critic = _run(monkeypatch, [
+        {"tag": "python", "supporting_chunks": []},
+        {"tag": "web-framework"}
+    ])
+
+    assert critic["context_digest"]["mode"] == "digest"
+
+
+def test_supporting_chunks_are_used_when_any_tag_has_them(monkeypatch):
+    critic = _run(monkeypatch, [
+        {"tag": "python", "supporting_chunks": [0, 3]},
+        {"tag": "web-framework", "supporting_chunks": []}
+    ])
+
+    assert critic["context_digest"]["mode"] == "retrieval"
@@ -0,0 +1,161 @@
+from langchain_core.runnables import RunnableLambda
+
+from agents.prompts import tag_critic_eval_prompt, tag_critic_eval_revise_prompt, tag_critic_revise_prompt
+from tool.tag_critic_models import RevisionModel, RevisionModelList, TagEvaluation, TagEvaluationList, TagEvaluationRevisionList
+from tool.tag_critic_rubric import evaluate_tags_rubric, match_evaluations
+
+
+def _evaluation(tag, score=80.0):
+    return TagEvaluation(tag=tag, score=score)
+
+
+class EchoingLLM:
+    """Fake chat model that scores every tag in the prompt, echoing it in another spelling"""
+
+    def __init__(self, tags, spell=lambda tag: tag.upper().replace("-", " ")):
+        self.tags = tags
+        self.spell = spell
+        self.evaluated = []
+
+    def with_structured_output(self, schema):
+        def respond(prompt):
+            if schema is RevisionModelList:
+                return RevisionModelList(revisions=[])
+            tags = [line[2:] for line in prompt.splitlines() if line[2:] in self.tags]
+            self.evaluated.extend(tags)
+            return TagEvaluationList(evaluations=[_evaluation(self.spell(tag)) for tag in tags])
+        return RunnableLambda(respond)
+
+
+def test_exact_and_slug_matches_use_the_shard_spelling():
+    matched = match_evaluations(
+        ["machine-learning", "React"],
+        [_evaluation("react", 90), _evaluation("Machine Learning", 75)]
+    )
+
+    assert matched["machine-learning"].tag == "machine-learning"
+    assert matched["machine-learning"].score == 75
+    assert matched["react"].tag == "React"
+    assert matched["react"].score == 90
+
+
+def test_unmatched_evaluations_fall_back_to_position():
+    matched = match_evaluations(["k8s", "python"], [_evaluation("kubernetes", 60), _evaluation("python", 95)])
+
+    assert matched["k8s"].score == 60
+    assert matched["python"].score == 95
+
+
+def test_repeated_evaluation_is_not_given_to_another_tag():
+    matched = match_evaluations(["python", "rust"], [_evaluation("python", 95), _evaluation("Python", 10)])
+
+    assert set(matched) == {"python"}
+    assert matched["python"].score == 95
+
+
+def test_respelled_tags_are_evaluated_once_and_kept():
+    tags = ["machine-learning", "python"]
+    llm = EchoingLLM(tags)
+
+    result = evaluate_tags_rubric(
+        tags,
+        llm=llm,
+        tag_critic_eval_prompt=tag_critic_eval_prompt,
+        tag_critic_revise_prompt=tag_critic_revise_prompt,
+        shard_size=1
+    )
+
+    assert sorted(result.final_tags) == ["machine-learning", "python"]
+    assert sorted(llm.evaluated) == ["machine-learning", "python"]
+
+
+class ScriptedLLM:
+    """Fake chat model with a fixed score per tag and a fixed revision per tag"""
+
+    def __init__(self, scores, renames):
+        self.scores = scores
+        self.renames = renames
+        self.calls = []  # (schema name, tags in the prompt)
+
+    def _tags(self, prompt):
+        return [tag for tag in self.scores if f"- {tag}\n" in prompt + "\n" or f"{tag} (score:" in prompt]
+
+    def with_structured_output(self, schema):
+        def respond(prompt):
+            tags = self._tags(prompt)
+            self.calls.append((schema.__name__, tags))
+            evaluations = [_evaluation(tag, self.scores[tag]) for tag in tags]
+            revisions = [RevisionModel(original=tag, revised=self.renames[tag]) for tag in tags if tag in self.renames]
+            if schema is RevisionModelList:
+                return RevisionModelList(revisions=revisions)
+            if schema is TagEvaluationRevisionList:
+                return TagEvaluationRevisionList(evaluations=evaluations, revisions=revisions)
+            return TagEvaluationList(evaluations=evaluations)
+        return RunnableLambda(respond)
+
+
+def _rubric(llm, tags, **kwargs):
+    return evaluate_tags_rubric(
+        tags,
+        llm=llm,
+        tag_critic_eval_prompt=tag_critic_eval_prompt,
+        tag_critic_revise_prompt=tag_critic_revise_prompt,
+        max_iterations=5,
+        **kwargs
+    )
+
+
+def test_stops_when_the_mean_score_barely_moves():
+    llm = ScriptedLLM({"python": 90, "a-lib": 40, "b-lib": 40.5, "c-lib": 80}, {"a-lib": "b-lib", "b-lib": "c-lib"})
+
+    result = _rubric(llm, ["python", "a-lib"])
+
+    # Mean 65 -> 65.25 is below MIN_SCORE_DELTA (1.0), so c-lib is never tried
+    assert result.iterations == 2
+    assert result.final_tags == ["python"]
+    evaluated = [tags for name, tags in llm.calls if name == "TagEvaluationList"]
+    # Only the revised tag is re-scored in the second iteration
+    assert evaluated == [["python", "a-lib"], ["b-lib"]]
+
+
+def test_keeps_revising_while_the_mean_score_improves():
+    llm = ScriptedLLM({"python": 90, "a-lib": 40, "b-lib": 60, "c-lib": 80}, {"a-lib": "b-lib", "b-lib": "c-lib"})
+
+    result = _rubric(llm, ["python", "a-lib"])
+
+    assert result.iterations == 3
+    assert result.final_tags == ["python", "c-lib"]
+
+
+def test_early_stop_can_be_disabled():
+    llm = ScriptedLLM(
+        {"python": 90, "a-lib": 40, "b-lib": 40.5, "c-lib": 41, "d-lib": 41.5, "e-lib": 42},
+        {"a-lib": "b-lib", "b-lib": "c-lib", "c-lib": "d-lib", "d-lib": "e-lib"}
+    )
+
+    result = _rubric(llm, ["python", "a-lib"], min_score_delta=None)
+
+    assert result.iterations == 5
+
+
+def test_combined_schema_parses_with_and_without_revisions():
+    parsed = TagEvaluationRevisionList.model_validate_json(
+        '{"evaluations": [{"tag": "python", "score": 91}],'
+        ' "revisions": [{"original": "db", "revised": "database", "reason": "spelled out"}]}'
+    )
+    assert parsed.evaluations[0].score == 91
+    assert parsed.evaluations[0].relevance == 0.0
+    assert (parsed.revisions[0].original, parsed.revisions[0].revised) == ("db", "database")
+
+    # All tags passing: the model may leave revisions out
+    assert TagEvaluationRevisionList.model_validate_json('{"evaluations": []}').revisions == []
+
+
+def test_combined_mode_makes_one_call_per_iteration_and_revises_failing_tags_only():
+    llm = ScriptedLLM({"python": 90, "a-lib": 40, "b-lib": 80}, {"a-lib": "b-lib", "python": "python3"})
+
+    result = _rubric(llm, ["python", "a-lib"], combined=True, tag_critic_eval_revise_prompt=tag_critic_eval_revise_prompt)
+
+    assert result.final_tags == ["python", "b-lib"]
+    # No separate revise call; the revision proposed for the passing tag is ignored
+    assert llm.calls == [("TagEvaluationRevisionList", ["python", "a-lib"]), ("TagEvaluationRevisionList", ["b-lib"])]
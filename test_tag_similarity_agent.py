@@ -0,0 +1,44 @@
+import numpy as np
+
+from agents.tag_similarity_agent import calculate_tag_similarity
+from tool.embedding_backends import HashingEmbeddingBackend
+
+README = (
+    "Gin is a HTTP web framework written in Golang. Golang developers love Gin and its "
+    "martini-like API. Martini users migrate easily. Go to the docs, go build it."
+)
+
+
+class SynonymBackend(HashingEmbeddingBackend):
+    """Hashing backend that embeds "go" exactly like "golang" """
+
+    def embed(self, texts):
+        return super().embed(["golang" if text == "go" else text for text in texts])
+
+
+def test_short_tags_are_not_accepted_lexically():
+    result = calculate_tag_similarity(README, ["golang", "go"], embedding_backend=HashingEmbeddingBackend())
+
+    assert result["success"]
+    assert result["lexical_decisions"]["accepted"] == ["golang"]
+
+
+def test_lexically_accepted_tag_absorbs_its_embedded_duplicate():
+    result = calculate_tag_similarity(README, ["go", "golang", "middleware"], embedding_backend=SynonymBackend())
+
+    tags = [t["tag"] for t in result["tag_similarities"]]
+    assert "golang" in tags
+    assert "go" not in tags
+    assert result["duplicates_removed"] >= 1
+
+
+def test_duplicate_accepted_tags_are_deduplicated_without_pending_tags():
+    class SameVector(HashingEmbeddingBackend):
+        def embed(self, texts):
+            return [np.ones(8, dtype=np.float32) for _ in texts]
+
+    result = calculate_tag_similarity(README, ["golang", "martini"], embedding_backend=SameVector())
+
+    assert result["lexical_decisions"]["embedded_count"] == 0
+    assert result["lexical_decisions"]["accepted"] == ["golang"]
+    assert result["lexical_decisions"]["dropped_as_duplicates"] == ["martini"]
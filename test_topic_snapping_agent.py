@@ -0,0 +1,91 @@
+import threading
+
+import agents.topic_snapping_agent as topic_snapping_agent
+from agents.topic_snapping_agent import get_topic_index, snap_tags_to_topics
+from tool.embedding_backends import HashingEmbeddingBackend
+
+
+class SlowBackend(HashingEmbeddingBackend):
+    """Hashing backend under a custom model name that records overlapping embed calls"""
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, model):
+        super().__init__()
+        self._model = model
+
+    @property
+    def model(self):
+        return self._model
+
+    def embed(self, texts):
+        with SlowBackend.lock:
+            SlowBackend.active += 1
+            SlowBackend.peak = max(SlowBackend.peak, SlowBackend.active)
+        try:
+            threading.Event().wait(0.05)
+            return super().embed(texts)
+        finally:
+            with SlowBackend.lock:
+                SlowBackend.active -= 1
+
+
+def _isolate(monkeypatch, tmp_path):
+    monkeypatch.setattr(topic_snapping_agent, "TOPIC_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(topic_snapping_agent, "_topic_indexes", {})
+    monkeypatch.setattr(topic_snapping_agent, "_topic_index_locks", {})
+
+
+def test_local_backend_uses_its_own_snap_threshold(monkeypatch, tmp_path):
+    _isolate(monkeypatch, tmp_path)
+
+    result = snap_tags_to_topics(["python", "python library"], embedding_backend="local")
+
+    assert result["success"]
+    assert result["similarity_threshold"] == HashingEmbeddingBackend.snap_similarity_threshold
+    assert "python" in result["snapped_tags"]
+
+
+def test_explicit_threshold_overrides_backend(monkeypatch, tmp_path):
+    _isolate(monkeypatch, tmp_path)
+
+    result = snap_tags_to_topics(["some unknown tool"], similarity_threshold=1.0, embedding_backend="local")
+
+    assert result["similarity_threshold"] == 1.0
+    assert result["mappings"][0]["method"] == "unmatched"
+
+
+def test_index_builds_for_different_models_run_concurrently(monkeypatch, tmp_path):
+    _isolate(monkeypatch, tmp_path)
+    SlowBackend.active = SlowBackend.peak = 0
+    backends = [SlowBackend("model-a"), SlowBackend("model-b")]
+
+    threads = [threading.Thread(target=get_topic_index, args=(backend,)) for backend in backends]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert SlowBackend.peak == 2
+    assert set(topic_snapping_agent._topic_indexes) == {"model-a", "model-b"}
+
+
+def test_index_for_one_model_is_built_once(monkeypatch, tmp_path):
+    _isolate(monkeypatch, tmp_path)
+    built = []
+    backend = SlowBackend("model-c")
+    original = topic_snapping_agent.IVFIndex.build
+    monkeypatch.setattr(
+        topic_snapping_agent.IVFIndex, "build",
+        lambda *args, **kwargs: built.append(1) or original(*args, **kwargs)
+    )
+
+    threads = [threading.Thread(target=get_topic_index, args=(backend,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(built) == 1
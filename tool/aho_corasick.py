@@ -0,0 +1,68 @@
+from collections import deque
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton for finding many literal patterns in one pass over a text.
+
+    Building is linear in the total pattern length; scanning is linear in the text
+    length plus the number of matches, however many patterns there are.
+
+    Example:
+        >>> automaton = AhoCorasick(["he", "she", "hers"])
+        >>> list(automaton.iter("ushers"))
+        [(1, 4, 1), (2, 4, 0), (2, 6, 2)]
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = next_node
+            self._output[node].append(index)
+
+        # Breadth-first so every failure link points at an already finished node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # Patterns ending at the fallback state also end here
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        Yield every occurrence of every pattern, overlapping ones included.
+
+        Yields:
+            (start, end, pattern_index) tuples, ordered by end offset
+        """
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self.patterns
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in output[node]:
+                end = position + 1
+                yield end - len(patterns[index]), end, index
@@ -0,0 +1,210 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+from tool.llm_usage import current_usage_ledger, split_llm_call, track_llm_usage
+
+load_dotenv()
+
+BATCH_PACKING = os.getenv("BATCH_PACKING", "true").lower() in ("1", "true", "yes")
+BATCH_PACK_WINDOW = float(os.getenv("BATCH_PACK_WINDOW", "0.5"))  # Seconds a request waits for other repos
+BATCH_PACK_TOKEN_BUDGET = int(os.getenv("BATCH_PACK_TOKEN_BUDGET", "8000"))  # Input tokens per packed request
+BATCH_PACK_MAX_ITEM_TOKENS = int(os.getenv("BATCH_PACK_MAX_ITEM_TOKENS", "2000"))  # Larger inputs go per repo
+BATCH_PACK_MAX_REPOS = int(os.getenv("BATCH_PACK_MAX_REPOS", "8"))  # Repositories per packed request
+
+# Set by the batch runner; copied into each repository's workflow threads with the context
+_packers = contextvars.ContextVar("batch_packers", default=None)
+_repo = contextvars.ContextVar("batch_repo", default=None)
+
+
+class BatchPacker:
+    """
+    Packs small per-repository LLM requests of one kind from concurrently running
+    workflows into a single structured request with one section per repository.
+
+    ``submit`` blocks while the request waits up to ``window`` seconds for other
+    repositories' requests of the same kind (less if the pack fills up), then the first
+    request of the pack sends the packed prompt through ``pack_fn`` and every caller gets
+    its own section back. ``pack_fn`` receives [(repository, payload), ...] and returns
+    {index: result} for the sections it could answer.
+
+    ``submit`` returns None whenever the caller should make its usual per-repository
+    call instead: the input is larger than ``max_item_tokens``, nobody else showed up
+    within the window, the packed request failed, or its section came back missing.
+    The packed call's usage is split across the participating repositories' ledgers in
+    proportion to their sections' tokens (the process-wide ledger counts it once).
+
+    Example:
+        >>> packer = BatchPacker("candidate", lambda items: {i: repo for i, (repo, _) in enumerate(items)}, window=0.01)
+        >>> packer.submit("facebook/react", "README", tokens=3) is None  # Nobody else in the window
+        True
+        >>> packer.submit("facebook/react", "README" * 1000, tokens=5000) is None  # Too large to pack
+        True
+    """
+
+    def __init__(
+        self,
+        name: str,
+        pack_fn: Callable[[List[Tuple[str, Any]]], Dict[int, Any]],
+        token_budget: int = BATCH_PACK_TOKEN_BUDGET,
+        max_item_tokens: int = BATCH_PACK_MAX_ITEM_TOKENS,
+        max_items: int = BATCH_PACK_MAX_REPOS,
+        window: float = BATCH_PACK_WINDOW
+    ):
+        if max_items < 2:
+            raise ValueError(f"max_items must be at least 2, got {max_items}")
+
+        self.name = name
+        self.pack_fn = pack_fn
+        self.token_budget = token_budget
+        self.max_item_tokens = min(max_item_tokens, token_budget)
+        self.max_items = max_items
+        self.window = window
+        self._condition = threading.Condition()
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_tokens = 0
+        self._overflow = False  # Set when a section did not fit; the open pack is sent early
+        self._counters = {
+            "submitted": 0, "packed": 0, "packs": 0, "too_large": 0, "alone": 0,
+            "missing_sections": 0, "pack_failures": 0
+        }
+
+    def accepts(self, tokens: int) -> bool:
+        """Whether an input of ``tokens`` is small enough to pack (counted as too large if not)"""
+        if tokens <= self.max_item_tokens:
+            return True
+        with self._condition:
+            self._counters["submitted"] += 1
+            self._counters["too_large"] += 1
+        return False
+
+    def _full(self) -> bool:
+        return len(self._pending) >= self.max_items or self._pending_tokens >= self.token_budget
+
+    def submit(self, repo: str, payload: Any, tokens: int) -> Optional[Any]:
+        """
+        Args:
+            repo: Repository label shown in the packed prompt, e.g. "owner/name"
+            payload: Whatever ``pack_fn`` needs for this section
+            tokens: Estimated input tokens of the section
+
+        Returns:
+            This repository's section of the packed response, or None to fall back
+        """
+        if not self.accepts(tokens):
+            return None
+        with self._condition:
+            self._counters["submitted"] += 1
+            # Close the open pack if this section would not fit in it
+            if self._pending and self._pending_tokens + tokens > self.token_budget:
+                self._overflow = True
+                self._condition.notify_all()
+                self._condition.wait_for(lambda: not self._pending, timeout=self.window)
+
+            item = {
+                "repo": repo, "payload": payload, "tokens": tokens,
+                "ledger": current_usage_ledger(), "future": Future()
+            }
+            self._pending.append(item)
+            self._pending_tokens += tokens
+            leader = len(self._pending) == 1
+            if leader:
+                # The first request of a pack waits for company, then sends it
+                deadline = time.monotonic() + self.window
+                self._condition.wait_for(
+                    lambda: self._full() or self._overflow or time.monotonic() >= deadline,
+                    timeout=self.window
+                )
+                pack = self._pending
+                self._pending = []
+                self._pending_tokens = 0
+                self._overflow = False
+                self._condition.notify_all()
+            elif self._full():
+                self._condition.notify_all()
+
+        if leader:
+            self._send(pack)
+        return item["future"].result()
+
+    def _send(self, pack: List[Dict[str, Any]]) -> None:
+        if len(pack) == 1:
+            with self._condition:
+                self._counters["alone"] += 1
+            pack[0]["future"].set_result(None)
+            return
+
+        try:
+            # Collected apart from the leader's ledger, then billed to every section
+            with track_llm_usage() as usage:
+                results = self.pack_fn([(item["repo"], item["payload"]) for item in pack]) or {}
+        except Exception as e:
+            print(f"[batch_packing] {self.name}: packed request for {len(pack)} repositories failed: {str(e)}")
+            with self._condition:
+                self._counters["pack_failures"] += 1
+            results = {}
+        self._bill(pack, usage.calls())
+
+        answered = 0
+        for i, item in enumerate(pack):
+            result = results.get(i)
+            answered += result is not None
+            item["future"].set_result(result)
+        with self._condition:
+            self._counters["packs"] += 1
+            self._counters["packed"] += answered
+            self._counters["missing_sections"] += len(pack) - answered
+        print(f"[batch_packing] {self.name}: packed {len(pack)} repositories into one request, "
+              f"{answered} answered")
+
+    @staticmethod
+    def _bill(pack: List[Dict[str, Any]], calls: List[Dict[str, Any]]) -> None:
+        """Record each packed call in every participant's ledger, weighted by section tokens"""
+        weights = [item["tokens"] for item in pack]
+        for call in calls:
+            for item, share in zip(pack, split_llm_call(call, weights)):
+                if item["ledger"] is not None:
+                    item["ledger"].record(share)
+
+    def stats(self) -> Dict[str, Any]:
+        """How many requests were packed, and why the others fell back"""
+        with self._condition:
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "requests_saved": counters["packed"] - counters["packs"],
+            "mean_pack_size": counters["packed"] / counters["packs"] if counters["packs"] else None
+        }
+
+
+@contextmanager
+def batch_packing(packers: Dict[str, BatchPacker]) -> Iterator[None]:
+    """Make ``packers`` (by request kind, e.g. "candidate") available to workflows started inside"""
+    token = _packers.set(packers)
+    try:
+        yield
+    finally:
+        _packers.reset(token)
+
+
+@contextmanager
+def batch_repo(repo: str) -> Iterator[None]:
+    """Label the requests made inside the block as ``repo``'s"""
+    token = _repo.set(repo)
+    try:
+        yield
+    finally:
+        _repo.reset(token)
+
+
+def get_batch_packer(name: str) -> Optional[Tuple[BatchPacker, str]]:
+    """The active packer for a request kind and the current repository, or None outside a batch"""
+    packers = _packers.get()
+    repo = _repo.get()
+    if not packers or repo is None or name not in packers:
+        return None
+    return packers[name], repo
@@ -0,0 +1,255 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from dotenv import load_dotenv
+from tool.lexical_scorer import bm25_tag_chunk_scores
+from tool.prompt_packing import estimate_tokens
+from tool.readme_chunking import chunk_text
+
+load_dotenv()
+
+CRITIC_CONTEXT_TOKEN_BUDGET = int(os.getenv("CRITIC_CONTEXT_TOKEN_BUDGET", "1500"))
+CONTEXT_DIGEST_CACHE_SIZE = 128
+
+_HEADING_PATTERN = re.compile(r"^ {0,3}(#{1,6})\s+(.+?)\s*#*\s*$", re.MULTILINE)
+_CODE_FENCE_PATTERN = re.compile(r"^ {0,3}(```|~~~).*?^ {0,3}\1", re.MULTILINE | re.DOTALL)
+
+# Local stand-in for provider-side context caching: digests are built once per
+# (README, tags, budget) and reused by every critic prompt and every later run
+_digest_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_digest_cache_lock = threading.Lock()
+
+
+def extract_headings(text: str, max_level: int = 3) -> List[str]:
+    """
+    Markdown headings as an indented outline.
+
+    Example:
+        >>> extract_headings("# Title\\n## Install\\ntext\\n### Docker")
+        ['Title', '  Install', '    Docker']
+    """
+    outline = []
+    # Shell comments inside fenced code blocks look like headings
+    text = _CODE_FENCE_PATTERN.sub("", text or "")
+    for hashes, title in _HEADING_PATTERN.findall(text):
+        level = len(hashes)
+        if level <= max_level:
+            outline.append("  " * (level - 1) + title.strip())
+    return outline
+
+
+def _digest_key(readme_content: str, tags: Sequence[str], token_budget: int) -> str:
+    digest = hashlib.sha256()
+    digest.update(readme_content.encode("utf-8"))
+    digest.update("\x00".join(sorted(tags)).encode("utf-8"))
+    digest.update(str(token_budget).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_context_digest(
+    readme_content: str,
+    tags: Optional[Sequence[str]] = None,
+    token_budget: int = CRITIC_CONTEXT_TOKEN_BUDGET,
+    chunk_scores: Optional[Sequence[float]] = None
+) -> Dict[str, Any]:
+    """
+    Condense a README into a context digest that fits a token budget.
+
+    The digest is the heading outline followed by the most relevant README chunks, kept
+    in document order. The first chunk (usually the project description) is always
+    included; the rest are ranked by ``chunk_scores`` when given, otherwise by the summed
+    BM25 score of ``tags`` in each chunk. A README that already fits is returned whole.
+
+    Args:
+        readme_content: Full README text
+        tags: Tags the critic will judge, used to rank chunks
+        token_budget: Approximate token budget for the digest (default: 1500)
+        chunk_scores: Optional relevance per chunk, aligned with chunk_text(readme_content)
+
+    Returns:
+        Dictionary with "digest", "tokens", "source_tokens", "chunks_used",
+        "total_chunks" and "headings"
+    """
+    readme_content = readme_content or ""
+    source_tokens = estimate_tokens(readme_content)
+
+    if source_tokens <= token_budget:
+        return {
+            "digest": readme_content,
+            "tokens": source_tokens,
+            "source_tokens": source_tokens,
+            "chunks_used": None,
+            "total_chunks": None,
+            "headings": 0
+        }
+
+    chunks = chunk_text(readme_content, chunk_size=1000, overlap=200)
+
+    # Outline first, capped at a fifth of the budget
+    outline = []
+    outline_tokens = 0
+    for heading in extract_headings(readme_content):
+        tokens = estimate_tokens(heading) + 1
+        if outline_tokens + tokens > token_budget // 5:
+            break
+        outline.append(heading)
+        outline_tokens += tokens
+
+    if chunk_scores is not None and len(chunk_scores) == len(chunks):
+        scores = np.asarray(chunk_scores, dtype=np.float32)
+    elif tags:
+        scores = bm25_tag_chunk_scores(chunks, list(tags))["scores"].sum(axis=0)
+    else:
+        scores = np.zeros(len(chunks), dtype=np.float32)
+
+    # First chunk always, then by score (ties keep document order)
+    order = [0] + [int(i) for i in np.argsort(-scores, kind="stable") if i != 0]
+    selected = []
+    used_tokens = outline_tokens
+    for i in order:
+        tokens = estimate_tokens(chunks[i])
+        if used_tokens + tokens > token_budget:
+            continue
+        selected.append(i)
+        used_tokens += tokens
+
+    sections = []
+    if outline:
+        sections.append("Outline:\n" + "\n".join(outline))
+    sections.append("\n...\n".join(chunks[i] for i in sorted(selected)))
+    digest = "\n\n".join(sections)
+
+    return {
+        "digest": digest,
+        "tokens": estimate_tokens(digest),
+        "source_tokens": source_tokens,
+        "chunks_used": len(selected),
+        "total_chunks": len(chunks),
+        "headings": len(outline)
+    }
+
+
+def get_context_digest(
+    readme_content: str,
+    tags: Optional[Sequence[str]] = None,
+    token_budget: int = CRITIC_CONTEXT_TOKEN_BUDGET,
+    chunk_scores: Optional[Sequence[float]] = None
+) -> Dict[str, Any]:
+    """
+    build_context_digest with a process-wide LRU cache in front of it.
+
+    Returns the same dictionary plus "cached" (whether the digest was reused).
+    """
+    tags = list(tags or [])
+    key = _digest_key(readme_content or "", tags, token_budget)
+    if chunk_scores is not None:
+        key += hashlib.sha256(np.asarray(chunk_scores, dtype=np.float32).tobytes()).hexdigest()
+
+    with _digest_cache_lock:
+        if key in _digest_cache:
+            _digest_cache.move_to_end(key)
+            return {**_digest_cache[key], "cached": True}
+
+    result = build_context_digest(readme_content, tags, token_budget, chunk_scores)
+
+    with _digest_cache_lock:
+        _digest_cache[key] = result
+        while len(_digest_cache) > CONTEXT_DIGEST_CACHE_SIZE:
+            _digest_cache.popitem(last=False)
+    return {**result, "cached": False}
+
+
+class ShardContextBuilder:
+    """
+    Retrieval-scoped context for critic prompts.
+
+    Each shard of tags gets only the union of its tags' supporting chunks (the per-tag
+    argmax / top-k chunk indices computed by the similarity stage), within a token
+    budget. Tags the similarity stage never saw, such as critic revisions, fall back to
+    their best BM25 chunk. Called with a list of tags, returns the context string.
+
+    Example:
+        >>> readme = "Install with pip. " * 60 + "FastAPI routes. " * 60 + "Licensed under MIT. " * 60
+        >>> builder = ShardContextBuilder(readme, {"fastapi": [2]}, top_k=2)
+        >>> context = builder(["fastapi", "mit"])  # "mit" falls back to its best BM25 chunk
+        >>> "FastAPI" in context, "MIT" in context, "Install" in context
+        (True, True, False)
+    """
+
+    def __init__(
+        self,
+        readme_content: str,
+        supporting_chunks: Dict[str, Sequence[int]],
+        token_budget: int = CRITIC_CONTEXT_TOKEN_BUDGET,
+        top_k: int = 2
+    ):
+        self.chunks = chunk_text(readme_content or "", chunk_size=1000, overlap=200)
+        self.token_budget = token_budget
+        self.top_k = top_k
+        self.source_tokens = estimate_tokens(readme_content or "")
+        self.supporting: Dict[str, List[int]] = {}
+        for tag, indices in (supporting_chunks or {}).items():
+            valid = [int(i) for i in (indices or []) if i is not None and 0 <= int(i) < len(self.chunks)]
+            if isinstance(tag, str) and valid:
+                self.supporting[tag.strip().lower()] = valid[:top_k]
+        self.shard_tokens: List[int] = []
+        self._lock = threading.Lock()
+
+    def _ranked_chunks(self, tags: Sequence[str]) -> List[List[int]]:
+        ranked = []
+        unknown = []
+        for tag in tags:
+            indices = self.supporting.get(tag.strip().lower())
+            if indices:
+                ranked.append(indices)
+            else:
+                unknown.append(tag)
+
+        if unknown and self.chunks:
+            scores = bm25_tag_chunk_scores(self.chunks, unknown)["scores"]
+            for row in scores:
+                if row.max() > 0:
+                    ranked.append([int(np.argmax(row))])
+        return ranked
+
+    def __call__(self, tags: Sequence[str]) -> str:
+        if not self.chunks:
+            return ""
+
+        # Round-robin over the tags' ranked chunks so every tag gets its best chunk first
+        ranked = self._ranked_chunks(tags)
+        selected: List[int] = []
+        used_tokens = 0
+        for rank in range(self.top_k):
+            for indices in ranked:
+                if rank >= len(indices) or indices[rank] in selected:
+                    continue
+                tokens = estimate_tokens(self.chunks[indices[rank]])
+                if used_tokens + tokens > self.token_budget:
+                    continue
+                selected.append(indices[rank])
+                used_tokens += tokens
+
+        if not selected:
+            selected = [0]
+
+        context = "\n...\n".join(self.chunks[i] for i in sorted(selected))
+        with self._lock:
+            self.shard_tokens.append(estimate_tokens(context))
+        return context
+
+    def stats(self) -> Dict[str, Any]:
+        """Token usage of the contexts built so far"""
+        with self._lock:
+            shard_tokens = list(self.shard_tokens)
+        return {
+            "mode": "retrieval",
+            "source_tokens": self.source_tokens,
+            "contexts_built": len(shard_tokens),
+            "average_tokens": sum(shard_tokens) / len(shard_tokens) if shard_tokens else 0,
+            "max_tokens": max(shard_tokens) if shard_tokens else 0
+        }
@@ -0,0 +1,239 @@
+import os
+import re
+import zlib
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import List, Optional, Union
+from dotenv import load_dotenv
+from tool.ollama_embeddings import (
+    get_ollama_embeddings, embedding_store_name, EMBED_MODEL, EMBED_DIMENSIONS, OLLAMA_BASE_URL
+)
+
+load_dotenv()
+
+DEFAULT_EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "auto")  # "auto", "ollama" or "local"
+LOCAL_EMBEDDING_DIM = 512
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class EmbeddingBackend(ABC):
+    """
+    Interface for anything that turns texts into embedding vectors.
+
+    Implementations return one vector per input text, in input order, and raise an
+    Exception when embedding fails. Cosine scales differ between models, so each backend
+    also declares the tag-to-chunk similarity above which a tag counts as medium or high
+    relevance, the similarity at which a tag snaps onto a canonical topic, and the
+    similarity above which two requests count as near-duplicates.
+    """
+
+    name: str = "base"
+    medium_relevance_threshold: float = 0.5
+    high_relevance_threshold: float = 0.7
+    snap_similarity_threshold: float = 0.85
+    near_duplicate_threshold: float = 0.95
+
+    @property
+    @abstractmethod
+    def model(self) -> str:
+        """Identifier of the embedding space (vectors from different models are not comparable)"""
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed a list of texts"""
+
+
+class OllamaEmbeddingBackend(EmbeddingBackend):
+    """Embeddings from an Ollama server (shared on-disk store in front of it)"""
+
+    name = "ollama"
+
+    def __init__(
+        self,
+        model: str = EMBED_MODEL,
+        base_url: str = OLLAMA_BASE_URL,
+        dimensions: Optional[int] = EMBED_DIMENSIONS,
+        use_store: bool = True
+    ):
+        self._model = model
+        self.base_url = base_url
+        self.dimensions = dimensions
+        self.use_store = use_store
+
+    @property
+    def model(self) -> str:
+        return embedding_store_name(self._model, self.dimensions)
+
+    def embed(self, texts: List[str]) -> List[np.ndarray]:
+        return get_ollama_embeddings(
+            texts, model=self._model, base_url=self.base_url, dimensions=self.dimensions,
+            use_store=self.use_store
+        )
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """
+    In-process CPU embedder: hashed word and character-trigram features.
+
+    Each token and each character trigram of a token is hashed into one of ``dim``
+    signed buckets, counts are log-scaled and the vector is L2-normalized. It needs no
+    model or network, so it doubles as a zero-latency backend for benchmarks and tests.
+
+    Example:
+        >>> backend = HashingEmbeddingBackend()
+        >>> vectors = backend.embed(["machine learning", "machine-learning"])
+        >>> round(float(vectors[0] @ vectors[1]), 3)
+        1.0
+    """
+
+    name = "local"
+    # Sparse lexical vectors give much lower tag-to-chunk cosines than neural embeddings
+    medium_relevance_threshold = 0.12
+    high_relevance_threshold = 0.2
+    snap_similarity_threshold = 0.7  # "postgres" ~ "postgresql" is 0.70, "python library" ~ "python" 0.68
+    # ...but requests differing in one content word still reach ~0.93
+    near_duplicate_threshold = 0.98
+
+    def __init__(self, dim: int = LOCAL_EMBEDDING_DIM):
+        if dim <= 0:
+            raise ValueError(f"dim must be positive, got {dim}")
+        self.dim = dim
+
+    @property
+    def model(self) -> str:
+        return f"hashing-ngram-{self.dim}"
+
+    def _features(self, text: str) -> List[str]:
+        features = []
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            features.append(f"w:{token}")
+            padded = f"<{token}>"
+            features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, texts: List[str]) -> List[np.ndarray]:
+        if not texts:
+            raise Exception("Input texts list is empty")
+
+        vectors = []
+        for text in texts:
+            if not isinstance(text, str) or not text.strip():
+                continue
+            hashes = np.fromiter(
+                (zlib.crc32(f.encode("utf-8")) for f in self._features(text)), dtype=np.uint32
+            )
+            vector = np.zeros(self.dim, dtype=np.float32)
+            if len(hashes):
+                signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+                np.add.at(vector, hashes % self.dim, signs)
+                vector = np.sign(vector) * np.log1p(np.abs(vector))
+                norm = np.linalg.norm(vector)
+                if norm > 0:
+                    vector /= norm
+            vectors.append(vector)
+
+        if not vectors:
+            raise Exception("No valid text strings found in input after filtering")
+        return vectors
+
+
+class FallbackEmbeddingBackend(EmbeddingBackend):
+    """
+    Uses ``primary`` until it fails once, then switches to ``fallback`` for good.
+
+    The switch is sticky so every vector produced by one instance lives in the same
+    embedding space; create one instance per request.
+    """
+
+    name = "auto"
+
+    def __init__(self, primary: EmbeddingBackend, fallback: EmbeddingBackend):
+        self.primary = primary
+        self.fallback = fallback
+        self.active = primary
+        self.fallback_reason: Optional[str] = None
+
+    @property
+    def model(self) -> str:
+        return self.active.model
+
+    @property
+    def active_name(self) -> str:
+        return self.active.name
+
+    @property
+    def medium_relevance_threshold(self) -> float:
+        return self.active.medium_relevance_threshold
+
+    @property
+    def high_relevance_threshold(self) -> float:
+        return self.active.high_relevance_threshold
+
+    @property
+    def snap_similarity_threshold(self) -> float:
+        return self.active.snap_similarity_threshold
+
+    @property
+    def near_duplicate_threshold(self) -> float:
+        return self.active.near_duplicate_threshold
+
+    def embed(self, texts: List[str]) -> List[np.ndarray]:
+        if self.active is self.primary:
+            try:
+                return self.primary.embed(texts)
+            except Exception as e:
+                print(f"[embedding_backends] Warning: {self.primary.name} backend failed, "
+                      f"falling back to {self.fallback.name}: {str(e)}")
+                self.fallback_reason = str(e)
+                self.active = self.fallback
+        return self.fallback.embed(texts)
+
+
+def get_embedding_backend(
+    backend: Union[str, EmbeddingBackend, None] = None,
+    dimensions: Optional[int] = None,
+    use_store: bool = True
+) -> EmbeddingBackend:
+    """
+    Resolve an embedding backend by name.
+
+    Args:
+        backend: "ollama", "local", "auto" (Ollama with local fallback), an
+                 EmbeddingBackend instance, or None for EMBEDDING_BACKEND (default: "auto")
+        dimensions: Embedding width for named backends: Matryoshka truncation for Ollama,
+                    bucket count for the local embedder (default: EMBED_DIMENSIONS / 512)
+        use_store: Read from and write to the shared on-disk embedding store (Ollama only);
+                   turn off for throwaway texts such as request cache keys
+
+    Returns:
+        EmbeddingBackend instance (a fresh one per call for named backends)
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    if isinstance(backend, EmbeddingBackend):
+        return backend
+
+    name = (backend or DEFAULT_EMBEDDING_BACKEND).strip().lower()
+    ollama_dimensions = dimensions or EMBED_DIMENSIONS
+    local_dimensions = dimensions or LOCAL_EMBEDDING_DIM
+
+    if name == "ollama":
+        return OllamaEmbeddingBackend(dimensions=ollama_dimensions, use_store=use_store)
+    if name == "local":
+        return HashingEmbeddingBackend(local_dimensions)
+    if name == "auto":
+        return FallbackEmbeddingBackend(
+            OllamaEmbeddingBackend(dimensions=ollama_dimensions, use_store=use_store),
+            HashingEmbeddingBackend(local_dimensions)
+        )
+
+    raise ValueError(f"Unknown embedding backend '{backend}'. Expected 'auto', 'ollama' or 'local'")
+
+
+def backend_label(backend: EmbeddingBackend) -> str:
+    """Name of the backend that actually produced the vectors"""
+    if isinstance(backend, FallbackEmbeddingBackend):
+        return backend.active_name
+    return backend.name
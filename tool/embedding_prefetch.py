@@ -0,0 +1,187 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+import numpy as np
+from dotenv import load_dotenv
+from tool.embedding_backends import EmbeddingBackend, backend_label
+
+load_dotenv()
+
+EMBEDDING_PREFETCH = os.getenv("EMBEDDING_PREFETCH", "true").lower() in ("1", "true", "yes")
+PREFETCH_BATCH_SIZE = 32
+PREFETCH_IDLE_TIMEOUT = 60.0  # Seconds without work before an unclosed worker exits
+
+
+class PrefetchingEmbeddingBackend(EmbeddingBackend):
+    """
+    Embedding backend that starts embedding texts before anyone asks for them.
+
+    ``submit`` queues texts (README chunks, candidate tags as each chunk's tags come
+    back) for a background worker that embeds them in batches. ``embed`` then returns
+    the prefetched vectors, waits for texts still in flight, and embeds only what was
+    never submitted, so later stages overlap with earlier ones instead of following
+    them. Vectors are only reused while the wrapped backend is still on the same model
+    (an "auto" backend may fall back mid-run); if it falls back while embedding the
+    missing texts, every text is embedded again so one call never mixes models. The
+    worker and callers never use the wrapped backend at the same time.
+
+    Example:
+        >>> from tool.embedding_backends import HashingEmbeddingBackend
+        >>> backend = PrefetchingEmbeddingBackend(HashingEmbeddingBackend())
+        >>> backend.submit(["Gin is a web framework written in Go.", "golang"])
+        >>> len(backend.embed(["golang", "web-framework"]))  # "web-framework" is embedded now
+        2
+        >>> backend.close()
+    """
+
+    def __init__(self, backend: EmbeddingBackend, batch_size: int = PREFETCH_BATCH_SIZE):
+        self.backend = backend
+        self.batch_size = batch_size
+        self._futures: Dict[str, Future] = {}
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._backend_lock = threading.Lock()  # An "auto" backend may switch models mid-call
+        self._closed = threading.Event()
+        self._counters = {"submitted": 0, "prefetched": 0, "batches": 0, "failed": 0, "reused": 0, "embedded_on_demand": 0}
+        self._busy_seconds = 0.0
+        self._worker = threading.Thread(target=self._run, name="embedding-prefetch", daemon=True)
+        self._worker.start()
+
+    @property
+    def name(self) -> str:
+        return backend_label(self.backend)
+
+    @property
+    def model(self) -> str:
+        return self.backend.model
+
+    @property
+    def medium_relevance_threshold(self) -> float:
+        return self.backend.medium_relevance_threshold
+
+    @property
+    def high_relevance_threshold(self) -> float:
+        return self.backend.high_relevance_threshold
+
+    @property
+    def snap_similarity_threshold(self) -> float:
+        return self.backend.snap_similarity_threshold
+
+    @property
+    def near_duplicate_threshold(self) -> float:
+        return self.backend.near_duplicate_threshold
+
+    def submit(self, texts: List[str]) -> None:
+        """Queue texts for background embedding (already submitted texts are skipped)"""
+        with self._lock:
+            if self._closed.is_set():
+                return
+            for text in texts:
+                if not isinstance(text, str) or not text.strip() or text in self._futures:
+                    continue
+                self._futures[text] = Future()
+                self._counters["submitted"] += 1
+                self._queue.put(text)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=PREFETCH_IDLE_TIMEOUT)
+            except queue.Empty:
+                return
+            if first is None:
+                return
+
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    text = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if text is None:
+                    # close() was called; nothing can be queued after its sentinel
+                    stopping = True
+                    break
+                batch.append(text)
+
+            start = time.perf_counter()
+            try:
+                with self._backend_lock:
+                    vectors = self.backend.embed(batch)
+                    # Record the model actually used (a fallback backend may have switched)
+                    model = self.backend.model
+                if len(vectors) != len(batch):
+                    raise Exception("Embedding count mismatch")
+                for text, vector in zip(batch, vectors):
+                    self._futures[text].set_result((model, vector))
+                with self._lock:
+                    self._counters["prefetched"] += len(batch)
+                    self._counters["batches"] += 1
+            except Exception as e:
+                print(f"[embedding_prefetch] Warning: Prefetch batch failed: {str(e)}")
+                for text in batch:
+                    self._futures[text].set_exception(e)
+                with self._lock:
+                    self._counters["failed"] += len(batch)
+            finally:
+                with self._lock:
+                    self._busy_seconds += time.perf_counter() - start
+
+    def embed(self, texts: List[str]) -> List[np.ndarray]:
+        results: List[Any] = [None] * len(texts)
+        with self._lock:
+            futures = [self._futures.get(text) for text in texts]
+
+        prefetched: List[Any] = [None] * len(texts)
+        for i, future in enumerate(futures):
+            if future is None:
+                continue
+            try:
+                prefetched[i] = future.result(timeout=None if self._worker.is_alive() else 0)
+            except Exception:
+                continue
+
+        with self._backend_lock:
+            model = self.backend.model
+            missing = []
+            for i, entry in enumerate(prefetched):
+                if entry is not None and entry[0] == model:
+                    results[i] = entry[1]
+                else:
+                    missing.append(i)
+
+            if missing:
+                vectors = self.backend.embed([texts[i] for i in missing])
+                if len(vectors) != len(missing):
+                    raise Exception("Embedding count mismatch")
+                if self.backend.model != model:
+                    # The backend fell back while embedding: the reused vectors are from
+                    # the old model, so embed everything with the one now active
+                    missing = list(range(len(texts)))
+                    vectors = self.backend.embed(texts)
+                    if len(vectors) != len(texts):
+                        raise Exception("Embedding count mismatch")
+                for i, vector in zip(missing, vectors):
+                    results[i] = vector
+
+        with self._lock:
+            self._counters["reused"] += len(texts) - len(missing)
+            self._counters["embedded_on_demand"] += len(missing)
+        return results
+
+    def close(self) -> None:
+        """Stop accepting texts; the worker finishes what is queued, then exits"""
+        with self._lock:
+            if self._closed.is_set():
+                return
+            self._closed.set()
+            self._queue.put(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """How much embedding work happened ahead of time and how much of it was reused"""
+        with self._lock:
+            return {**self._counters, "busy_seconds": round(self._busy_seconds, 3)}
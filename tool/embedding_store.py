@@ -0,0 +1,371 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import numpy as np
+from typing import List, Optional, Dict
+from dotenv import load_dotenv
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+load_dotenv()
+
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", os.path.join(".cache", "embeddings"))
+EMBEDDING_STORE_DTYPE = os.getenv("EMBEDDING_STORE_DTYPE", "float16")  # "float16" or "int8"
+EMBEDDING_STORE_ENABLED = os.getenv("EMBEDDING_STORE_ENABLED", "true").lower() in ("1", "true", "yes")
+# Rows per store; past it the oldest rows are dropped (0 = unbounded)
+EMBEDDING_STORE_MAX_ENTRIES = int(os.getenv("EMBEDDING_STORE_MAX_ENTRIES", "200000"))
+COMPACT_TO = 0.75  # Share of max_entries a compaction keeps, so it runs once per 25% of growth
+
+_SUPPORTED_DTYPES = {"float16": np.float16, "int8": np.int8}
+
+
+def text_key(text: str) -> int:
+    """Stable 64-bit key for a text (first 8 bytes of its BLAKE2b digest)"""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class EmbeddingStore:
+    """
+    Append-only, memory-mapped embedding store shared by every worker process.
+
+    Vectors are quantized to float16 (or int8 with a per-row float32 scale) and kept in
+    flat files that each process maps with ``np.memmap``, so workers read the same page
+    cache instead of holding private copies. Rows are indexed by a 64-bit hash of the text.
+
+    The store holds at most ``max_entries`` rows (0: unbounded). An append that would
+    exceed it first compacts the store: the newest ``COMPACT_TO * max_entries`` rows are
+    rewritten to fresh files that replace the old ones, so the oldest texts are
+    forgotten and get embedded again on their next use. Other processes notice the
+    new files and re-map them; they never map a half-replaced set, because re-mapping
+    takes a shared lock on ``<name>.lock``.
+
+    Layout for a store named ``<name>`` under ``directory``:
+        <name>.keys    uint64 text hashes; its length defines the committed row count
+        <name>.vecs    quantized vectors, one row per key (rows past the keys are
+                       leftovers of an interrupted append and are truncated by the next writer)
+        <name>.scales  float32 dequantization scale per row (int8 only)
+        <name>.json    dimension and dtype
+        <name>.lock    advisory lock serialising writers across processes
+
+    Example:
+        >>> import tempfile
+        >>> store = EmbeddingStore(tempfile.mkdtemp(), "nomic-embed-text")
+        >>> store.put(["python"], [np.ones(768)])
+        1
+        >>> store.get(["python", "rust"])[1] is None
+        True
+    """
+
+    def __init__(self, directory: str, name: str, dtype: str = "float16", max_entries: int = 0):
+        if dtype not in _SUPPORTED_DTYPES:
+            raise ValueError(f"dtype must be one of {list(_SUPPORTED_DTYPES)}, got {dtype}")
+        if max_entries < 0:
+            raise ValueError(f"max_entries must be non-negative, got {max_entries}")
+
+        os.makedirs(directory, exist_ok=True)
+        safe_name = re.sub(r"[^A-Za-z0-9._-]+", "_", name)
+        base = os.path.join(directory, safe_name)
+
+        self.name = name
+        self.dtype = dtype
+        self.max_entries = max_entries
+        self._keys_path = f"{base}.keys"
+        self._vecs_path = f"{base}.vecs"
+        self._scales_path = f"{base}.scales"
+        self._meta_path = f"{base}.json"
+        self._lock_path = f"{base}.lock"
+
+        self._dim: Optional[int] = None
+        self._count = 0
+        self._keys_inode: Optional[int] = None  # Changes when a compaction replaces the files
+        self._rows: Dict[int, int] = {}
+        self._vecs: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._thread_lock = threading.Lock()
+
+        self._load_meta()
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self._dim
+
+    def __len__(self) -> int:
+        with self._thread_lock:
+            self._refresh()
+            return self._count
+
+    def _load_meta(self) -> None:
+        if not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path, "r") as f:
+            meta = json.load(f)
+        if meta.get("dtype") != self.dtype:
+            raise ValueError(
+                f"Embedding store '{self.name}' was created with dtype {meta.get('dtype')}, not {self.dtype}"
+            )
+        self._dim = int(meta["dim"])
+
+    def _lock(self, shared: bool = False):
+        handle = open(self._lock_path, "a")
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        return handle
+
+    def _unlock(self, handle) -> None:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+        handle.close()
+
+    def _discard_uncommitted(self) -> None:
+        """
+        Cut every file back to the committed row count (caller holds the file lock).
+
+        A writer that died between appending vectors and appending keys leaves orphan
+        rows behind; appending after them would shift every later key onto another
+        text's vector.
+        """
+        committed = os.path.getsize(self._keys_path) // 8 if os.path.exists(self._keys_path) else 0
+        sizes = [
+            (self._keys_path, committed * 8),
+            (self._vecs_path, committed * self._dim * np.dtype(_SUPPORTED_DTYPES[self.dtype]).itemsize),
+        ]
+        if self.dtype == "int8":
+            sizes.append((self._scales_path, committed * 4))
+        for path, size in sizes:
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                print(f"[embedding_store] Warning: Discarding uncommitted rows in {path}")
+                os.truncate(path, size)
+
+    def _refresh(self, locked: bool = False) -> None:
+        """
+        Re-map the files if another process has committed new rows or compacted them.
+
+        Args:
+            locked: The caller already holds the exclusive file lock
+        """
+        if self._dim is None:
+            self._load_meta()
+            if self._dim is None:
+                return
+
+        try:
+            stat = os.stat(self._keys_path)
+        except OSError:
+            return
+        if stat.st_ino == self._keys_inode and stat.st_size // 8 == self._count:
+            return
+
+        handle = None if locked else self._lock(shared=True)
+        try:
+            self._remap()
+        finally:
+            if handle is not None:
+                self._unlock(handle)
+
+    def _remap(self) -> None:
+        stat = os.stat(self._keys_path)
+        committed = stat.st_size // 8
+        if stat.st_ino != self._keys_inode:
+            # New files after a compaction: every row moved
+            self._keys_inode = stat.st_ino
+            self._rows = {}
+            self._count = 0
+        if committed == self._count:
+            return
+
+        keys = np.memmap(self._keys_path, dtype=np.uint64, mode="r", shape=(committed,))
+        for row in range(self._count, committed):
+            self._rows.setdefault(int(keys[row]), row)
+
+        self._vecs = np.memmap(
+            self._vecs_path, dtype=_SUPPORTED_DTYPES[self.dtype], mode="r", shape=(committed, self._dim)
+        )
+        if self.dtype == "int8":
+            self._scales = np.memmap(self._scales_path, dtype=np.float32, mode="r", shape=(committed,))
+        self._count = committed
+
+    def _dequantize(self, row: int) -> np.ndarray:
+        vector = np.asarray(self._vecs[row], dtype=np.float32)
+        if self.dtype == "int8":
+            vector = vector * self._scales[row]
+        return vector
+
+    def _quantize(self, vectors: np.ndarray):
+        if self.dtype == "float16":
+            return vectors.astype(np.float16), None
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.clip(np.rint(vectors / scales[:, np.newaxis]), -127, 127).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+
+    def _compact(self, keep: int) -> None:
+        """
+        Rewrite the store with only its newest ``keep`` rows (caller holds the file lock).
+
+        Each file is written next to the original and swapped in with ``os.replace``;
+        the keys file goes last, and readers only re-map under the shared lock, so they
+        see either the old set of files or the new one.
+        """
+        start = self._count - keep
+        paths = [(self._vecs_path, self._vecs[start:self._count])]
+        if self.dtype == "int8":
+            paths.append((self._scales_path, self._scales[start:self._count]))
+        keys = np.memmap(self._keys_path, dtype=np.uint64, mode="r", shape=(self._count,))
+        paths.append((self._keys_path, keys[start:self._count]))
+
+        for path, rows in paths:
+            with open(f"{path}.tmp", "wb") as f:
+                f.write(np.ascontiguousarray(rows).tobytes())
+        for path, _ in paths:
+            os.replace(f"{path}.tmp", path)
+
+        print(f"[embedding_store] Compacted '{self.name}': kept the newest {keep} of {self._count} rows")
+        self._vecs = self._scales = None
+        self._refresh(locked=True)
+
+    def get(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up stored vectors for the given texts.
+
+        Args:
+            texts: List of text strings
+
+        Returns:
+            List aligned with ``texts``: a float32 vector, or None when not stored
+        """
+        with self._thread_lock:
+            self._refresh()
+            results: List[Optional[np.ndarray]] = []
+            for text in texts:
+                row = self._rows.get(text_key(text))
+                results.append(self._dequantize(row) if row is not None else None)
+            return results
+
+    def put(self, texts: List[str], vectors: List[np.ndarray]) -> int:
+        """
+        Append vectors for texts that are not stored yet.
+
+        Args:
+            texts: List of text strings
+            vectors: Embedding for each text
+
+        Returns:
+            Number of rows appended
+        """
+        if len(texts) != len(vectors):
+            raise ValueError(f"Expected {len(texts)} vectors but got {len(vectors)}")
+        if not texts:
+            return 0
+
+        matrix = np.vstack([np.asarray(v, dtype=np.float32) for v in vectors])
+
+        with self._thread_lock:
+            handle = self._lock()
+            try:
+                self._refresh(locked=True)
+
+                if self._dim is None:
+                    self._dim = int(matrix.shape[1])
+                    with open(self._meta_path, "w") as f:
+                        json.dump({"dim": self._dim, "dtype": self.dtype}, f)
+                elif matrix.shape[1] != self._dim:
+                    raise ValueError(
+                        f"Vector dimension {matrix.shape[1]} does not match store dimension {self._dim}"
+                    )
+
+                new_keys, new_rows, seen = [], [], set()
+                for i, text in enumerate(texts):
+                    key = text_key(text)
+                    if key in self._rows or key in seen:
+                        continue
+                    seen.add(key)
+                    new_keys.append(key)
+                    new_rows.append(i)
+
+                if not new_keys:
+                    return 0
+
+                self._discard_uncommitted()
+                if self.max_entries:
+                    # The newest texts win when one batch alone exceeds the bound
+                    new_keys, new_rows = new_keys[-self.max_entries:], new_rows[-self.max_entries:]
+                    if self._count + len(new_keys) > self.max_entries:
+                        self._compact(max(0, int(self.max_entries * COMPACT_TO) - len(new_keys)))
+                quantized, scales = self._quantize(matrix[new_rows])
+
+                # Vectors and scales first; appending keys commits the rows for readers
+                with open(self._vecs_path, "ab") as f:
+                    f.write(quantized.tobytes())
+                if scales is not None:
+                    with open(self._scales_path, "ab") as f:
+                        f.write(scales.tobytes())
+                with open(self._keys_path, "ab") as f:
+                    f.write(np.asarray(new_keys, dtype=np.uint64).tobytes())
+
+                self._refresh(locked=True)
+                return len(new_keys)
+            finally:
+                self._unlock(handle)
+
+
+_stores: Dict[str, EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(name: str) -> Optional[EmbeddingStore]:
+    """
+    Return the shared embedding store for a model, or None when the store is disabled.
+
+    Args:
+        name: Store name, normally the embedding model name
+
+    Returns:
+        EmbeddingStore instance or None
+    """
+    if not EMBEDDING_STORE_ENABLED:
+        return None
+
+    with _stores_lock:
+        if name not in _stores:
+            try:
+                _stores[name] = EmbeddingStore(
+                    EMBEDDING_STORE_DIR, name, EMBEDDING_STORE_DTYPE, EMBEDDING_STORE_MAX_ENTRIES
+                )
+            except Exception as e:
+                print(f"[embedding_store] Warning: Embedding store unavailable: {str(e)}")
+                return None
+        return _stores[name]
+
+
+def prebuild_vocabulary_embeddings() -> int:
+    """
+    Embed the GitHub linguist languages and canonical topics into the shared store.
+
+    Technologies and topics returned by fetch_github_readme are then served from disk
+    without a live embedding call.
+
+    Returns:
+        Number of vocabulary entries now available in the store
+    """
+    from tool.ollama_embeddings import get_ollama_embeddings
+    from tool.topic_vocabulary import CANONICAL_TOPICS, LINGUIST_LANGUAGES, slugify_topic
+
+    vocabulary = list(dict.fromkeys(
+        CANONICAL_TOPICS
+        + LINGUIST_LANGUAGES
+        + [slugify_topic(language) for language in LINGUIST_LANGUAGES]
+    ))
+    vocabulary = [text for text in vocabulary if text]
+    get_ollama_embeddings(vocabulary)
+    return len(vocabulary)
+
+
+if __name__ == "__main__":
+    count = prebuild_vocabulary_embeddings()
+    print(f"[embedding_store] Prebuilt {count} vocabulary embeddings in {EMBEDDING_STORE_DIR}")
@@ -0,0 +1,302 @@
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+import numpy as np
+from tool.keyphrase_extractor import STOPWORDS
+from tool.lexical_scorer import tokenize
+from tool.prompt_packing import CHARS_PER_TOKEN, estimate_tokens
+
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 50
+TEXTRANK_TOLERANCE = 1e-6
+MAX_VOCABULARY = 4096
+HEADING_BUDGET_SHARE = 0.25  # At most this share of the budget goes to the heading outline
+DUPLICATE_SIMILARITY = 0.9  # Sentences this similar to a selected one are skipped
+MAX_SENTENCE_TOKENS = 100  # Longer "sentences" (unpunctuated prose, CSV, CJK) are hard-wrapped
+MIN_SENTENCE_CHARS = 20  # Sentences with fewer than 3 ASCII words are kept from this length (e.g. CJK)
+MIN_SUMMARY_SHARE = 0.5  # A summary filling less of the budget falls back to the head of the text
+
+_HEADING_LINE_PATTERN = re.compile(r"^ {0,3}(#{1,6})\s+(.+?)\s*#*\s*$")
+_FENCE_PATTERN = re.compile(r"^ {0,3}(```|~~~)")
+_TABLE_RULE_PATTERN = re.compile(r"^\s*\|?\s*:?-{3,}")
+_LIST_MARKER_PATTERN = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+_IMAGE_PATTERN = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK_PATTERN = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+_SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[*_`])")
+
+
+def _clean_line(line: str) -> str:
+    line = _IMAGE_PATTERN.sub("", line)
+    line = _LINK_PATTERN.sub(r"\1", line)
+    line = _HTML_TAG_PATTERN.sub("", line)
+    return " ".join(line.split())
+
+
+def _wrap(sentence: str, max_tokens: int) -> List[str]:
+    """Hard-wrap a sentence into pieces of at most ``max_tokens``, on spaces where there are any"""
+    max_chars = max(1, max_tokens * CHARS_PER_TOKEN)
+    pieces: List[str] = []
+    current = ""
+    for word in sentence.split(" "):
+        # Words longer than a piece (CJK text, long tokens) are cut by characters
+        while len(word) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(word[:max_chars])
+            word = word[max_chars:]
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_sentences(
+    text: str,
+    max_sentence_tokens: int = MAX_SENTENCE_TOKENS
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Split Markdown into headings and sentences, in document order.
+
+    Code blocks, images, HTML tags and table rules are dropped and links keep only their
+    text. Paragraphs are split on sentence punctuation; list items and table rows are
+    sentences of their own. Sentences longer than ``max_sentence_tokens`` are hard-wrapped
+    into pieces, so text without recognizable sentence ends can still be selected.
+
+    Returns:
+        (headings, sentences): headings as {"position", "level", "text"}, sentences as
+        {"position", "section", "text"} where section is the index of the heading above
+    """
+    headings: List[Dict[str, Any]] = []
+    sentences: List[Dict[str, Any]] = []
+    paragraph: List[str] = []
+    in_fence = False
+    position = 0
+
+    def flush() -> None:
+        nonlocal position
+        text = " ".join(paragraph)
+        paragraph.clear()
+        for sentence in _SENTENCE_END_PATTERN.split(text):
+            sentence = sentence.strip()
+            if len(tokenize(sentence)) < 3 and len(sentence) < MIN_SENTENCE_CHARS:
+                continue
+            for piece in _wrap(sentence, max_sentence_tokens):
+                sentences.append({"position": position, "section": len(headings) - 1, "text": piece})
+                position += 1
+
+    for line in (text or "").splitlines():
+        if _FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+            flush()
+            continue
+        if in_fence:
+            continue
+        heading = _HEADING_LINE_PATTERN.match(line)
+        if heading:
+            flush()
+            headings.append({"position": position, "level": len(heading.group(1)), "text": _clean_line(heading.group(2))})
+            position += 1
+            continue
+        if not line.strip() or _TABLE_RULE_PATTERN.match(line):
+            flush()
+            continue
+        cleaned = _clean_line(_LIST_MARKER_PATTERN.sub("", line))
+        if not cleaned:
+            continue
+        if _LIST_MARKER_PATTERN.match(line) or line.lstrip().startswith("|"):
+            flush()
+            paragraph.append(cleaned.strip("| "))
+            flush()
+        else:
+            paragraph.append(cleaned)
+    flush()
+    return headings, sentences
+
+
+def _sentence_vectors(sentences: List[str]) -> np.ndarray:
+    """L2-normalized TF-IDF rows over the most frequent content words"""
+    token_lists = [
+        [t for t in tokenize(s) if t not in STOPWORDS and len(t) > 1 and not t.replace(".", "").isdigit()]
+        for s in sentences
+    ]
+    document_frequency = Counter(t for tokens in token_lists for t in set(tokens))
+    vocabulary = {t: i for i, (t, _) in enumerate(document_frequency.most_common(MAX_VOCABULARY))}
+
+    vectors = np.zeros((len(sentences), max(1, len(vocabulary))), dtype=np.float32)
+    for row, tokens in enumerate(token_lists):
+        for token, count in Counter(tokens).items():
+            if token in vocabulary:
+                vectors[row, vocabulary[token]] = count
+    if vocabulary:
+        idf = np.log((1 + len(sentences)) / (1 + np.array(
+            [document_frequency[t] for t in vocabulary], dtype=np.float32
+        ))) + 1
+        vectors *= idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def textrank_scores(vectors: np.ndarray) -> np.ndarray:
+    """
+    TextRank over the cosine-similarity graph of the given (L2-normalized) rows.
+
+    The similarity matrix is never built: with S = V V^T (minus self-loops) each power
+    iteration is two matrix-vector products with V, so memory stays linear in the number
+    of sentences instead of quadratic.
+    """
+    n = len(vectors)
+    if n == 0:
+        return np.zeros(0)
+    self_similarity = np.einsum("ij,ij->i", vectors, vectors)
+    degree = vectors @ (vectors.T @ np.ones(n, dtype=np.float32)) - self_similarity
+    # Isolated sentences share no words with any other; give them no outgoing weight
+    inverse_degree = np.where(degree > 1e-9, 1.0 / np.maximum(degree, 1e-9), 0.0)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(TEXTRANK_ITERATIONS):
+        spread = scores * inverse_degree
+        incoming = vectors @ (vectors.T @ spread) - self_similarity * spread
+        updated = (1 - TEXTRANK_DAMPING) / n + TEXTRANK_DAMPING * incoming
+        # Rank lost by isolated sentences is redistributed evenly
+        updated += (1 - updated.sum()) / n
+        converged = np.abs(updated - scores).sum() < TEXTRANK_TOLERANCE
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+def _heading_line(heading: Dict[str, Any]) -> str:
+    return "#" * heading["level"] + " " + heading["text"]
+
+
+def _cost(line: str) -> int:
+    return estimate_tokens(line + "\n\n")
+
+
+def _outline(headings: List[Dict[str, Any]], token_budget: int) -> List[int]:
+    """Indices of headings to keep, shallowest levels first, within the budget"""
+    kept: List[int] = []
+    used = 0
+    for level in range(1, 7):
+        for i, heading in enumerate(headings):
+            if heading["level"] != level:
+                continue
+            cost = _cost(_heading_line(heading))
+            if used + cost > token_budget:
+                return sorted(kept)
+            kept.append(i)
+            used += cost
+    return sorted(kept)
+
+
+def _head(text: str, token_budget: int) -> str:
+    """The start of ``text`` within the budget, cut at the last whitespace when there is one"""
+    head = text[:max(1, token_budget * CHARS_PER_TOKEN)]
+    cut = head.rfind(" ")
+    return (head[:cut] if cut > len(head) // 2 else head).strip()
+
+
+def extractive_summary(text: str, token_budget: int) -> Dict[str, Any]:
+    """
+    Condense Markdown to about ``token_budget`` tokens with TextRank, keeping headings.
+
+    Sentences are ranked by TextRank over their TF-IDF cosine similarity, nudged towards
+    the opening sentence of the document and of each section, and picked greedily until
+    the budget is spent, skipping near-duplicates of sentences already picked. The heading
+    outline (up to a quarter of the budget) and the picked sentences are then written
+    back in document order, so every part of a long document can be represented instead
+    of only its beginning. Text that already fits is returned unchanged.
+
+    When the picked sentences fill less than half of the budget (text with no usable
+    sentences, such as a README that is only code), the head of the text, cut to the
+    budget, is returned instead, so the summary is never empty.
+
+    Args:
+        text: Markdown or plain text
+        token_budget: Approximate token budget for the summary
+
+    Returns:
+        Dictionary with "summary", "summarized", "method" ("textrank" or "head"), "tokens",
+        "source_tokens", "sentences_used", "total_sentences" and "headings_kept"
+    """
+    text = text or ""
+    source_tokens = estimate_tokens(text)
+    if source_tokens <= token_budget:
+        return {
+            "summary": text, "summarized": False, "method": None, "tokens": source_tokens,
+            "source_tokens": source_tokens, "sentences_used": None, "total_sentences": None,
+            "headings_kept": None
+        }
+
+    # A single piece never takes more than a quarter of the budget
+    headings, sentences = split_sentences(text, max(1, min(MAX_SENTENCE_TOKENS, token_budget // 4)))
+    kept_headings = set(_outline(headings, int(token_budget * HEADING_BUDGET_SHARE)))
+    used = sum(_cost(_heading_line(headings[i])) for i in kept_headings)
+
+    selected: List[int] = []
+    if sentences:
+        vectors = _sentence_vectors([s["text"] for s in sentences])
+        scores = textrank_scores(vectors)
+        # Lead bias: a section's first sentence usually says what the section is about
+        first_in_section = {}
+        for i, sentence in enumerate(sentences):
+            first_in_section.setdefault(sentence["section"], i)
+        boost = np.ones(len(sentences))
+        boost[list(first_in_section.values())] = 1.5
+        # The opening sentence (usually the project description) always goes first
+        ranked = [0] + [int(i) for i in np.argsort(-(scores * boost), kind="stable") if i != 0]
+
+        for i in ranked:
+            section = sentences[i]["section"]
+            # A sentence is only shown under its own heading
+            heading_cost = _cost(_heading_line(headings[section])) if section >= 0 and section not in kept_headings else 0
+            cost = estimate_tokens(sentences[i]["text"] + " ") + heading_cost
+            if used + cost > token_budget:
+                continue
+            if selected and float(np.max(vectors[selected] @ vectors[i])) >= DUPLICATE_SIMILARITY:
+                continue
+            selected.append(i)
+            if heading_cost:
+                kept_headings.add(section)
+            used += cost
+
+    # Write headings and sentences back in document order; sentences of one section
+    # stay in a single paragraph
+    items = [(headings[i]["position"], True, _heading_line(headings[i])) for i in kept_headings]
+    items += [(sentences[i]["position"], False, sentences[i]["text"]) for i in selected]
+    blocks: List[str] = []
+    paragraph: List[str] = []
+    for _, is_heading, line in sorted(items):
+        if is_heading:
+            if paragraph:
+                blocks.append(" ".join(paragraph))
+                paragraph = []
+            blocks.append(line)
+        else:
+            paragraph.append(line)
+    if paragraph:
+        blocks.append(" ".join(paragraph))
+    summary = "\n\n".join(blocks)
+
+    method = "textrank"
+    if estimate_tokens(summary) < token_budget * MIN_SUMMARY_SHARE:
+        summary = _head(text, token_budget)
+        method = "head"
+
+    return {
+        "summary": summary,
+        "summarized": True,
+        "method": method,
+        "tokens": estimate_tokens(summary),
+        "source_tokens": source_tokens,
+        "sentences_used": len(selected),
+        "total_sentences": len(sentences),
+        "headings_kept": len(kept_headings)
+    }
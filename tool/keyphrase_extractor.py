@@ -0,0 +1,107 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List
+from tool.lexical_scorer import tokenize
+from tool.readme_chunking import chunk_text
+
+# English function words plus README boilerplate that never makes a useful tag
+STOPWORDS = set("""
+a about above after again all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from
+further had has have having he her here hers him his how i if in into is it its itself
+just me more most my no nor not now of off on once only or other our ours out over own
+same she should so some such than that the their theirs them then there these they this
+those through to too under until up very was we were what when where which while who
+whom why will with would you your yours yourself via etc e g ie eg per
+readme install installation installing usage use used using uses run running runs
+example examples file files code project projects license licensed mit apache copyright
+contributing contribute contributors contribution please see note notes step steps
+following follow get getting started start make makes new default option options
+version versions release releases support supports supported feature features set
+setup configure configuration config docs documentation guide tutorial quick quickstart
+http https www com org github io md html png svg img src href badge badges shields
+true false null none yes one two three first need needs want like well way work works
+""".split())
+
+_URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+_CODE_FENCE_PATTERN = re.compile(r"^ {0,3}(```|~~~).*?^ {0,3}\1", re.MULTILINE | re.DOTALL)
+_INLINE_CODE_PATTERN = re.compile(r"`[^`\n]*`")
+# Sentence and list punctuation ends a phrase ("node.js" does not)
+_PHRASE_BREAK_PATTERN = re.compile(r"[.,;:!?](?:\s|$)|[()\[\]{}|*\n]")
+
+
+def _candidate_phrases(text: str, max_words: int) -> List[str]:
+    """Every 1..max_words-gram (no repeated word) inside runs of content words, hyphen-joined"""
+    phrases = []
+    for segment in _PHRASE_BREAK_PATTERN.split(text):
+        run: List[str] = []
+        for token in tokenize(segment) + [""]:
+            if token and token not in STOPWORDS and not token.isdigit() and len(token) > 2:
+                run.append(token)
+                continue
+            for n in range(1, max_words + 1):
+                for start in range(len(run) - n + 1):
+                    words = run[start:start + n]
+                    if len(set(words)) == n:
+                        phrases.append("-".join(words))
+            run = []
+    return phrases
+
+
+def tfidf_keyphrases(text: str, top_k: int = 10, max_words: int = 3) -> Dict[str, float]:
+    """
+    Extract keyphrases from a README with TF-IDF over its own chunks.
+
+    Candidate phrases are n-grams of content words that do not cross a stopword. Each
+    is scored by its frequency in the whole README times its inverse document frequency
+    across README chunks, so terms spread evenly over every section (boilerplate) rank
+    below terms concentrated where the project is described. A phrase contained in a
+    better-ranked one is dropped. Code blocks, inline code and URLs are ignored; a
+    single-chunk README degrades to plain term frequency.
+
+    Args:
+        text: README text
+        top_k: Maximum number of keyphrases to return (default: 10)
+        max_words: Maximum words per keyphrase (default: 3)
+
+    Returns:
+        Keyphrase slug -> score normalized to the best phrase (1.0), best first
+
+    Example:
+        >>> tfidf_keyphrases("Vector search engine. The vector search engine is fast.", top_k=1)
+        {'vector-search-engine': 1.0}
+    """
+    if not isinstance(text, str) or not text.strip():
+        return {}
+
+    text = _CODE_FENCE_PATTERN.sub(" ", text)
+    text = _INLINE_CODE_PATTERN.sub(" ", text)
+    text = _URL_PATTERN.sub(" ", text)
+
+    chunks = chunk_text(text, chunk_size=1000, overlap=200) or [text]
+    chunk_phrases = [set(_candidate_phrases(chunk, max_words)) for chunk in chunks]
+    document_frequency = Counter(phrase for phrases in chunk_phrases for phrase in phrases)
+    term_frequency = Counter(_candidate_phrases(text, max_words))
+
+    n = len(chunks)
+    scores = {
+        phrase: count * (math.log((1 + n) / (1 + document_frequency.get(phrase, 0))) + 1.0)
+        # A repeated multi-word phrase is more specific than its words
+        * (1.0 + 0.5 * phrase.count("-"))
+        for phrase, count in term_frequency.items()
+        if count > 1 or "-" not in phrase
+    }
+    if not scores:
+        return {}
+
+    ranked = []
+    for phrase, score in sorted(scores.items(), key=lambda item: (-item[1], item[0])):
+        if any(f"-{phrase}-" in f"-{kept}-" for kept, _ in ranked):
+            continue
+        ranked.append((phrase, score))
+        if len(ranked) == top_k:
+            break
+
+    best = ranked[0][1]
+    return {phrase: round(score / best, 4) for phrase, score in ranked}
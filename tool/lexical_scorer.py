@@ -0,0 +1,164 @@
+import re
+import numpy as np
+from collections import Counter
+from typing import List, Dict, Any
+
+# Trailing "+" and "#" belong to the token ("c++", "c#", "f#"); a lone "+" does not
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[+#]+(?![a-z0-9]))?")
+
+LEXICAL_MIN_TAG_LENGTH = 3  # Shorter tags ("go", "js", "c#") occur in too much unrelated prose
+# Terms that appear in almost every README, so a literal match says little about the project
+GENERIC_TERMS = frozenset({
+    "api", "app", "apps", "cli", "code", "data", "docs", "framework", "lib", "library",
+    "open", "rest", "sdk", "server", "service", "test", "tool", "tools", "ui", "web"
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase alphanumeric tokens. Tag separators (hyphens, underscores,
+    dots) split tokens too, so "rest-api" matches "REST API" in prose. Trailing "+" and
+    "#" are kept, so "C++" and "C#" do not collapse into "c".
+
+    Example:
+        >>> tokenize("FastAPI + REST-API")
+        ['fastapi', 'rest', 'api']
+        >>> tokenize("Bindings for C++ and C#")
+        ['bindings', 'for', 'c++', 'and', 'c#']
+    """
+    if not isinstance(text, str):
+        return []
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def is_lexically_specific(tag: str) -> bool:
+    """
+    Whether a literal match of ``tag`` is strong enough evidence to accept it without
+    embeddings: it must be at least LEXICAL_MIN_TAG_LENGTH characters and not made only
+    of GENERIC_TERMS.
+
+    Example:
+        >>> [is_lexically_specific(tag) for tag in ["fastapi", "c++", "go", "rest-api"]]
+        [True, True, False, False]
+    """
+    terms = tokenize(tag)
+    if len("".join(terms)) < LEXICAL_MIN_TAG_LENGTH:
+        return False
+    return not all(term in GENERIC_TERMS for term in terms)
+
+
+def bm25_tag_chunk_scores(
+    chunks: List[str],
+    tags: List[str],
+    k1: float = 1.5,
+    b: float = 0.75
+) -> Dict[str, np.ndarray]:
+    """
+    Score every tag (as a BM25 query) against every README chunk (as a document).
+
+    Term frequencies are gathered only for tag terms, then BM25 weights are computed
+    for the whole term x chunk matrix at once and projected onto tags with a single
+    matrix product.
+
+    Scores are normalized by each tag's maximum attainable BM25 score (every term
+    saturated), so 1.0 means every tag term is frequent in the chunk and a single
+    mention of every term in an average-length chunk lands around 0.4.
+
+    Args:
+        chunks: README text chunks
+        tags: Candidate tags
+        k1: Term frequency saturation parameter (default: 1.5)
+        b: Document length normalization parameter (default: 0.75)
+
+    Returns:
+        Dictionary with:
+            - "scores": (num_tags, num_chunks) normalized BM25 scores in [0, 1]
+            - "coverage": (num_tags, num_chunks) fraction of tag terms present in the chunk
+    """
+    if not chunks or not tags:
+        empty = np.zeros((len(tags), len(chunks)), dtype=np.float32)
+        return {"scores": empty, "coverage": empty.copy()}
+
+    tag_terms = [list(dict.fromkeys(tokenize(tag))) for tag in tags]
+    vocabulary = {term: i for i, term in enumerate(dict.fromkeys(t for terms in tag_terms for t in terms))}
+
+    if not vocabulary:
+        empty = np.zeros((len(tags), len(chunks)), dtype=np.float32)
+        return {"scores": empty, "coverage": empty.copy()}
+
+    # Term frequency matrix restricted to tag vocabulary: (terms, chunks)
+    term_freq = np.zeros((len(vocabulary), len(chunks)), dtype=np.float32)
+    doc_lengths = np.zeros(len(chunks), dtype=np.float32)
+    for j, chunk in enumerate(chunks):
+        tokens = tokenize(chunk)
+        doc_lengths[j] = len(tokens)
+        for term, count in Counter(tokens).items():
+            i = vocabulary.get(term)
+            if i is not None:
+                term_freq[i, j] = count
+
+    avg_length = float(doc_lengths.mean()) or 1.0
+    doc_freq = np.count_nonzero(term_freq, axis=1).astype(np.float32)
+    idf = np.log1p((len(chunks) - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    length_norm = k1 * (1.0 - b + b * doc_lengths / avg_length)
+    saturation = term_freq * (k1 + 1.0) / (term_freq + length_norm[np.newaxis, :])
+    term_scores = idf[:, np.newaxis] * saturation
+
+    # Tag x term incidence matrix
+    incidence = np.zeros((len(tags), len(vocabulary)), dtype=np.float32)
+    for t, terms in enumerate(tag_terms):
+        for term in terms:
+            incidence[t, vocabulary[term]] = 1.0
+
+    max_scores = incidence @ (idf * (k1 + 1.0))
+    max_scores[max_scores == 0] = 1.0
+    term_counts = incidence.sum(axis=1)
+    term_counts[term_counts == 0] = 1.0
+
+    scores = (incidence @ term_scores) / max_scores[:, np.newaxis]
+    coverage = (incidence @ (term_freq > 0).astype(np.float32)) / term_counts[:, np.newaxis]
+
+    return {"scores": scores, "coverage": coverage}
+
+
+def lexical_tag_scores(
+    chunks: List[str],
+    tags: List[str],
+    k1: float = 1.5,
+    b: float = 0.75
+) -> List[Dict[str, Any]]:
+    """
+    Best lexical match for each tag across README chunks.
+
+    Args:
+        chunks: README text chunks
+        tags: Candidate tags
+        k1: BM25 term frequency saturation parameter (default: 1.5)
+        b: BM25 length normalization parameter (default: 0.75)
+
+    Returns:
+        List aligned with ``tags`` of dictionaries with "lexical_score" (best normalized
+        BM25 score), "coverage" (term coverage in that chunk) and "best_chunk" (index)
+
+    Example:
+        >>> results = lexical_tag_scores(["Built with FastAPI and Python."], ["fastapi", "rust"])
+        >>> [(round(r["lexical_score"], 2), r["coverage"]) for r in results]
+        [(0.4, 1.0), (0.0, 0.0)]
+    """
+    matrices = bm25_tag_chunk_scores(chunks, tags, k1=k1, b=b)
+    scores, coverage = matrices["scores"], matrices["coverage"]
+
+    if scores.size == 0:
+        return [{"lexical_score": 0.0, "coverage": 0.0, "best_chunk": None} for _ in tags]
+
+    best = np.argmax(scores, axis=1)
+    rows = np.arange(len(tags))
+    return [
+        {
+            "lexical_score": float(scores[t, c]),
+            "coverage": float(coverage[t, c]),
+            "best_chunk": int(c)
+        }
+        for t, c in zip(rows, best)
+    ]
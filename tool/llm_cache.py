@@ -0,0 +1,246 @@
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Sequence
+from dotenv import load_dotenv
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+from tool.llm_usage import record_llm_call
+
+load_dotenv()
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))  # 0 disables expiry
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+# Set per request (see llm_cache_bypass); copied into worker threads with the context
+_bypass = contextvars.ContextVar("llm_cache_bypass", default=False)
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _llm_model(llm_string: str) -> str:
+    """Model name from LangChain's llm_string (the serialized model, then '---' and call params)"""
+    try:
+        return json.loads(llm_string.split("---", 1)[0])["kwargs"]["model"]
+    except Exception:
+        return "unknown"
+
+
+class SQLiteLLMCache(BaseCache):
+    """
+    Persistent LangChain LLM cache stored in a single SQLite file.
+
+    LangChain calls ``lookup``/``update`` with the rendered prompt and an ``llm_string``
+    that serializes the model name, temperature and every bound call argument, including
+    the tool schema used by ``with_structured_output``. Entries are keyed by the hashes
+    of both, so a different model, temperature, prompt or output schema never collides.
+
+    Entries older than ``ttl_seconds`` are treated as misses and deleted. When the cache
+    grows past ``max_entries`` the least recently used entries are evicted. The file is
+    opened in WAL mode so several worker processes can share it.
+
+    Hits are recorded in the LLM usage ledger as zero-cost calls, with the stored
+    response's tokens and the cost they would have had.
+
+    Example:
+        >>> import tempfile
+        >>> cache = SQLiteLLMCache(os.path.join(tempfile.mkdtemp(), "llm_cache.sqlite"))
+        >>> cache.update("prompt", "llm", [Generation(text="answer")])
+        >>> cache.lookup("prompt", "llm")[0].text
+        'answer'
+        >>> cache.lookup("prompt", "other llm") is None
+        True
+        >>> cache.stats()["hit_rate"]
+        0.5
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES
+    ):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}")
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "bypassed": 0, "writes": 0, "expired": 0, "evicted": 0}
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY,"
+                " llm_hash TEXT NOT NULL,"
+                " prompt_hash TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+            self._conn.commit()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> Dict[str, str]:
+        llm_hash = _sha256(llm_string)
+        prompt_hash = _sha256(prompt)
+        return {"key": _sha256(f"{llm_hash}:{prompt_hash}"), "llm_hash": llm_hash, "prompt_hash": prompt_hash}
+
+    def _count(self, counter: str) -> None:
+        self._counters[counter] += 1
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        if _bypass.get():
+            with self._lock:
+                self._count("bypassed")
+            return None
+
+        key = self._key(prompt, llm_string)["key"]
+        start = time.perf_counter()
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self._count("misses")
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds > 0 and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self._count("expired")
+                self._count("misses")
+                return None
+
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+
+        try:
+            generations = loads(value, allowed_objects="core")
+        except Exception as e:
+            print(f"[llm_cache] Warning: Dropping unreadable cache entry: {str(e)}")
+            with self._lock:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self._count("misses")
+            return None
+
+        with self._lock:
+            self._count("hits")
+        record_llm_call(_llm_model(llm_string), time.perf_counter() - start, result=generations, cached=True)
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        # A bypassed request still refreshes the stored answer
+        key = self._key(prompt, llm_string)
+        try:
+            value = dumps(list(return_val))
+        except Exception as e:
+            print(f"[llm_cache] Warning: Response not cacheable: {str(e)}")
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, llm_hash, prompt_hash, value, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key["key"], key["llm_hash"], key["prompt_hash"], value, now, now)
+            )
+            self._count("writes")
+
+            overflow = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN"
+                    " (SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self._counters["evicted"] += overflow
+            self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate metrics for this process plus the current number of stored entries"""
+        with self._lock:
+            counters = dict(self._counters)
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hit_rate": counters["hits"] / lookups if lookups else 0.0
+        }
+
+
+_llm_cache: Optional[SQLiteLLMCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[SQLiteLLMCache]:
+    """
+    Return the process-wide LLM response cache, or None when it is disabled.
+
+    Pass it as ``cache=`` when constructing a chat model.
+    """
+    global _llm_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            try:
+                _llm_cache = SQLiteLLMCache()
+            except Exception as e:
+                print(f"[llm_cache] Warning: LLM cache unavailable: {str(e)}")
+                return None
+        return _llm_cache
+
+
+def llm_cache_stats() -> Dict[str, Any]:
+    """Hit-rate metrics of the shared LLM cache"""
+    cache = get_llm_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@contextmanager
+def llm_cache_bypass(bypass: bool = True):
+    """
+    Skip cache lookups for the LLM calls made inside the block (fresh answers are still
+    written back). Applies to the current request only, e.g. wrap
+    ``run_simple_analysis_workflow("facebook", "react")`` to re-analyze a repository
+    without cached answers.
+    """
+    token = _bypass.set(bool(bypass))
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
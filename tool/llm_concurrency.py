@@ -0,0 +1,229 @@
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LLM_CONCURRENCY_INITIAL = float(os.getenv("LLM_CONCURRENCY_INITIAL", "8"))
+LLM_CONCURRENCY_MIN = float(os.getenv("LLM_CONCURRENCY_MIN", "1"))
+LLM_CONCURRENCY_MAX = float(os.getenv("LLM_CONCURRENCY_MAX", "32"))
+LLM_CONCURRENCY_DECREASE = float(os.getenv("LLM_CONCURRENCY_DECREASE", "0.5"))  # Multiplier on 429s / timeouts
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "300"))  # Max seconds a call waits for a slot
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))  # Retries of throttled / timed-out calls
+LLM_MAX_TIMEOUT_RETRIES = int(os.getenv("LLM_MAX_TIMEOUT_RETRIES", "1"))  # Of those, retries after a timeout
+LLM_CALL_DEADLINE = float(os.getenv("LLM_CALL_DEADLINE", "300"))  # Seconds after which no retry starts (0: none)
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0"))
+LLM_RETRY_MAX_DELAY = 30.0
+
+T = TypeVar("T")
+
+_THROTTLE_ERROR_NAMES = {"ResourceExhausted", "TooManyRequests", "RateLimitError"}
+_TIMEOUT_ERROR_NAMES = {"DeadlineExceeded", "ReadTimeout", "ConnectTimeout", "TimeoutException", "Timeout"}
+_THROTTLE_MESSAGE_PATTERN = re.compile(r"\b429\b|RESOURCE_EXHAUSTED|[Qq]uota exceeded")
+
+
+def classify_llm_error(error: BaseException) -> str:
+    """
+    Classify a failed LLM call.
+
+    Returns:
+        "throttled" for quota / 429 errors, "timeout" for timeouts, otherwise "error"
+    """
+    # The client wraps some errors; look through the cause chain
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        name = type(error).__name__
+        message = str(error)
+        if name in _THROTTLE_ERROR_NAMES or _THROTTLE_MESSAGE_PATTERN.search(message):
+            return "throttled"
+        if isinstance(error, TimeoutError) or name in _TIMEOUT_ERROR_NAMES or "DEADLINE_EXCEEDED" in message:
+            return "timeout"
+        error = error.__cause__ or error.__context__
+    return "error"
+
+
+class AIMDLimiter:
+    """
+    Process-wide concurrency limit for LLM calls, adapted with AIMD.
+
+    Every call takes a slot; calls beyond the current limit queue (FIFO-ish, on a
+    condition variable) instead of failing. Each success raises the limit by
+    ``1 / limit`` (about +1 per window of ``limit`` calls); a 429 or timeout multiplies
+    it by ``decrease``. Only the first congestion signal of a window cuts the limit, so
+    a burst of 429s from calls that were already in flight halves it once, not ten times.
+    Throttled and timed-out calls are retried with jittered exponential backoff
+    (outside their slot), so a quota hit delays a chunk instead of dropping it. A call
+    that timed out is retried at most ``max_timeout_retries`` times, since each attempt
+    can take the full request timeout, and no attempt is started (or queued for) after
+    ``deadline`` seconds, so one call can hold its caller for about ``deadline`` plus one
+    request timeout at most.
+
+    Example:
+        >>> limiter = AIMDLimiter(initial=4)
+        >>> limiter.call(lambda: "response")
+        'response'
+        >>> limiter.stats()["limit"]
+        4.25
+    """
+
+    def __init__(
+        self,
+        initial: float = LLM_CONCURRENCY_INITIAL,
+        min_limit: float = LLM_CONCURRENCY_MIN,
+        max_limit: float = LLM_CONCURRENCY_MAX,
+        decrease: float = LLM_CONCURRENCY_DECREASE,
+        queue_timeout: float = LLM_QUEUE_TIMEOUT,
+        max_retries: int = LLM_MAX_RETRIES,
+        retry_base_delay: float = LLM_RETRY_BASE_DELAY,
+        max_timeout_retries: int = LLM_MAX_TIMEOUT_RETRIES,
+        deadline: float = LLM_CALL_DEADLINE
+    ):
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError(f"Expected 1 <= min_limit <= max_limit, got {min_limit} and {max_limit}")
+        if not 0 < decrease < 1:
+            raise ValueError(f"decrease must be between 0 and 1, got {decrease}")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease = decrease
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.max_timeout_retries = max_timeout_retries
+        self.deadline = deadline
+
+        self._limit = min(max(initial, min_limit), max_limit)
+        self._in_flight = 0
+        self._waiting = 0
+        self._epoch = 0  # Bumped on every decrease; marks which window a call started in
+        self._condition = threading.Condition()
+        self._local = threading.local()  # Per thread: when its latest call got a slot
+        self._metrics = {
+            "calls": 0, "successes": 0, "throttled": 0, "timeouts": 0, "errors": 0,
+            "retries": 0, "gave_up": 0, "deadline_exceeded": 0, "queue_timeouts": 0, "decreases": 0,
+            "total_wait_seconds": 0.0, "max_waiting": 0, "peak_in_flight": 0
+        }
+
+    @property
+    def limit(self) -> float:
+        with self._condition:
+            return self._limit
+
+    @property
+    def waiting(self) -> int:
+        """Calls currently queued for a slot"""
+        with self._condition:
+            return self._waiting
+
+    def slot_acquired_at(self) -> Optional[float]:
+        """``time.perf_counter()`` when this thread's latest attempt got its slot, or None"""
+        return getattr(self._local, "acquired_at", None)
+
+    def _acquire(self, timeout: float) -> int:
+        start = time.perf_counter()
+        with self._condition:
+            self._waiting += 1
+            self._metrics["max_waiting"] = max(self._metrics["max_waiting"], self._waiting)
+            try:
+                acquired = self._condition.wait_for(
+                    lambda: self._in_flight < int(self._limit), timeout=max(0.0, timeout)
+                )
+            finally:
+                self._waiting -= 1
+            self._metrics["total_wait_seconds"] += time.perf_counter() - start
+            if not acquired:
+                self._metrics["queue_timeouts"] += 1
+                raise TimeoutError(f"No LLM concurrency slot within {timeout:.1f}s")
+            self._in_flight += 1
+            self._metrics["calls"] += 1
+            self._metrics["peak_in_flight"] = max(self._metrics["peak_in_flight"], self._in_flight)
+            self._local.acquired_at = time.perf_counter()
+            return self._epoch
+
+    def _release(self, epoch: int, outcome: str) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            if outcome == "success":
+                self._metrics["successes"] += 1
+                self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+            elif outcome in ("throttled", "timeout"):
+                self._metrics["throttled" if outcome == "throttled" else "timeouts"] += 1
+                if epoch == self._epoch:
+                    self._limit = max(self.min_limit, self._limit * self.decrease)
+                    self._epoch += 1
+                    self._metrics["decreases"] += 1
+            else:
+                self._metrics["errors"] += 1
+            self._condition.notify_all()
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        retry_after = getattr(error, "retry_after", None)
+        if isinstance(retry_after, (int, float)) and retry_after > 0:
+            return min(LLM_RETRY_MAX_DELAY, float(retry_after))
+        delay = min(LLM_RETRY_MAX_DELAY, self.retry_base_delay * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """
+        Run ``fn`` inside a concurrency slot, retrying throttled and timed-out attempts.
+
+        Raises:
+            The last exception once retries (or timeout retries, or the deadline) are
+            exhausted, any non-throttling error immediately, or TimeoutError if no slot
+            frees up within ``queue_timeout`` (or before the deadline)
+        """
+        start = time.monotonic()
+        attempt = 0
+        timeouts = 0
+        while True:
+            remaining = self.deadline - (time.monotonic() - start) if self.deadline > 0 else float("inf")
+            epoch = self._acquire(min(self.queue_timeout, remaining))
+            try:
+                result = fn()
+            except Exception as e:
+                outcome = classify_llm_error(e)
+                self._release(epoch, outcome)
+                if outcome == "error":
+                    raise
+                timeouts += outcome == "timeout"
+                delay = self._backoff(attempt, e)
+                past_deadline = self.deadline > 0 and time.monotonic() - start + delay >= self.deadline
+                if attempt >= self.max_retries or timeouts > self.max_timeout_retries or past_deadline:
+                    with self._condition:
+                        self._metrics["gave_up"] += 1
+                        self._metrics["deadline_exceeded"] += int(past_deadline)
+                    raise
+                print(f"[llm_concurrency] LLM call {outcome}, retrying in {delay:.1f}s "
+                      f"(attempt {attempt + 1}/{self.max_retries}, limit now {self.limit:.1f})")
+                with self._condition:
+                    self._metrics["retries"] += 1
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self._release(epoch, "success")
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Current limit and queue state plus cumulative outcome counters"""
+        with self._condition:
+            metrics = dict(self._metrics)
+            calls = metrics["calls"]
+            return {
+                "limit": round(self._limit, 2),
+                "effective_limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                **metrics,
+                "total_wait_seconds": round(metrics["total_wait_seconds"], 3),
+                "mean_wait_seconds": metrics["total_wait_seconds"] / calls if calls else 0.0
+            }
+
+
+llm_limiter = AIMDLimiter()
@@ -0,0 +1,237 @@
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Optional
+import numpy as np
+from dotenv import load_dotenv
+from langchain_core.runnables import Runnable, RunnableConfig
+from tool.llm_concurrency import AIMDLimiter, llm_limiter
+from tool.llm_usage import current_usage_ledger, track_llm_usage
+
+load_dotenv()
+
+LLM_HEDGING = os.getenv("LLM_HEDGING", "false").lower() in ("1", "true", "yes")
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))  # Latency percentile that triggers a hedge
+LLM_HEDGE_BUDGET = float(os.getenv("LLM_HEDGE_BUDGET", "0.1"))  # Max extra requests per call (0.1 = +10%)
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))  # Latencies needed before hedging
+LLM_HEDGE_MAX_WORKERS = 64
+LATENCY_WINDOW = 500
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=LLM_HEDGE_MAX_WORKERS, thread_name_prefix="llm-hedge")
+        return _executor
+
+
+class HedgingPolicy:
+    """
+    Rolling latency window and hedge budget shared by every wrapper of one kind of call.
+
+    A call that has not answered within the ``percentile`` latency of the last
+    ``LATENCY_WINDOW`` calls gets a duplicate, as long as duplicates stay under
+    ``budget`` times the number of calls. Nothing is hedged until ``min_samples``
+    latencies have been seen. Latencies are measured from the moment a call got its
+    concurrency slot, so time spent queued behind the limiter does not read as a slow
+    model. The tokens and cost of the abandoned losers are counted as well.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        percentile: float = LLM_HEDGE_PERCENTILE,
+        budget: float = LLM_HEDGE_BUDGET,
+        min_samples: int = LLM_HEDGE_MIN_SAMPLES
+    ):
+        if not 0 < percentile < 100:
+            raise ValueError(f"percentile must be between 0 and 100, got {percentile}")
+        if budget < 0:
+            raise ValueError(f"budget must be non-negative, got {budget}")
+
+        self.name = name
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "hedged": 0, "hedge_wins": 0, "budget_denied": 0, "limiter_busy": 0,
+                          "failures": 0, "losers_finished": 0, "loser_tokens": 0, "loser_cost_usd": 0.0}
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there are too few samples"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            return float(np.percentile(np.fromiter(self._latencies, dtype=float), self.percentile))
+
+    def try_spend(self) -> bool:
+        """Reserve one duplicate request if the budget allows it"""
+        with self._lock:
+            if self._counters["hedged"] + 1 > self.budget * self._counters["calls"]:
+                self._counters["budget_denied"] += 1
+                return False
+            self._counters["hedged"] += 1
+            return True
+
+    def skip_busy(self) -> None:
+        """Count a hedge not sent because calls were queued for a concurrency slot"""
+        with self._lock:
+            self._counters["limiter_busy"] += 1
+
+    def record_loser(self, usage: Dict[str, Any]) -> None:
+        """Add the usage totals of a request whose response was discarded"""
+        with self._lock:
+            self._counters["losers_finished"] += 1
+            self._counters["loser_tokens"] += usage["total_tokens"]
+            self._counters["loser_cost_usd"] += usage["cost_usd"]
+
+    def record(self, latency_seconds: Optional[float], hedge_won: bool = False) -> None:
+        with self._lock:
+            self._counters["calls"] += 1
+            if latency_seconds is None:
+                self._counters["failures"] += 1
+                return
+            self._latencies.append(latency_seconds)
+            self._counters["hedge_wins"] += int(hedge_won)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = np.fromiter(self._latencies, dtype=float)
+            counters = dict(self._counters)
+        percentiles = (
+            {f"p{p}": round(float(np.percentile(latencies, p)), 3) for p in (50, 95, 99)}
+            if len(latencies) else {}
+        )
+        return {
+            "percentile": self.percentile,
+            "budget": self.budget,
+            **counters,
+            "loser_cost_usd": round(counters["loser_cost_usd"], 6),
+            "hedge_rate": counters["hedged"] / counters["calls"] if counters["calls"] else 0.0,
+            "samples": len(latencies),
+            **percentiles
+        }
+
+
+_policies: Dict[str, HedgingPolicy] = {}
+_policies_lock = threading.Lock()
+
+
+def get_hedging_policy(name: str) -> HedgingPolicy:
+    """Return the process-wide policy for a kind of call, e.g. "tag_candidate_agent" """
+    with _policies_lock:
+        if name not in _policies:
+            _policies[name] = HedgingPolicy(name)
+        return _policies[name]
+
+
+def hedging_stats() -> Dict[str, Any]:
+    """Hedging metrics per policy"""
+    with _policies_lock:
+        policies = list(_policies.values())
+    return {"enabled_by_default": LLM_HEDGING, "policies": {p.name: p.stats() for p in policies}}
+
+
+class HedgedRunnable(Runnable):
+    """
+    Wraps a runnable (usually a structured LLM) so slow calls are hedged.
+
+    ``invoke`` runs the call; if it is still pending after the policy's percentile
+    latency, an identical request is sent and the first valid response (not an
+    exception, not None) wins. No hedge is sent while other calls are queued for a slot
+    of ``limiter``: the delay is then queueing, and a duplicate would only queue too.
+    The loser is abandoned, since a running request cannot be stopped: its thread
+    finishes in the background, its result is discarded and its tokens and cost are
+    added to the policy stats once it completes. Any runnable works, including a RunnableLambda standing in for the LLM;
+    the agents wrap theirs as ``hedged(get_structured_llm(...), "tag_candidate_agent")``.
+    ``batch`` comes from Runnable and calls ``invoke`` per input.
+
+    Example:
+        >>> from langchain_core.runnables import RunnableLambda
+        >>> runnable = HedgedRunnable(RunnableLambda(lambda prompt: prompt.upper()), HedgingPolicy("example"))
+        >>> runnable.batch(["react", "vue"], config={"max_concurrency": 2})
+        ['REACT', 'VUE']
+    """
+
+    def __init__(self, runnable: Runnable, policy: HedgingPolicy, limiter: AIMDLimiter = llm_limiter):
+        self.runnable = runnable
+        self.policy = policy
+        self.limiter = limiter
+
+    def _attempt(self, attempt: Dict[str, Any], input: Any, config: Optional[RunnableConfig], **kwargs: Any) -> Any:
+        begin = time.perf_counter()
+        outer = current_usage_ledger()
+        # A ledger of its own prices this attempt; its calls still reach the run's ledger
+        with track_llm_usage() as ledger:
+            try:
+                return self.runnable.invoke(input, config, **kwargs)
+            finally:
+                acquired = self.limiter.slot_acquired_at()
+                # The worker thread is reused: an older acquisition belongs to another call
+                started = acquired if acquired is not None and acquired >= begin else begin
+                attempt["latency"] = time.perf_counter() - started
+                attempt["usage"] = ledger.summary()["totals"]
+                if outer is not None:
+                    for call in ledger.calls():
+                        outer.record(call)
+
+    def _submit(self, attempts: Dict[Future, Dict[str, Any]], input: Any,
+                config: Optional[RunnableConfig], **kwargs: Any) -> Future:
+        # Copy the context so per-request settings (e.g. LLM cache bypass) follow the call
+        context = contextvars.copy_context()
+        attempt: Dict[str, Any] = {}
+        future = _get_executor().submit(context.run, self._attempt, attempt, input, config, **kwargs)
+        attempts[future] = attempt
+        return future
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        attempts: Dict[Future, Dict[str, Any]] = {}
+        primary = self._submit(attempts, input, config, **kwargs)
+        pending = {primary}
+
+        delay = self.policy.hedge_delay()
+        if delay is not None:
+            done, _ = wait(pending, timeout=delay)
+            if not done and self.limiter.waiting > 0:
+                self.policy.skip_busy()
+            elif not done and self.policy.try_spend():
+                print(f"[llm_hedging] {self.policy.name}: no response after {delay:.2f}s, sending hedge request")
+                pending.add(self._submit(attempts, input, config, **kwargs))
+
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if result is None:
+                    continue
+                for other in pending:
+                    # Cancels only a request still queued for a hedge worker
+                    if not other.cancel():
+                        other.add_done_callback(
+                            lambda loser: self.policy.record_loser(attempts[loser]["usage"])
+                        )
+                self.policy.record(attempts[future]["latency"], hedge_won=future is not primary)
+                return result
+
+        self.policy.record(None)
+        if error is not None:
+            raise error
+        return None
+
+
+def hedged(runnable: Runnable, name: str) -> HedgedRunnable:
+    """Wrap ``runnable`` with hedging under the shared policy called ``name``"""
+    return HedgedRunnable(runnable, get_hedging_policy(name))
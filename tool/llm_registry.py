@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple, Type
+from dotenv import load_dotenv
+from pydantic import BaseModel
+from tool.llm_cache import get_llm_cache
+from tool.llm_concurrency import llm_limiter
+from tool.llm_usage import record_llm_call
+
+load_dotenv()
+
+DEFAULT_LLM_MODEL = os.getenv("LLM_MODEL", "gemini-2.5-flash")
+DEFAULT_LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.7"))
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "120"))  # Seconds per Gemini request
+
+# Model and temperature each agent was tuned with. Override per agent with
+# <AGENT>_MODEL / <AGENT>_TEMPERATURE, e.g. TAG_CRITIC_AGENT_MODEL=gemini-2.5-pro
+AGENT_LLM_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "metadata_extractor_agent": {"model": "gemini-2.5-flash", "temperature": 0.7},
+    "multi_agent_coordinator": {"model": "gemini-2.5-flash", "temperature": 0.7},
+    "tag_candidate_agent": {"model": "gemini-2.0-flash", "temperature": 0.7},
+    "tag_critic_agent": {"model": "gemini-2.5-flash", "temperature": 0.4},
+    "tag_polisher_agent": {"model": "gemini-2.5-flash", "temperature": 0.2},
+}
+
+_lock = threading.Lock()
+_chat_class = None
+_base_client = None
+_clients: Dict[Tuple[str, float], Any] = {}
+_structured: Dict[Tuple[str, float, Type[BaseModel]], Any] = {}
+
+
+def agent_llm_config(agent: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Resolve the model and temperature configured for an agent.
+
+    Args:
+        agent: Agent name such as "tag_critic_agent" (default: global LLM_MODEL / LLM_TEMPERATURE)
+
+    Returns:
+        Dictionary with "model" and "temperature"
+    """
+    defaults = AGENT_LLM_DEFAULTS.get(agent or "", {})
+    prefix = (agent or "").upper()
+    model = os.getenv(f"{prefix}_MODEL") if prefix else None
+    temperature = os.getenv(f"{prefix}_TEMPERATURE") if prefix else None
+    return {
+        "model": model or defaults.get("model", DEFAULT_LLM_MODEL),
+        "temperature": float(temperature) if temperature else defaults.get("temperature", DEFAULT_LLM_TEMPERATURE)
+    }
+
+
+def _limited_chat_class():
+    """
+    ChatGoogleGenerativeAI whose requests go through the shared AIMD limiter.
+
+    Only real requests take a slot: cache hits are answered before ``_generate`` runs.
+    Throttled and timed-out requests are retried by the limiter, so the client itself
+    is built with a single attempt (its own retries would hide 429s from the limiter).
+    Each request's tokens, wall time and retries are recorded in the LLM usage ledger.
+    Async calls (``ainvoke``, ``abatch``) run the same limited ``_generate`` in a worker
+    thread, so they are throttled and accounted for like sync calls.
+    """
+    global _chat_class
+    if _chat_class is None:
+        from langchain_core.runnables.config import run_in_executor
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        class LimitedChatGoogleGenerativeAI(ChatGoogleGenerativeAI):
+            def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+                attempts = 0
+
+                def attempt():
+                    nonlocal attempts
+                    attempts += 1
+                    return super(LimitedChatGoogleGenerativeAI, self)._generate(
+                        messages, stop=stop, run_manager=run_manager, **kwargs
+                    )
+
+                start = time.perf_counter()
+                try:
+                    result = llm_limiter.call(attempt)
+                except Exception:
+                    record_llm_call(self.model, time.perf_counter() - start, attempts, failed=True)
+                    raise
+                record_llm_call(self.model, time.perf_counter() - start, attempts, result=result)
+                return result
+
+            async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+                # The client's native async path would bypass the (thread-based) limiter
+                return await run_in_executor(
+                    None, self._generate, messages, stop,
+                    run_manager.get_sync() if run_manager else None, **kwargs
+                )
+
+        _chat_class = LimitedChatGoogleGenerativeAI
+    return _chat_class
+
+
+def _model_path(model: str) -> str:
+    return model if model.startswith("models/") else f"models/{model}"
+
+
+def get_llm(agent: Optional[str] = None, model: Optional[str] = None, temperature: Optional[float] = None):
+    """
+    Return the shared chat model for an agent (or an explicit model/temperature).
+
+    Clients are built on first use, not at import. The first one opens the connection
+    to the Gemini API; every other (model, temperature) variant is a shallow copy that
+    reuses its transport, the shared LLM response cache and the shared concurrency limiter.
+
+    Args:
+        agent: Agent name used to look up the configured model and temperature
+        model: Gemini model name, overriding the agent configuration
+        temperature: Sampling temperature, overriding the agent configuration
+
+    Returns:
+        ChatGoogleGenerativeAI instance shared by every caller with the same settings
+
+    Raises:
+        ValueError: If temperature is outside [0, 2]
+    """
+    global _base_client
+    config = agent_llm_config(agent)
+    model = _model_path(model or config["model"])
+    temperature = float(config["temperature"] if temperature is None else temperature)
+
+    if not 0.0 <= temperature <= 2.0:
+        raise ValueError(f"temperature must be between 0 and 2, got {temperature}")
+
+    key = (model, temperature)
+    with _lock:
+        if key in _clients:
+            return _clients[key]
+
+        if _base_client is None:
+            _base_client = _limited_chat_class()(
+                model=model,
+                temperature=temperature,
+                google_api_key=os.getenv("GOOGLE_API_KEY"),
+                cache=get_llm_cache(),
+                max_retries=1,
+                timeout=LLM_REQUEST_TIMEOUT
+            )
+            client = _base_client
+        else:
+            # model_copy skips validation, so the copy keeps the base client's transport
+            client = _base_client.model_copy(update={"model": model, "temperature": temperature})
+
+        _clients[key] = client
+        return client
+
+
+def get_structured_llm(
+    schema: Type[BaseModel],
+    agent: Optional[str] = None,
+    model: Optional[str] = None,
+    temperature: Optional[float] = None
+):
+    """
+    Return the memoized ``with_structured_output(schema)`` runnable for a chat model.
+
+    Args:
+        schema: Pydantic model the response is parsed into
+        agent: Agent name used to look up the configured model and temperature
+        model: Gemini model name, overriding the agent configuration
+        temperature: Sampling temperature, overriding the agent configuration
+
+    Returns:
+        Runnable that returns ``schema`` instances
+    """
+    llm = get_llm(agent, model=model, temperature=temperature)
+    key = (llm.model, llm.temperature, schema)
+    with _lock:
+        if key not in _structured:
+            _structured[key] = llm.with_structured_output(schema)
+        return _structured[key]
+
+
+def structured_output(llm, schema: Type[BaseModel]):
+    """
+    ``llm.with_structured_output(schema)``, memoized when ``llm`` is a registry client.
+
+    Lets helpers that accept an arbitrary chat model (e.g. a fake one in a script) still
+    avoid rebuilding the structured runnable on every call for the shared clients.
+    """
+    with _lock:
+        shared = any(client is llm for client in _clients.values())
+    if shared:
+        return get_structured_llm(schema, model=llm.model, temperature=llm.temperature)
+    return llm.with_structured_output(schema)
@@ -0,0 +1,265 @@
+import contextvars
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+# List prices in USD per million tokens (input, output), used for cost estimates only.
+# Models missing here are still counted, with cost reported as None
+MODEL_PRICING: Dict[str, Dict[str, float]] = {
+    "gemini-2.0-flash": {"input": 0.10, "output": 0.40},
+    "gemini-2.0-flash-lite": {"input": 0.075, "output": 0.30},
+    "gemini-2.5-flash": {"input": 0.30, "output": 2.50},
+    "gemini-2.5-flash-lite": {"input": 0.10, "output": 0.40},
+    "gemini-2.5-pro": {"input": 1.25, "output": 10.00},
+}
+RECENT_CALLS = 50
+
+# Set per workflow run / stage; copied into worker threads with the context
+_stage = contextvars.ContextVar("llm_usage_stage", default=None)
+_ledger = contextvars.ContextVar("llm_usage_ledger", default=None)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Estimated USD cost of one call, or None for a model without a known price"""
+    price = MODEL_PRICING.get(model.split("/")[-1])
+    if price is None:
+        return None
+    return (prompt_tokens * price["input"] + completion_tokens * price["output"]) / 1_000_000
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {
+        "calls": 0, "failed": 0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0,
+        "total_tokens": 0, "latency_seconds": 0.0, "max_latency_seconds": 0.0, "cost_usd": 0.0,
+        "unpriced_calls": 0, "cached_calls": 0, "cached_tokens": 0, "saved_cost_usd": 0.0
+    }
+
+
+def _add(totals: Dict[str, Any], call: Dict[str, Any]) -> None:
+    totals["calls"] += 1
+    totals["failed"] += int(call["failed"])
+    totals["retries"] += call["retries"]
+    totals["latency_seconds"] += call["latency_seconds"]
+    totals["max_latency_seconds"] = max(totals["max_latency_seconds"], call["latency_seconds"])
+    if call.get("cached"):
+        # Answered from the LLM cache: the tokens were not billed again
+        totals["cached_calls"] += 1
+        totals["cached_tokens"] += call["total_tokens"]
+        totals["saved_cost_usd"] += call.get("saved_cost_usd") or 0.0
+        return
+    for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        totals[key] += call[key]
+    if call["cost_usd"] is None:
+        totals["unpriced_calls"] += 1
+    else:
+        totals["cost_usd"] += call["cost_usd"]
+
+
+def _finish(totals: Dict[str, Any]) -> Dict[str, Any]:
+    calls = totals["calls"]
+    billed = calls - totals["cached_calls"]
+    return {
+        **totals,
+        "latency_seconds": round(totals["latency_seconds"], 3),
+        "max_latency_seconds": round(totals["max_latency_seconds"], 3),
+        "mean_latency_seconds": round(totals["latency_seconds"] / calls, 3) if calls else None,
+        "mean_prompt_tokens": round(totals["prompt_tokens"] / billed) if billed else None,
+        "cost_usd": round(totals["cost_usd"], 6),
+        "saved_cost_usd": round(totals["saved_cost_usd"], 6),
+        "cache_hit_rate": round(totals["cached_calls"] / calls, 3) if calls else None
+    }
+
+
+class UsageLedger:
+    """
+    Token, latency, retry and cost accounting for a set of LLM calls, grouped by stage.
+
+    One process-wide ledger (``llm_usage``) aggregates every call; ``track_llm_usage``
+    opens another for a single workflow run so its result can carry a per-stage summary.
+    LLM cache hits are recorded as zero-cost calls: their tokens and the cost they would
+    have had show up as ``cached_tokens`` and ``saved_cost_usd`` instead.
+
+    Example:
+        >>> with track_llm_usage() as ledger, llm_usage_stage("candidate"):
+        ...     _ = record_llm_call("gemini-2.5-flash", 1.5)
+        >>> ledger.summary()["stages"]["candidate"]["calls"]
+        1
+    """
+
+    def __init__(self, keep_calls: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._calls: deque = deque(maxlen=keep_calls)
+
+    def record(self, call: Dict[str, Any]) -> None:
+        with self._lock:
+            _add(self._stages.setdefault(call["stage"], _empty_totals()), call)
+            _add(self._models.setdefault(call["model"], _empty_totals()), call)
+            self._calls.append(call)
+
+    def calls(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._calls)
+
+    def summary(self, include_calls: bool = False) -> Dict[str, Any]:
+        """
+        Args:
+            include_calls: Also return the individual call records
+
+        Returns:
+            Totals per stage and per model, overall totals and the most expensive stage
+            (by estimated cost, or by tokens when no call could be priced)
+        """
+        with self._lock:
+            stages = {name: dict(totals) for name, totals in self._stages.items()}
+            models = {name: dict(totals) for name, totals in self._models.items()}
+            calls = list(self._calls)
+
+        overall = _empty_totals()
+        for totals in stages.values():
+            for key in overall:
+                if key == "max_latency_seconds":
+                    overall[key] = max(overall[key], totals[key])
+                else:
+                    overall[key] += totals[key]
+
+        most_expensive = None
+        if stages:
+            most_expensive = max(stages, key=lambda name: (stages[name]["cost_usd"], stages[name]["total_tokens"]))
+
+        summary = {
+            "totals": _finish(overall),
+            "stages": {name: _finish(totals) for name, totals in stages.items()},
+            "models": {name: _finish(totals) for name, totals in models.items()},
+            "most_expensive_stage": most_expensive
+        }
+        if include_calls:
+            summary["calls"] = calls
+        return summary
+
+
+llm_usage = UsageLedger(keep_calls=RECENT_CALLS)
+
+
+@contextmanager
+def llm_usage_stage(stage: str) -> Iterator[None]:
+    """Attribute LLM calls made inside the block (and threads it starts) to ``stage``"""
+    token = _stage.set(stage)
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+
+
+@contextmanager
+def track_llm_usage() -> Iterator[UsageLedger]:
+    """Collect the LLM calls made inside the block in a ledger of their own"""
+    ledger = UsageLedger()
+    token = _ledger.set(ledger)
+    try:
+        yield ledger
+    finally:
+        _ledger.reset(token)
+
+
+def current_usage_ledger() -> Optional[UsageLedger]:
+    """The ledger of the surrounding ``track_llm_usage`` block, or None outside one"""
+    return _ledger.get()
+
+
+def _token_usage(result: Any) -> Dict[str, int]:
+    """
+    Token counts from a ChatResult's (or a list of cached generations') usage metadata,
+    zeros when the API sent none
+    """
+    generations = result if isinstance(result, (list, tuple)) else getattr(result, "generations", None)
+    usage = {}
+    for generation in generations or []:
+        usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+        if usage:
+            break
+    prompt_tokens = int(usage.get("input_tokens", 0) or 0)
+    completion_tokens = int(usage.get("output_tokens", 0) or 0)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": int(usage.get("total_tokens", 0) or 0) or prompt_tokens + completion_tokens
+    }
+
+
+def record_llm_call(
+    model: str,
+    latency_seconds: float,
+    attempts: int = 1,
+    result: Any = None,
+    failed: bool = False,
+    cached: bool = False
+) -> Dict[str, Any]:
+    """
+    Record one LLM request (including its retries) in the process-wide ledger and in
+    the ledger of the surrounding ``track_llm_usage`` block, if any.
+
+    Args:
+        model: Model the request went to
+        latency_seconds: Wall time of the request, including queueing and retries
+        attempts: Attempts made, so retries are ``attempts - 1``
+        result: The ChatResult (or cached generations), read for token usage
+        failed: Whether the request ultimately failed
+        cached: Whether the LLM cache answered it, so it cost nothing
+
+    Returns:
+        The call record
+    """
+    model = model.split("/")[-1]
+    tokens = _token_usage(result)
+    cost = estimate_cost(model, tokens["prompt_tokens"], tokens["completion_tokens"])
+    call = {
+        "stage": _stage.get() or "unscoped",
+        "model": model,
+        **tokens,
+        "latency_seconds": latency_seconds,
+        "retries": max(0, attempts - 1),
+        "failed": failed,
+        "cached": cached,
+        "cost_usd": 0.0 if cached else cost,
+        "saved_cost_usd": cost if cached else 0.0
+    }
+    llm_usage.record(call)
+    ledger = _ledger.get()
+    if ledger is not None:
+        ledger.record(call)
+    return call
+
+
+def split_llm_call(call: Dict[str, Any], weights: List[float]) -> List[Dict[str, Any]]:
+    """
+    Split one call record into shares proportional to ``weights``, e.g. a packed request
+    across the repositories whose sections it carried.
+
+    Token counts are apportioned in whole tokens and add up to the original; costs are
+    split proportionally. Every share keeps the full latency, since each participant
+    waited for the whole request.
+
+    Example:
+        >>> call = {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12, "cost_usd": None}
+        >>> [share["prompt_tokens"] for share in split_llm_call(call, [1, 2])]
+        [3, 7]
+    """
+    total = float(sum(weights))
+    fractions = [w / total for w in weights] if total > 0 else [1.0 / len(weights)] * len(weights)
+
+    shares = [{**call, "share": fraction, "shared_by": len(weights)} for fraction in fractions]
+    for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        # Cumulative rounding, so the shares sum to the original count
+        allotted, cumulative = 0, 0.0
+        for share, fraction in zip(shares, fractions):
+            cumulative += fraction
+            share[key] = round(call[key] * cumulative) - allotted
+            allotted += share[key]
+    for key in ("cost_usd", "saved_cost_usd"):
+        if call.get(key) is not None:
+            for share, fraction in zip(shares, fractions):
+                share[key] = call[key] * fraction
+    return shares
@@ -0,0 +1,59 @@
+import numpy as np
+from typing import List, Sequence
+from tool.vector_utils import cosine_similarity_matrix
+
+
+def mmr_select(
+    relevance: Sequence[float],
+    vectors: Sequence[np.ndarray],
+    top_n: int,
+    lambda_mult: float = 0.7
+) -> List[int]:
+    """
+    Maximal Marginal Relevance selection.
+    
+    Greedily picks the item maximizing
+    ``lambda_mult * relevance - (1 - lambda_mult) * max_similarity_to_selected``.
+    The pairwise similarity matrix is computed once in float32 and the running maximum
+    similarity to the selected set is updated with one vectorized row per step.
+    
+    Args:
+        relevance: Relevance score per item (e.g. tag-to-README similarity)
+        vectors: Embedding per item, aligned with ``relevance``
+        top_n: Number of items to select
+        lambda_mult: Trade-off between relevance (1.0) and diversity (0.0) (default: 0.7)
+        
+    Returns:
+        Indices of the selected items, in selection order
+        
+    Example:
+        >>> vectors = [np.array([1.0, 0.0]), np.array([0.99, 0.1]), np.array([0.0, 1.0])]
+        >>> mmr_select([0.9, 0.85, 0.6], vectors, top_n=2, lambda_mult=0.5)
+        [0, 2]
+    """
+    if not (0.0 <= lambda_mult <= 1.0):
+        raise ValueError(f"lambda_mult must be between 0 and 1, got {lambda_mult}")
+    if len(relevance) != len(vectors):
+        raise ValueError(f"Expected {len(relevance)} vectors but got {len(vectors)}")
+    
+    count = len(relevance)
+    if count == 0 or top_n <= 0:
+        return []
+    
+    scores = np.asarray(relevance, dtype=np.float32)
+    similarity_matrix = cosine_similarity_matrix(vectors, vectors)
+    
+    max_similarity = np.full(count, -np.inf, dtype=np.float32)
+    available = np.ones(count, dtype=bool)
+    selected: List[int] = []
+    
+    for _ in range(min(top_n, count)):
+        redundancy = np.where(np.isfinite(max_similarity), max_similarity, 0.0)
+        marginal = lambda_mult * scores - (1.0 - lambda_mult) * redundancy
+        marginal[~available] = -np.inf
+        best = int(np.argmax(marginal))
+        selected.append(best)
+        available[best] = False
+        max_similarity = np.maximum(max_similarity, similarity_matrix[best])
+    
+    return selected
@@ -0,0 +1,195 @@
+import os
+import re
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+from tool.prompt_packing import estimate_tokens
+
+load_dotenv()
+
+MODEL_ROUTING = os.getenv("MODEL_ROUTING", "false").lower() in ("1", "true", "yes")
+ROUTER_FAST_MODEL = os.getenv("ROUTER_FAST_MODEL", "gemini-2.0-flash")
+ROUTER_STRONG_MODEL = os.getenv("ROUTER_STRONG_MODEL", "gemini-2.5-flash")
+ROUTER_DIFFICULTY_THRESHOLD = float(os.getenv("ROUTER_DIFFICULTY_THRESHOLD", "0.3"))  # Score at which to escalate
+ROUTER_SIZE_TOKENS = int(os.getenv("ROUTER_SIZE_TOKENS", "1500"))  # Input size that counts as fully "large"
+
+# Relative weight of each difficulty feature (sums to 1). With the default threshold a
+# chunk escalates when it is mostly code or mostly non-English, or when a task is large
+DIFFICULTY_WEIGHTS = {"size": 0.3, "code": 0.35, "language": 0.35}
+
+_FENCE_PATTERN = re.compile(r"^ {0,3}(```|~~~)")
+_CODE_SYMBOLS = set("{}[]()<>=;:$|&*/\\_")
+_ENGLISH_FUNCTION_WORDS = set(
+    "the a an and or of to in is are for with on by this that it as be can from you your "
+    "we our use using run not if all will which at its into".split()
+)
+# English prose is at least this share of the function words above; well under it
+# reads as another language
+ENGLISH_FUNCTION_WORD_SHARE = 0.15
+_WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+
+def _is_code_line(line: str) -> bool:
+    if line.startswith(("    ", "\t")):
+        return True
+    visible = [c for c in line if not c.isspace()]
+    return len(visible) >= 8 and sum(1 for c in visible if c in _CODE_SYMBOLS) / len(visible) > 0.12
+
+
+def difficulty_features(text: str) -> Dict[str, float]:
+    """
+    Cheap signals of how hard an input is for tagging or extraction, each in [0, 1].
+
+    - size: estimated tokens relative to ROUTER_SIZE_TOKENS
+    - code: share of non-blank lines that are code (fenced, indented or symbol-dense;
+      symbol density catches code whose fence lies in a neighbouring chunk)
+    - language: how little the prose reads as English, from the share of non-ASCII
+      letters and of common English function words
+
+    Example:
+        >>> difficulty_features("The tool is written in Python for use with FastAPI")["language"]
+        0.0
+    """
+    text = text or ""
+    lines = [line for line in text.splitlines() if line.strip()]
+
+    code_lines = 0
+    prose = []
+    in_fence = False
+    for line in lines:
+        if _FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+            code_lines += 1
+        elif in_fence or _is_code_line(line):
+            code_lines += 1
+        else:
+            prose.append(line)
+
+    words = _WORD_PATTERN.findall(" ".join(prose).lower())
+    language = 0.0
+    if words:
+        letters = "".join(words)
+        non_ascii = sum(1 for c in letters if not c.isascii()) / len(letters)
+        function_share = sum(1 for w in words if w in _ENGLISH_FUNCTION_WORDS) / len(words)
+        non_english = 1.0 - min(1.0, function_share / ENGLISH_FUNCTION_WORD_SHARE) if len(words) >= 20 else 0.0
+        language = min(1.0, max(2 * non_ascii, non_english))
+
+    return {
+        "tokens": estimate_tokens(text),
+        "size": min(1.0, estimate_tokens(text) / ROUTER_SIZE_TOKENS),
+        "code": code_lines / len(lines) if lines else 0.0,
+        "language": round(language, 4)
+    }
+
+
+class ModelRouter:
+    """
+    Routes each LLM input to a fast or a strong model by its difficulty score.
+
+    The score is the weighted sum of ``difficulty_features``; inputs scoring at least
+    ``threshold`` go to ``strong_model``, the rest to ``fast_model``. Callers report
+    each routed call's latency with ``record`` so ``stats`` shows how each tier performs.
+    One router is shared by the process.
+
+    Example:
+        >>> router = ModelRouter(fast_model="gemini-2.0-flash", strong_model="gemini-2.5-flash")
+        >>> decision = router.route("Tagger suggests GitHub topics for a repository.", agent="tag_candidate_agent")
+        >>> decision["tier"], decision["model"]
+        ('fast', 'gemini-2.0-flash')
+        >>> router.record(decision, latency_seconds=1.2)
+        >>> router.stats()["agents"]["tag_candidate_agent"]["fast"]["mean_latency"]
+        1.2
+    """
+
+    def __init__(
+        self,
+        fast_model: str = ROUTER_FAST_MODEL,
+        strong_model: str = ROUTER_STRONG_MODEL,
+        threshold: float = ROUTER_DIFFICULTY_THRESHOLD,
+        max_decisions: int = 200
+    ):
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._decisions: deque = deque(maxlen=max_decisions)
+        self._tiers = {tier: self._empty_tier() for tier in ("fast", "strong")}
+        self._agents: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    @staticmethod
+    def _empty_tier() -> Dict[str, Any]:
+        return {"calls": 0, "failures": 0, "total_latency": 0.0}
+
+    @staticmethod
+    def _tier_stats(tier: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "calls": tier["calls"],
+            "failures": tier["failures"],
+            "mean_latency": tier["total_latency"] / tier["calls"] if tier["calls"] else None
+        }
+
+    def route(self, text: str, agent: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Args:
+            text: The chunk or task input
+            agent: Calling agent, kept with the decision
+
+        Returns:
+            Decision with "model", "tier", "score", "features" and "agent"
+        """
+        features = difficulty_features(text)
+        score = round(sum(weight * features[name] for name, weight in DIFFICULTY_WEIGHTS.items()), 4)
+        tier = "strong" if score >= self.threshold else "fast"
+        return {
+            "agent": agent,
+            "tier": tier,
+            "model": self.strong_model if tier == "strong" else self.fast_model,
+            "score": score,
+            "features": features
+        }
+
+    def record(self, decision: Dict[str, Any], latency_seconds: float, failed: bool = False) -> None:
+        """Record the outcome of a routed call"""
+        with self._lock:
+            agent = self._agents.setdefault(decision["agent"] or "unknown", {})
+            for tier in (self._tiers[decision["tier"]], agent.setdefault(decision["tier"], self._empty_tier())):
+                tier["calls"] += 1
+                tier["failures"] += int(failed)
+                tier["total_latency"] += latency_seconds
+            self._decisions.append({
+                **{key: decision[key] for key in ("agent", "tier", "model", "score")},
+                "latency_seconds": round(latency_seconds, 3),
+                "failed": failed
+            })
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Observed call counts and mean latency per tier, overall and per agent, the share
+        of escalated calls, and the most recent decisions.
+
+        The tiers see inputs of different difficulty (and agents make calls of different
+        sizes), so the latencies describe each tier; their difference is not time saved.
+        """
+        with self._lock:
+            tiers = {
+                name: {"model": self.fast_model if name == "fast" else self.strong_model, **self._tier_stats(tier)}
+                for name, tier in self._tiers.items()
+            }
+            agents = {
+                agent: {name: self._tier_stats(tier) for name, tier in agent_tiers.items()}
+                for agent, agent_tiers in self._agents.items()
+            }
+            recent = list(self._decisions)[-20:]
+
+        calls = tiers["fast"]["calls"] + tiers["strong"]["calls"]
+        return {
+            "threshold": self.threshold,
+            "tiers": tiers,
+            "agents": agents,
+            "escalation_rate": tiers["strong"]["calls"] / calls if calls else 0.0,
+            "recent_decisions": recent
+        }
+
+
+model_router = ModelRouter()
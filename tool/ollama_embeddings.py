@@ -1,34 +1,65 @@
+import os
 import requests
 import time
 import numpy as np
-from typing import List
+from typing import List, Optional
+from dotenv import load_dotenv
+from tool.embedding_store import get_embedding_store
+from tool.vector_utils import truncate_embeddings
 
-OLLAMA_URL = "http://localhost:11434/api/embed"
-EMBED_MODEL = "nomic-embed-text"
+load_dotenv()
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_URL = f"{OLLAMA_BASE_URL}/api/embed"
+EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+# Matryoshka truncation target (e.g. 768, 256, 128); unset keeps the full model width
+EMBED_DIMENSIONS: Optional[int] = int(os.getenv("EMBED_DIMENSIONS")) if os.getenv("EMBED_DIMENSIONS") else None
 MAX_BATCH_SIZE = 100  # Limit batch size to avoid overwhelming Ollama
 
 
-def _check_ollama_health(timeout: int = 5) -> bool:
+def _check_ollama_health(timeout: int = 5, base_url: str = OLLAMA_BASE_URL) -> bool:
     """Check if Ollama service is running"""
     try:
-        health_url = "http://localhost:11434/api/tags"
+        health_url = f"{base_url}/api/tags"
         response = requests.get(health_url, timeout=timeout)
         return response.status_code == 200
     except Exception:
         return False
 
 
-def get_ollama_embeddings(texts: List[str], max_retries: int = 3, timeout: int = 30) -> List[np.ndarray]:
+def embedding_store_name(model: str, dimensions: Optional[int] = None) -> str:
+    """Store/cache key for a model and its truncation width"""
+    return f"{model}@{dimensions}" if dimensions else model
+
+
+def get_ollama_embeddings(
+    texts: List[str],
+    max_retries: int = 3,
+    timeout: int = 30,
+    use_store: bool = True,
+    model: str = EMBED_MODEL,
+    base_url: str = OLLAMA_BASE_URL,
+    dimensions: Optional[int] = EMBED_DIMENSIONS
+) -> List[np.ndarray]:
     """
     Calls Ollama's embedding API to generate embeddings for multiple texts.
     
+    Texts already present in the shared on-disk embedding store are served from it;
+    only the misses are sent to Ollama and then written back to the store. When
+    ``dimensions`` is set, vectors are truncated to that Matryoshka prefix and
+    re-normalized; the store keeps each (model, dimensions) pair separately.
+    
     Args:
         texts: List of text strings to embed
         max_retries: Maximum number of retry attempts (default: 3)
         timeout: Request timeout in seconds (default: 30)
+        use_store: Read from and write to the shared embedding store (default: True)
+        model: Ollama embedding model (default: OLLAMA_EMBED_MODEL or nomic-embed-text)
+        base_url: Ollama server URL (default: OLLAMA_BASE_URL or http://localhost:11434)
+        dimensions: Truncate embeddings to this many leading components (default: EMBED_DIMENSIONS)
         
     Returns:
-        List of numpy array vectors (each is a np.ndarray)
+        List of float32 numpy array vectors (each is a np.ndarray)
         
     Raises:
         Exception: If the API call fails after all retries
@@ -54,6 +85,31 @@ def get_ollama_embeddings(texts: List[str], max_retries: int = 3, timeout: int =
     if not valid_texts:
         raise Exception("No valid text strings found in input after filtering")
     
+    # Serve stored vectors and only embed the misses
+    store = get_embedding_store(embedding_store_name(model, dimensions)) if use_store else None
+    if store is not None:
+        stored = store.get(valid_texts)
+        missing = list(dict.fromkeys(
+            text for text, vector in zip(valid_texts, stored) if vector is None
+        ))
+        
+        if missing:
+            fresh = get_ollama_embeddings(
+                missing, max_retries, timeout, use_store=False,
+                model=model, base_url=base_url, dimensions=dimensions
+            )
+            try:
+                store.put(missing, fresh)
+            except Exception as e:
+                print(f"[ollama_embeddings] Warning: Failed to write embedding store: {str(e)}")
+            fresh_by_text = dict(zip(missing, fresh))
+            stored = [
+                vector if vector is not None else fresh_by_text[text]
+                for text, vector in zip(valid_texts, stored)
+            ]
+        
+        return stored
+    
     # Check batch size
     if len(valid_texts) > MAX_BATCH_SIZE:
         print(f"[ollama_embeddings] Warning: Batch size {len(valid_texts)} exceeds max {MAX_BATCH_SIZE}, processing in chunks")
@@ -61,15 +117,18 @@ def get_ollama_embeddings(texts: List[str], max_retries: int = 3, timeout: int =
         all_embeddings = []
         for i in range(0, len(valid_texts), MAX_BATCH_SIZE):
             chunk = valid_texts[i:i + MAX_BATCH_SIZE]
-            chunk_embeddings = get_ollama_embeddings(chunk, max_retries, timeout)
+            chunk_embeddings = get_ollama_embeddings(
+                chunk, max_retries, timeout, use_store=False,
+                model=model, base_url=base_url, dimensions=dimensions
+            )
             all_embeddings.extend(chunk_embeddings)
         return all_embeddings
     
     # Health check before processing
-    if not _check_ollama_health():
+    if not _check_ollama_health(base_url=base_url):
         raise Exception(
             "Ollama service is not running or unreachable. "
-            "Please ensure Ollama is installed and running on http://localhost:11434. "
+            f"Please ensure Ollama is installed and running on {base_url}. "
             "You can start it with: 'ollama serve'"
         )
     
@@ -77,11 +136,11 @@ def get_ollama_embeddings(texts: List[str], max_retries: int = 3, timeout: int =
     for attempt in range(max_retries):
         try:
             payload = {
-                "model": EMBED_MODEL,
+                "model": model,
                 "input": valid_texts
             }
             
-            response = requests.post(OLLAMA_URL, json=payload, timeout=timeout)
+            response = requests.post(f"{base_url}/api/embed", json=payload, timeout=timeout)
             response.raise_for_status()
             
             data = response.json()
@@ -111,7 +170,7 @@ def get_ollama_embeddings(texts: List[str], max_retries: int = 3, timeout: int =
                     raise Exception(f"Embedding at index {i} is not a list")
                 
                 # Convert to numpy array
-                emb_array = np.array(emb)
+                emb_array = np.array(emb, dtype=np.float32)
                 
                 # Validate dimensions are consistent
                 if expected_dim is None:
@@ -127,6 +186,9 @@ def get_ollama_embeddings(texts: List[str], max_retries: int = 3, timeout: int =
                 
                 embeddings.append(emb_array)
             
+            if dimensions:
+                embeddings = truncate_embeddings(embeddings, dimensions)
+            
             return embeddings
             
         except requests.exceptions.Timeout:
@@ -148,7 +210,7 @@ def get_ollama_embeddings(texts: List[str], max_retries: int = 3, timeout: int =
                 continue
             raise Exception(
                 "Cannot connect to Ollama service. "
-                "Please ensure Ollama is running on http://localhost:11434. "
+                f"Please ensure Ollama is running on {base_url}. "
                 "You can start it with: 'ollama serve'"
             )
             
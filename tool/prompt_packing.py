@@ -0,0 +1,102 @@
+import threading
+from typing import List
+
+CHARS_PER_TOKEN = 4  # Rough English/Markdown average, good enough for budgeting
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate for budgeting prompts (about 4 characters per token)"""
+    if not isinstance(text, str) or not text:
+        return 0
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+class AdaptivePackSizer:
+    """
+    Decides how many items (README chunks, repositories, ...) to pack into one LLM request.
+
+    A pack is closed when adding the next item would exceed ``token_budget`` or when it
+    already holds ``pack_size`` items. ``pack_size`` adapts to observed request latency:
+    it is halved when a pack takes longer than ``target_latency`` seconds and grows by one
+    when a full pack comes back in under half of it. One sizer is meant to be shared by
+    all requests of a process, so what it learns carries over.
+
+    Example:
+        >>> sizer = AdaptivePackSizer(token_budget=600, initial_pack_size=4)
+        >>> sizer.pack(["a" * 1000] * 5)
+        [[0, 1], [2, 3], [4]]
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 6000,
+        max_pack_size: int = 8,
+        target_latency: float = 8.0,
+        initial_pack_size: int = 4
+    ):
+        if token_budget <= 0:
+            raise ValueError(f"token_budget must be positive, got {token_budget}")
+        if max_pack_size < 1:
+            raise ValueError(f"max_pack_size must be at least 1, got {max_pack_size}")
+        if target_latency <= 0:
+            raise ValueError(f"target_latency must be positive, got {target_latency}")
+
+        self.token_budget = token_budget
+        self.max_pack_size = max_pack_size
+        self.target_latency = target_latency
+        self._pack_size = min(max(1, initial_pack_size), max_pack_size)
+        self._lock = threading.Lock()
+
+    @property
+    def pack_size(self) -> int:
+        with self._lock:
+            return self._pack_size
+
+    def pack(self, items: List[str], overhead_tokens: int = 0) -> List[List[int]]:
+        """
+        Group items into packs, preserving order.
+
+        Args:
+            items: Texts to pack
+            overhead_tokens: Tokens taken by the shared instructions of every request
+
+        Returns:
+            List of packs, each a list of indices into ``items``. An item larger than the
+            budget on its own still gets a pack of its own.
+        """
+        pack_size = self.pack_size
+        budget = max(1, self.token_budget - overhead_tokens)
+
+        packs: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for i, item in enumerate(items):
+            tokens = estimate_tokens(item)
+            if current and (len(current) >= pack_size or current_tokens + tokens > budget):
+                packs.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+
+        if current:
+            packs.append(current)
+        return packs
+
+    def observe(self, items_in_pack: int, latency_seconds: float, failed: bool = False) -> int:
+        """
+        Record how long a pack took and adapt the pack size.
+
+        Args:
+            items_in_pack: Number of items the request carried
+            latency_seconds: Wall-clock duration of the request
+            failed: Whether the request failed (treated like a slow request)
+
+        Returns:
+            The pack size to use from now on
+        """
+        with self._lock:
+            if failed or latency_seconds > self.target_latency:
+                self._pack_size = max(1, self._pack_size // 2)
+            elif latency_seconds < self.target_latency / 2 and items_in_pack >= self._pack_size:
+                self._pack_size = min(self.max_pack_size, self._pack_size + 1)
+            return self._pack_size
@@ -0,0 +1,280 @@
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import numpy as np
+from dotenv import load_dotenv
+from tool.embedding_backends import EmbeddingBackend, get_embedding_backend
+
+load_dotenv()
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+# Cosine similarity for a hit (default: the embedding backend's near_duplicate_threshold)
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD")) if os.getenv("SEMANTIC_CACHE_THRESHOLD") else None
+SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", str(24 * 3600)))  # 0 disables expiry
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))  # Per namespace
+SEMANTIC_CACHE_BACKEND = os.getenv("SEMANTIC_CACHE_BACKEND")  # Embedding backend (default: EMBEDDING_BACKEND)
+# Longer requests only hit exactly: embedding models truncate their input, so documents
+# sharing a long prefix would embed as near-duplicates whatever their endings say
+SEMANTIC_CACHE_MAX_CHARS = int(os.getenv("SEMANTIC_CACHE_MAX_CHARS", "2000"))
+# Content-heavy namespaces that never match by similarity
+SEMANTIC_CACHE_EXACT_NAMESPACES = {
+    n.strip() for n in os.getenv("SEMANTIC_CACHE_EXACT_NAMESPACES", "agent_metadata").split(",") if n.strip()
+}
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_request(text: str) -> str:
+    """Case-, width- and whitespace-insensitive form of a request used as the cache key"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return _WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def _request_key(normalized: str) -> str:
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class SemanticCache:
+    """
+    In-memory cache of request results keyed by the meaning of the request.
+
+    Requests are normalized (``normalize_request``) and embedded; a lookup returns the
+    stored result of the most similar earlier request when its cosine similarity is at
+    least ``threshold`` (default: the embedding backend's near_duplicate_threshold), so
+    rephrased or slightly edited requests hit too. Identical normalized requests hit
+    without embedding. Entries older than ``ttl_seconds`` are misses and get dropped;
+    past ``max_entries`` the least recently used entry is evicted.
+
+    Similarity matching only applies to short requests: with ``semantic=False``, or for
+    requests longer than ``max_semantic_chars`` after normalization, only identical
+    requests hit. Requests are embedded with the shared embedding store disabled, so
+    cache keys are never persisted next to tag and chunk vectors.
+
+    A named backend is resolved afresh for every lookup, so an "auto" backend that falls
+    back once is back on its primary model for the next request. Vectors are only
+    compared with vectors of the same embedding model; if embedding fails the lookup
+    uses exact matches only and never fails the request.
+
+    Example:
+        >>> cache = SemanticCache("example", backend="local")
+        >>> cache.get_or_compute("What is LangGraph?", lambda: "A graph library")
+        ('A graph library', {'hit': False})
+        >>> cache.get_or_compute("what is  LangGraph", lambda: "not called")[1]["hit"]
+        True
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        threshold: Optional[float] = SEMANTIC_CACHE_THRESHOLD,
+        ttl_seconds: float = SEMANTIC_CACHE_TTL_SECONDS,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+        backend: Union[str, EmbeddingBackend, None] = SEMANTIC_CACHE_BACKEND,
+        semantic: bool = True,
+        max_semantic_chars: int = SEMANTIC_CACHE_MAX_CHARS
+    ):
+        if threshold is not None and not 0.0 < threshold <= 1.0:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}")
+
+        self.namespace = namespace
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._backend = backend
+        self.semantic = semantic
+        self.max_semantic_chars = max_semantic_chars
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}  # Keyed by hash of the normalized request
+        # Per embedding model: entry keys and their unit vectors, rebuilt lazily after changes
+        self._matrices: Dict[str, Tuple[List[str], np.ndarray]] = {}
+        self._backends_used: Dict[str, int] = {}  # Lookups embedded per model
+        self._counters = {"hits": 0, "exact_hits": 0, "misses": 0, "bypassed": 0, "writes": 0,
+                          "expired": 0, "evicted": 0, "embedding_failures": 0,
+                          "exact_only_lookups": 0}
+
+    def _embed(self, text: str) -> Tuple[Optional[str], Optional[np.ndarray], Optional[float]]:
+        """(model, unit vector, hit threshold), or Nones when embedding failed"""
+        try:
+            backend = get_embedding_backend(self._backend, use_store=False)
+            vector = np.asarray(backend.embed([text])[0], dtype=np.float32)
+            norm = float(np.linalg.norm(vector))
+            if norm == 0:
+                return None, None, None
+            # Read these after embedding: an "auto" backend may have fallen back
+            threshold = self.threshold if self.threshold is not None else backend.near_duplicate_threshold
+            with self._lock:
+                self._backends_used[backend.model] = self._backends_used.get(backend.model, 0) + 1
+            return backend.model, vector / norm, threshold
+        except Exception as e:
+            print(f"[semantic_cache] Warning: Embedding failed, using exact matches only: {str(e)}")
+            with self._lock:
+                self._counters["embedding_failures"] += 1
+            return None, None, None
+
+    def _expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return self.ttl_seconds > 0 and now - entry["created_at"] > self.ttl_seconds
+
+    def _remove(self, key: str) -> None:
+        del self._entries[key]
+        self._matrices = {}
+
+    def _nearest(self, model: str, vector: np.ndarray) -> Tuple[Optional[str], float]:
+        if model not in self._matrices:
+            keys = [
+                k for k, e in self._entries.items()
+                if e["model"] == model and e["vector"] is not None and len(e["vector"]) == len(vector)
+            ]
+            matrix = np.vstack([self._entries[k]["vector"] for k in keys]) if keys else None
+            self._matrices[model] = (keys, matrix)
+        keys, matrix = self._matrices[model]
+        if not keys:
+            return None, 0.0
+        similarities = matrix @ vector
+        best = int(np.argmax(similarities))
+        return keys[best], float(similarities[best])
+
+    def lookup(self, text: str) -> Dict[str, Any]:
+        """
+        Returns:
+            {"hit": True, "result", "similarity", "age_seconds"} on a hit, otherwise
+            {"hit": False} plus the computed key/model/vector for a following ``store``
+        """
+        normalized = normalize_request(text)
+        key = _request_key(normalized)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._remove(key)
+                self._counters["expired"] += 1
+                entry = None
+            if entry is not None:
+                entry["accessed_at"] = now
+                self._counters["hits"] += 1
+                self._counters["exact_hits"] += 1
+                return {"hit": True, "result": entry["result"], "similarity": 1.0,
+                        "age_seconds": round(now - entry["created_at"], 1)}
+
+        if not self.semantic or len(normalized) > self.max_semantic_chars:
+            with self._lock:
+                self._counters["exact_only_lookups"] += 1
+                self._counters["misses"] += 1
+            return {"hit": False, "key": key, "model": None, "vector": None}
+
+        model, vector, threshold = self._embed(normalized)
+
+        with self._lock:
+            if vector is not None:
+                nearest, similarity = self._nearest(model, vector)
+                if nearest is not None and similarity >= threshold:
+                    entry = self._entries[nearest]
+                    if self._expired(entry, now):
+                        self._remove(nearest)
+                        self._counters["expired"] += 1
+                    else:
+                        entry["accessed_at"] = now
+                        self._counters["hits"] += 1
+                        return {"hit": True, "result": entry["result"], "similarity": round(similarity, 4),
+                                "age_seconds": round(now - entry["created_at"], 1)}
+            self._counters["misses"] += 1
+        return {"hit": False, "key": key, "model": model, "vector": vector}
+
+    def store(self, miss: Dict[str, Any], result: Any) -> None:
+        """Store ``result`` for the request a ``lookup`` missed on"""
+        now = time.time()
+        with self._lock:
+            if miss["key"] in self._entries:
+                self._remove(miss["key"])
+            # Drop expired entries first, then the least recently used ones
+            for key in [k for k, e in self._entries.items() if self._expired(e, now)]:
+                self._remove(key)
+                self._counters["expired"] += 1
+            while len(self._entries) >= self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k]["accessed_at"])
+                self._remove(oldest)
+                self._counters["evicted"] += 1
+            self._entries[miss["key"]] = {
+                "model": miss["model"], "vector": miss["vector"], "result": result,
+                "created_at": now, "accessed_at": now
+            }
+            self._matrices = {}
+            self._counters["writes"] += 1
+
+    def get_or_compute(
+        self,
+        text: str,
+        compute: Callable[[], Any],
+        bypass: bool = False,
+        cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Return the cached result for a similar request, or compute and store it.
+
+        Args:
+            text: The request (task, content, ...)
+            compute: Produces the result on a miss
+            bypass: Skip the lookup; the fresh result is stored for exact matches only,
+                    without embedding the request
+            cacheable: Only results for which this returns True are stored (e.g. not errors)
+
+        Returns:
+            (result, info) where info has "hit", and "similarity" / "age_seconds" on a hit
+        """
+        if bypass:
+            with self._lock:
+                self._counters["bypassed"] += 1
+            miss = {"hit": False, "key": _request_key(normalize_request(text)), "model": None, "vector": None}
+        else:
+            miss = self.lookup(text)
+            if miss["hit"]:
+                return miss["result"], {key: miss[key] for key in ("hit", "similarity", "age_seconds")}
+
+        result = compute()
+        if cacheable is None or cacheable(result):
+            self.store(miss, result)
+        return result, {"hit": False}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+            models = dict(self._backends_used)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "namespace": self.namespace,
+            "threshold": self.threshold,
+            "semantic": self.semantic,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "embedding_models": models,
+            **counters,
+            "hit_rate": counters["hits"] / lookups if lookups else 0.0
+        }
+
+
+_caches: Dict[str, SemanticCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_semantic_cache(namespace: str) -> Optional[SemanticCache]:
+    """Process-wide semantic cache for a namespace, or None when SEMANTIC_CACHE_ENABLED is off"""
+    if not SEMANTIC_CACHE_ENABLED:
+        return None
+    with _caches_lock:
+        if namespace not in _caches:
+            _caches[namespace] = SemanticCache(namespace, semantic=namespace not in SEMANTIC_CACHE_EXACT_NAMESPACES)
+        return _caches[namespace]
+
+
+def semantic_cache_stats() -> Dict[str, Any]:
+    """Hit-rate metrics per namespace"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {"enabled": SEMANTIC_CACHE_ENABLED, "namespaces": {c.namespace: c.stats() for c in caches}}
@@ -1,6 +1,34 @@
 import numpy as np
 from typing import List, Dict, Any
-from tool.vector_utils import cosine_similarity
+from tool.vector_utils import cosine_similarity_matrix
+
+
+def _greedy_groups(vectors: List[np.ndarray], similarity_threshold: float) -> List[List[int]]:
+    """
+    Greedily group vectors in input order: each not-yet-assigned vector starts a group
+    and absorbs every later unassigned vector at or above the similarity threshold.
+    
+    The pairwise similarity matrix is computed once in float32, so each step is a
+    vectorized row scan instead of a Python loop over pairs.
+    
+    Returns:
+        List of groups (lists of indices), each led by the index that was kept
+    """
+    similarity_matrix = cosine_similarity_matrix(vectors, vectors)
+    assigned = np.zeros(len(vectors), dtype=bool)
+    groups = []
+    
+    for i in range(len(vectors)):
+        if assigned[i]:
+            continue
+        
+        members = np.flatnonzero(similarity_matrix[i, i + 1:] >= similarity_threshold) + i + 1
+        members = members[~assigned[members]]
+        assigned[i] = True
+        assigned[members] = True
+        groups.append([i] + members.tolist())
+    
+    return groups
 
 
 def deduplicate_tags_semantically(
@@ -50,43 +78,9 @@ def deduplicate_tags_semantically(
         if not isinstance(item["vector"], np.ndarray):
             raise ValueError(f"tag_data[{i}]['vector'] must be a numpy array")
     
-    # Track which tags to keep
-    unique_tags = []
-    seen_indices = set()
-    
-    for i, tag_item in enumerate(tag_data):
-        if i in seen_indices:
-            continue
-        
-        # Keep this tag
-        tag_name = tag_item["tag"]
-        tag_vector = tag_item["vector"]
-        unique_tags.append(tag_name)
-        seen_indices.add(i)
-        
-        # Compare with all remaining tags
-        for j in range(i + 1, len(tag_data)):
-            if j in seen_indices:
-                continue
-            
-            other_vector = tag_data[j]["vector"]
-            
-            try:
-                similarity = cosine_similarity(tag_vector, other_vector)
-                
-                # Handle NaN values
-                if np.isnan(similarity) or np.isinf(similarity):
-                    print(f"[semantic_deduplication] Warning: Invalid similarity between '{tag_name}' and '{tag_data[j]["tag"]}', skipping")
-                    continue
-                
-                # If very similar, mark as duplicate (don't keep)
-                if similarity >= similarity_threshold:
-                    seen_indices.add(j)
-            except Exception as e:
-                print(f"[semantic_deduplication] Error comparing tags: {str(e)}")
-                continue
+    groups = _greedy_groups([item["vector"] for item in tag_data], similarity_threshold)
     
-    return unique_tags
+    return [tag_data[group[0]]["tag"] for group in groups]
 
 
 def deduplicate_tags_with_priority(
@@ -143,39 +137,9 @@ def deduplicate_tags_with_priority(
         reverse=True
     )
     
-    unique_tags = []
-    seen_indices = set()
-    
-    for i, tag_item in enumerate(sorted_tags):
-        if i in seen_indices:
-            continue
-        
-        tag_name = tag_item["tag"]
-        tag_vector = tag_item["vector"]
-        unique_tags.append(tag_name)
-        seen_indices.add(i)
-        
-        # Mark similar tags as duplicates
-        for j in range(i + 1, len(sorted_tags)):
-            if j in seen_indices:
-                continue
-            
-            other_vector = sorted_tags[j]["vector"]
-            
-            try:
-                similarity = cosine_similarity(tag_vector, other_vector)
-                
-                # Handle NaN values
-                if np.isnan(similarity) or np.isinf(similarity):
-                    continue
-                
-                if similarity >= similarity_threshold:
-                    seen_indices.add(j)
-            except Exception as e:
-                print(f"[semantic_deduplication] Error in priority deduplication: {str(e)}")
-                continue
+    groups = _greedy_groups([item["vector"] for item in sorted_tags], similarity_threshold)
     
-    return unique_tags
+    return [sorted_tags[group[0]]["tag"] for group in groups]
 
 
 def get_semantic_clusters(
@@ -223,39 +187,6 @@ def get_semantic_clusters(
         if not isinstance(item["vector"], np.ndarray):
             raise ValueError(f"tag_data[{i}]['vector'] must be a numpy array")
             
-    clusters = []
-    assigned = set()
-    
-    for i, tag_item in enumerate(tag_data):
-        if i in assigned:
-            continue
-        
-        # Start a new cluster
-        cluster = [tag_item["tag"]]
-        assigned.add(i)
-        tag_vector = tag_item["vector"]
-        
-        # Find all similar tags
-        for j in range(i + 1, len(tag_data)):
-            if j in assigned:
-                continue
-            
-            other_vector = tag_data[j]["vector"]
-            
-            try:
-                similarity = cosine_similarity(tag_vector, other_vector)
-                
-                # Handle NaN values
-                if np.isnan(similarity) or np.isinf(similarity):
-                    continue
-                
-                if similarity >= similarity_threshold:
-                    cluster.append(tag_data[j]["tag"])
-                    assigned.add(j)
-            except Exception as e:
-                print(f"[semantic_deduplication] Error in clustering: {str(e)}")
-                continue
-        
-        clusters.append(cluster)
+    groups = _greedy_groups([item["vector"] for item in tag_data], similarity_threshold)
     
-    return clusters
+    return [[tag_data[i]["tag"] for i in group] for group in groups]
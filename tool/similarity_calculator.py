@@ -1,6 +1,6 @@
 import numpy as np
 from typing import List, Dict, Any, Tuple
-from tool.vector_utils import cosine_similarity
+from tool.vector_utils import cosine_similarity_matrix
 
 
 def _validate_tag_data(tag_data: List[Dict[str, Any]]) -> bool:
@@ -93,37 +93,51 @@ def calculate_tag_chunk_similarity(
                 f"but chunk vectors have dimension {chunk_dim}"
             )
     
+    # Score every tag against every chunk in one float32 matrix product
+    similarity_matrix = cosine_similarity_matrix(
+        [item["vector"] for item in tag_data],
+        [item["vector"] for item in readme_chunk_data]
+    )
+    max_similarities = similarity_matrix.max(axis=1)
     
-    results = []
-    
-    # For each tag, calculate similarity with all README chunks
-    for tag_item in tag_data:
-        tag_name = tag_item["tag"]
-        tag_vector = tag_item["vector"]
-        
-        max_similarity = -1.0
-        
-        # Calculate similarity with each chunk and find maximum
-        for chunk_item in readme_chunk_data:
-            chunk_vector = chunk_item["vector"]
-            
-            try:
-                similarity = cosine_similarity(tag_vector, chunk_vector)
-                
-                # Handle NaN or Inf values
-                if np.isnan(similarity) or np.isinf(similarity):
-                    print(f"[similarity_calculator] Warning: Invalid similarity score for tag '{tag_name}', skipping")
-                    continue
-                
-                if similarity > max_similarity:
-                    max_similarity = similarity
-            except Exception as e:
-                print(f"[similarity_calculator] Error calculating similarity for tag '{tag_name}': {str(e)}")
-                continue
-        
-        results.append((tag_name, float(max_similarity)))
+    results = [
+        (tag_item["tag"], float(score))
+        for tag_item, score in zip(tag_data, max_similarities)
+    ]
     
     # Sort by similarity score in descending order (highest first)
     results.sort(key=lambda x: x[1], reverse=True)
     
     return results
+
+
+def top_supporting_chunks(
+    tag_data: List[Dict[str, np.ndarray]],
+    readme_chunk_data: List[Dict[str, np.ndarray]],
+    top_k: int = 3
+) -> Dict[str, List[int]]:
+    """
+    Indices of the README chunks each tag matches best, most similar first.
+    
+    Args:
+        tag_data: List of {"tag": str, "vector": np.ndarray}
+        readme_chunk_data: List of {"chunk": str, "vector": np.ndarray}, in README order
+        top_k: Number of chunks to keep per tag (default: 3)
+        
+    Returns:
+        Dictionary mapping each tag to up to ``top_k`` chunk indices (argmax first)
+    """
+    if not tag_data or not readme_chunk_data or top_k <= 0:
+        return {}
+    
+    similarity_matrix = cosine_similarity_matrix(
+        [item["vector"] for item in tag_data],
+        [item["vector"] for item in readme_chunk_data]
+    )
+    k = min(top_k, similarity_matrix.shape[1])
+    order = np.argsort(-similarity_matrix, axis=1, kind="stable")[:, :k]
+    
+    return {
+        tag_item["tag"]: [int(i) for i in row]
+        for tag_item, row in zip(tag_data, order)
+    }
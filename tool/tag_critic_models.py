@@ -37,3 +37,14 @@ class TagEvaluationList(BaseModel):
 
 class RevisionModelList(BaseModel):
     revisions: List[RevisionModel]
+
+class TagEvaluationRevisionList(BaseModel):
+    evaluations: List[TagEvaluation]
+    revisions: List[RevisionModel] = Field(default_factory=list)
+
+class RepoEvaluationSection(BaseModel):
+    section_id: int
+    evaluations: List[TagEvaluation]
+
+class PackedRepoEvaluations(BaseModel):
+    sections: List[RepoEvaluationSection]
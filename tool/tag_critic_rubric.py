@@ -1,6 +1,60 @@
-from typing import List, Dict
-from tool.tag_critic_models import TagEvaluation, RevisionModel, IterationLog, TagCriticResponse, TagEvaluationList, RevisionModelList
+from typing import Callable, List, Dict, Optional
+from langchain_core.runnables import RunnableLambda
+from tool.tag_critic_models import TagEvaluation, RevisionModel, IterationLog, TagCriticResponse, TagEvaluationList, RevisionModelList, TagEvaluationRevisionList
 from tool.tag_critic_utils import normalize_tag
+from tool.topic_vocabulary import slugify_topic
+from tool.llm_registry import structured_output
+from tool.llm_hedging import hedged
+
+MIN_SCORE_DELTA = 1.0  # Stop once the mean score improves by less than this between iterations
+
+
+def _loose_key(tag: str) -> str:
+    """Tag form that ignores casing, spacing, hyphens and underscores ("Machine_Learning" == "machine-learning")"""
+    return slugify_topic(tag).replace("-", "")
+
+
+def match_evaluations(shard: List[str], evaluations: List[TagEvaluation]) -> Dict[str, TagEvaluation]:
+    """
+    Map the evaluations returned for a shard back onto the shard's tags.
+
+    The model often echoes a tag with different casing, hyphens or spacing. Evaluations
+    are matched exactly (normalize_tag) first, then by slug; the ones still unmatched are
+    paired with the still unmatched shard tags in order, so a score is never dropped
+    just because the tag came back spelled differently.
+
+    Args:
+        shard: Tags sent in the evaluation prompt
+        evaluations: Evaluations the model returned for them
+
+    Returns:
+        Evaluations keyed by normalize_tag(shard tag), each carrying the shard's spelling of the tag
+    """
+    matched: Dict[str, TagEvaluation] = {}
+    unmatched_tags = list(shard)
+    unmatched_evaluations = list(evaluations)
+    for key_fn in (normalize_tag, _loose_key):
+        by_key = {}
+        for tag in unmatched_tags:
+            by_key.setdefault(key_fn(tag), tag)
+        remaining = []
+        for e in unmatched_evaluations:
+            tag = by_key.pop(key_fn(e.tag), None)
+            if tag is None:
+                remaining.append(e)
+                continue
+            matched[normalize_tag(tag)] = e if e.tag == tag else e.model_copy(update={"tag": tag})
+            unmatched_tags.remove(tag)
+        unmatched_evaluations = remaining
+
+    # Repeated evaluations of a tag already matched are not a score for another tag
+    matched_keys = {_loose_key(e.tag) for e in matched.values()}
+    unmatched_evaluations = [e for e in unmatched_evaluations if _loose_key(e.tag) not in matched_keys]
+    for tag, e in zip(unmatched_tags, unmatched_evaluations):
+        print(f"[Rubric] Matching evaluation for '{e.tag}' to '{tag}' by position")
+        matched[normalize_tag(tag)] = e.model_copy(update={"tag": tag})
+    return matched
+
 
 def evaluate_tags_rubric(
     recommended_tags: List[str],
@@ -9,13 +63,38 @@ def evaluate_tags_rubric(
     max_iterations: int = 3,
     llm=None,
     tag_critic_eval_prompt=None,
-    tag_critic_revise_prompt=None
+    tag_critic_revise_prompt=None,
+    min_score_delta: Optional[float] = MIN_SCORE_DELTA,
+    combined: bool = False,
+    tag_critic_eval_revise_prompt=None,
+    shard_size: Optional[int] = None,
+    max_concurrency: int = 4,
+    context_provider: Optional[Callable[[List[str]], str]] = None,
+    hedging: bool = False,
+    eval_packer: Optional[Callable[[str, List[str]], Optional[TagEvaluationList]]] = None
 ) -> TagCriticResponse:
     """
     Evaluate and refine tags using a rubric evaluator loop.
     - Scores tags for relevance, clarity, quality, specificity, coverage, distinctiveness, and overall score (0-100).
     - Attempts to refine failing tags up to max_iterations.
     - Eliminates tags that still don't pass threshold.
+    - Evaluates incrementally: only tags not scored yet (revised or inserted) are sent to the
+      evaluator, unchanged tags carry their TagEvaluation forward.
+    - Stops early when the mean score improves by less than min_score_delta between
+      iterations (None disables), or when a revision round changes nothing.
+    - With combined=True (requires tag_critic_eval_revise_prompt) one structured call per
+      iteration returns both the scores and the revisions for failing tags, instead of an
+      evaluate call followed by a revise call.
+    - With shard_size set, tags to evaluate are split into shards of that size which are
+      scored concurrently (up to max_concurrency calls) and merged before the pass/fail
+      and revision logic, so evaluation latency stays flat as the tag count grows.
+    - With context_provider set, each prompt gets context_provider(tags) for the tags it
+      covers (e.g. only the README chunks supporting them) instead of the shared context.
+    - With hedging=True an evaluate or revise call still pending past its usual (p95)
+      latency is duplicated and the first valid response is used, within a budget.
+    - With eval_packer set (batch runs, separate calls only), each evaluation prompt is
+      first offered as eval_packer(context, tags), which may answer it in a request shared
+      with other repositories; when it returns None the usual call is made.
     Returns a TagCriticResponse Pydantic model.
     """
     tags_current = []
@@ -30,19 +109,89 @@ def evaluate_tags_rubric(
         tags_current.append(t.strip())
     print(f"[Rubric] Initial tags: {tags_current}")
 
+    if combined and tag_critic_eval_revise_prompt is None:
+        print("[Rubric] Warning: combined mode needs tag_critic_eval_revise_prompt, using separate calls")
+        combined = False
+
+    # Build the structured runnables once, not on every iteration
+    if combined:
+        eval_llm = structured_output(llm, TagEvaluationRevisionList)
+        revise_llm = None
+    else:
+        eval_llm = structured_output(llm, TagEvaluationList)
+        revise_llm = structured_output(llm, RevisionModelList)
+    if hedging:
+        eval_llm = hedged(eval_llm, "tag_critic_agent/combined" if combined else "tag_critic_agent/evaluate")
+        revise_llm = hedged(revise_llm, "tag_critic_agent/revise") if revise_llm else None
+
     iteration_logs: List[IterationLog] = []
     last_evaluations: List[TagEvaluation] = []
+    # Evaluations carried forward across iterations, keyed by normalized tag
+    evaluated: Dict[str, TagEvaluation] = {}
+    previous_mean: Optional[float] = None
 
     for iteration in range(1, max_iterations + 1):
-        tags_str = "\n".join(f"- {tag}" for tag in tags_current)
-        print(f"[Rubric] Iteration {iteration} - Tags: {tags_str}")
-        eval_prompt = tag_critic_eval_prompt.format(context=context, tags_str=tags_str)
-        print(f"[Rubric] Iteration {iteration} - Prompt: {eval_prompt}")
-
-        # Use structured output for evaluation
-        structured_llm = llm.with_structured_output(TagEvaluationList)
-        evaluations_response = structured_llm.invoke(eval_prompt)
-        evaluations = evaluations_response.evaluations
+        pending_tags = [t for t in tags_current if normalize_tag(t) not in evaluated]
+        print(f"[Rubric] Iteration {iteration} - Re-evaluating {len(pending_tags)}/{len(tags_current)} tags")
+        proposed_revisions: List[RevisionModel] = []
+
+        if pending_tags:
+            size = shard_size if shard_size and shard_size > 0 else len(pending_tags)
+            shards = [pending_tags[i:i + size] for i in range(0, len(pending_tags), size)]
+            eval_prompts = []
+            shard_contexts = []
+            for shard in shards:
+                tags_str = "\n".join(f"- {tag}" for tag in shard)
+                print(f"[Rubric] Iteration {iteration} - Tags: {tags_str}")
+                shard_context = context_provider(shard) if context_provider else context
+                if combined:
+                    eval_prompt = tag_critic_eval_revise_prompt.format(
+                        context=shard_context, tags_str=tags_str, threshold=threshold
+                    )
+                else:
+                    eval_prompt = tag_critic_eval_prompt.format(context=shard_context, tags_str=tags_str)
+                print(f"[Rubric] Iteration {iteration} - Prompt: {eval_prompt}")
+                eval_prompts.append(eval_prompt)
+                shard_contexts.append(shard_context)
+
+            eval_runner, eval_inputs = eval_llm, eval_prompts
+            if eval_packer and not combined:
+                eval_runner = RunnableLambda(
+                    lambda i: eval_packer(shard_contexts[i], shards[i]) or eval_llm.invoke(eval_prompts[i])
+                )
+                eval_inputs = list(range(len(shards)))
+
+            # Use structured output for evaluation; shards run concurrently and come back in order
+            if len(eval_prompts) == 1:
+                responses = [eval_runner.invoke(eval_inputs[0])]
+            else:
+                print(f"[Rubric] Iteration {iteration} - Evaluating {len(shards)} shards of up to {size} tags")
+                responses = eval_runner.batch(
+                    eval_inputs,
+                    config={"max_concurrency": max(1, max_concurrency)},
+                    return_exceptions=True
+                )
+                failed_shards = [r for r in responses if isinstance(r, Exception)]
+                if len(failed_shards) == len(responses):
+                    raise failed_shards[0]
+                for i, response in enumerate(responses):
+                    if isinstance(response, Exception):
+                        # Retry a failed shard once; if it fails again its tags stay unevaluated
+                        print(f"[Rubric] Iteration {iteration} - Shard {shards[i]} failed, retrying: {str(response)}")
+                        try:
+                            responses[i] = eval_llm.invoke(eval_prompts[i])
+                        except Exception as e:
+                            print(f"[Rubric] Iteration {iteration} - Shard {shards[i]} failed again: {str(e)}")
+
+            for shard, evaluations_response in zip(shards, responses):
+                if isinstance(evaluations_response, Exception) or not evaluations_response:
+                    continue
+                for norm, e in match_evaluations(shard, evaluations_response.evaluations).items():
+                    evaluated.setdefault(norm, e)
+                if combined:
+                    proposed_revisions.extend(evaluations_response.revisions)
+
+        evaluations = [evaluated[normalize_tag(t)] for t in tags_current if normalize_tag(t) in evaluated]
         print(f"[Rubric] Iteration {iteration} - Evaluations: {evaluations}")
         last_evaluations = evaluations
 
@@ -62,15 +211,33 @@ def evaluate_tags_rubric(
             print(f"[Rubric] Iteration {iteration} - All tags passed threshold.")
             break
 
-        revise_prompt = tag_critic_revise_prompt.format(
-            context=context,
-            failing_tags="\n".join([f"{f.tag} (score: {f.score})" for f in failing])
-        )
-        print(f"[Rubric] Iteration {iteration} - Revise Prompt: {revise_prompt}")
-        # Use structured output for revisions
-        structured_llm_revise = llm.with_structured_output(RevisionModelList)
-        revisions_response = structured_llm_revise.invoke(revise_prompt)
-        revisions = revisions_response.revisions
+        mean_score = sum(e.score for e in evaluations) / len(evaluations) if evaluations else 0.0
+        if previous_mean is not None and min_score_delta is not None and mean_score - previous_mean < min_score_delta:
+            print(f"[Rubric] Iteration {iteration} - Mean score moved {mean_score - previous_mean:.3f} "
+                  f"(< {min_score_delta}), stopping early.")
+            break
+        previous_mean = mean_score
+
+        if iteration == max_iterations:
+            # A revision now would never be evaluated
+            break
+
+        if combined:
+            # Revisions came back with the scores; keep those aimed at failing tags
+            failing_norms = {normalize_tag(f.tag) for f in failing}
+            revisions = [
+                r for r in proposed_revisions
+                if not r.original or normalize_tag(r.original) in failing_norms
+            ]
+        else:
+            revise_prompt = tag_critic_revise_prompt.format(
+                context=context_provider([f.tag for f in failing]) if context_provider else context,
+                failing_tags="\n".join([f"{f.tag} (score: {f.score})" for f in failing])
+            )
+            print(f"[Rubric] Iteration {iteration} - Revise Prompt: {revise_prompt}")
+            # Use structured output for revisions
+            revisions_response = revise_llm.invoke(revise_prompt)
+            revisions = revisions_response.revisions
         print(f"[Rubric] Iteration {iteration} - Revisions: {revisions}")
 
         rev_map: Dict[str, str] = {}
@@ -107,6 +274,10 @@ def evaluate_tags_rubric(
                 normalized.append(t.strip())
         print(f"[Rubric] Iteration {iteration} - Normalized tags: {normalized}")
 
+        if [normalize_tag(t) for t in normalized] == [normalize_tag(t) for t in tags_current]:
+            print(f"[Rubric] Iteration {iteration} - Revisions changed nothing, stopping.")
+            break
+
         tags_current = normalized
 
     final_tags = []
@@ -0,0 +1,134 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from tool.aho_corasick import AhoCorasick
+from tool.topic_vocabulary import (
+    CANONICAL_TOPICS, TOPIC_ALIASES, LINGUIST_LANGUAGES, resolve_topic_alias, slugify_topic
+)
+
+# Topics and aliases that are also everyday English words (or single letters);
+# a literal mention in prose says nothing about the project
+DICTIONARY_STOP_TERMS = {
+    "c", "r", "go", "next", "node", "rest", "restful", "agents", "express", "spring",
+    "shell", "assembly", "crypto", "ai", "ml", "dl", "cv", "rl", "tf", "fp", "py",
+    "js", "ts", "eth", "ror", "iac", "oop", "just", "less", "scheme", "liquid", "earthly",
+}
+
+
+def _surface_forms(term: str) -> List[str]:
+    """Spellings of a slug as it appears in prose: "node-js" -> node-js, node js, node.js"""
+    forms = [term]
+    if "-" in term:
+        forms += [term.replace("-", " "), term.replace("-", ".")]
+    return forms
+
+
+def build_topic_dictionary(extra_terms: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Surface form -> canonical tag for every known GitHub topic, alias and language.
+
+    Args:
+        extra_terms: Additional term -> tag entries (e.g. project-specific vocabulary)
+
+    Returns:
+        Dictionary of lowercase surface forms mapped to normalized tags
+    """
+    entries: List[Tuple[str, str]] = [(topic, topic) for topic in CANONICAL_TOPICS]
+    entries += list(TOPIC_ALIASES.items())
+    for language in LINGUIST_LANGUAGES:
+        entries.append((language.lower(), resolve_topic_alias(language) or slugify_topic(language)))
+    entries += list((extra_terms or {}).items())
+
+    dictionary: Dict[str, str] = {}
+    for term, tag in entries:
+        term = term.strip().lower()
+        if not term or not tag or term in DICTIONARY_STOP_TERMS:
+            continue
+        for form in _surface_forms(term):
+            dictionary.setdefault(form, tag)
+    return dictionary
+
+
+class TopicMatcher:
+    """
+    Finds every known topic mentioned in a text in a single pass.
+
+    The dictionary is compiled into an Aho-Corasick automaton. Matches must sit on word
+    boundaries ("go" does not match inside "good"), and overlapping matches are resolved
+    leftmost-longest, so "react native" counts as react-native and not also as react.
+
+    Example:
+        >>> TopicMatcher().match("Built with React Native and Node.js")
+        {'react-native': {'count': 1, 'positions': [[11, 23]]}, 'nodejs': {'count': 1, 'positions': [[28, 35]]}}
+    """
+
+    def __init__(self, dictionary: Optional[Dict[str, str]] = None):
+        self.dictionary = dictionary if dictionary is not None else build_topic_dictionary()
+        self._terms = list(self.dictionary)
+        self._automaton = AhoCorasick(self._terms)
+
+    def match(self, text: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Args:
+            text: README or other free text
+
+        Returns:
+            Normalized tag -> {"count", "positions"} with [start, end) character offsets
+            into ``text``, in order of first mention
+        """
+        if not isinstance(text, str) or not text:
+            return {}
+
+        # Per-character lowering keeps offsets aligned with the original text
+        lowered = "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+        candidates = []
+        for start, end, index in self._automaton.iter(lowered):
+            if start > 0 and lowered[start - 1].isalnum() and self._terms[index][0].isalnum():
+                continue
+            if end < len(lowered) and lowered[end].isalnum() and self._terms[index][-1].isalnum():
+                continue
+            candidates.append((start, end, index))
+
+        # Leftmost-longest, non-overlapping
+        candidates.sort(key=lambda match: (match[0], -(match[1] - match[0])))
+        mentions: Dict[str, Dict[str, Any]] = {}
+        covered_until = 0
+        for start, end, index in candidates:
+            if start < covered_until:
+                continue
+            covered_until = end
+            tag = self.dictionary[self._terms[index]]
+            mention = mentions.setdefault(tag, {"count": 0, "positions": []})
+            mention["count"] += 1
+            mention["positions"].append([start, end])
+        return mentions
+
+
+_default_matcher: Optional[TopicMatcher] = None
+_default_matcher_lock = threading.Lock()
+
+
+def get_topic_matcher() -> TopicMatcher:
+    """Return the process-wide matcher over the built-in dictionary (compiled on first use)"""
+    global _default_matcher
+    with _default_matcher_lock:
+        if _default_matcher is None:
+            _default_matcher = TopicMatcher()
+        return _default_matcher
+
+
+def match_topic_dictionary(text: str) -> Dict[str, int]:
+    """
+    Find literal mentions of canonical topics (or their aliases) in text.
+
+    Args:
+        text: README or other free text
+
+    Returns:
+        Mention count per canonical topic, in order of first mention
+
+    Example:
+        >>> match_topic_dictionary("Built with React.js and Node.js, deployed with k8s")
+        {'react': 1, 'nodejs': 1, 'kubernetes': 1}
+    """
+    return {tag: mention["count"] for tag, mention in get_topic_matcher().match(text).items()}
@@ -0,0 +1,223 @@
+import re
+from typing import Dict, List
+
+# Canonical GitHub topic vocabulary used to snap free-form candidate tags onto
+# well-known topics. Slugs follow GitHub topic conventions (lowercase, hyphenated).
+CANONICAL_TOPICS: List[str] = [
+    # Languages
+    "python", "javascript", "typescript", "java", "kotlin", "scala", "go", "rust",
+    "c", "cpp", "csharp", "fsharp", "ruby", "php", "perl", "swift", "objective-c",
+    "dart", "elixir", "erlang", "haskell", "clojure", "lua", "r", "julia", "matlab",
+    "shell", "bash", "powershell", "sql", "html", "css", "sass", "zig", "nim",
+    "ocaml", "groovy", "solidity", "webassembly", "assembly", "fortran", "cobol",
+    # Web frameworks and frontend
+    "react", "react-native", "nextjs", "vue", "nuxt", "angular", "svelte", "sveltekit",
+    "jquery", "tailwindcss", "bootstrap", "redux", "webpack", "vite", "babel",
+    "nodejs", "deno", "bun", "express", "nestjs", "fastify", "django", "flask",
+    "fastapi", "rails", "laravel", "symfony", "spring-boot", "spring", "aspnet-core",
+    "dotnet", "gin", "phoenix", "graphql", "rest-api", "grpc", "websocket", "openapi",
+    "frontend", "backend", "fullstack", "web-app", "single-page-app", "pwa",
+    "server-side-rendering", "static-site-generator", "jamstack",
+    # Mobile and desktop
+    "android", "ios", "flutter", "electron", "tauri", "mobile-app", "desktop-app",
+    "cross-platform", "swiftui", "jetpack-compose",
+    # Data and ML
+    "machine-learning", "deep-learning", "artificial-intelligence", "neural-network",
+    "natural-language-processing", "computer-vision", "reinforcement-learning",
+    "data-science", "data-analysis", "data-visualization", "data-engineering",
+    "big-data", "etl", "pandas", "numpy", "scikit-learn", "tensorflow", "pytorch",
+    "keras", "jax", "huggingface", "transformers", "llm", "large-language-models",
+    "generative-ai", "chatbot", "langchain", "langgraph", "openai", "gemini",
+    "ollama", "rag", "embeddings", "vector-database", "semantic-search",
+    "prompt-engineering", "ai-agents", "multi-agent-systems", "mlops",
+    "jupyter-notebook", "time-series", "recommendation-system", "object-detection",
+    "image-processing", "speech-recognition", "text-classification",
+    "sentiment-analysis", "spark", "hadoop", "kafka", "airflow", "dbt",
+    # Databases and storage
+    "database", "postgresql", "mysql", "sqlite", "mongodb", "redis", "elasticsearch",
+    "cassandra", "dynamodb", "neo4j", "firebase", "supabase", "orm", "prisma",
+    "sqlalchemy", "nosql", "caching",
+    # DevOps and cloud
+    "docker", "kubernetes", "helm", "terraform", "ansible", "devops", "ci-cd",
+    "github-actions", "jenkins", "gitlab-ci", "aws", "azure", "google-cloud",
+    "serverless", "aws-lambda", "cloud", "microservices", "infrastructure-as-code",
+    "monitoring", "observability", "prometheus", "grafana", "logging", "nginx",
+    "linux", "containers",
+    # Security
+    "security", "authentication", "authorization", "oauth2", "jwt", "encryption",
+    "cryptography", "penetration-testing", "vulnerability-scanner",
+    # Tooling and practices
+    "cli", "command-line-tool", "library", "framework", "sdk", "api", "api-client",
+    "automation", "scraper", "web-scraping", "crawler", "bot", "testing",
+    "unit-testing", "test-automation", "linter", "formatter", "code-generation",
+    "compiler", "interpreter", "parser", "developer-tools", "vscode-extension",
+    "plugin", "template", "boilerplate", "starter-kit", "documentation",
+    "open-source", "git", "github", "github-api", "markdown", "json", "yaml",
+    "configuration", "package-manager", "build-tool", "monorepo",
+    # Domains
+    "game-development", "game-engine", "unity", "unreal-engine", "godot",
+    "blockchain", "ethereum", "cryptocurrency", "smart-contracts", "web3",
+    "iot", "embedded", "arduino", "raspberry-pi", "robotics", "e-commerce",
+    "fintech", "healthcare", "education", "social-network", "cms", "blog",
+    "dashboard", "admin-panel", "analytics", "search-engine", "recommendation",
+    "real-time", "chat-application", "video-streaming", "audio", "music",
+    "maps", "geospatial", "notifications", "email", "payments", "scheduling",
+    "productivity", "note-taking", "task-manager", "portfolio", "resume",
+    # Architecture and concepts
+    "distributed-systems", "event-driven", "message-queue", "concurrency",
+    "asynchronous", "performance", "optimization", "algorithms", "data-structures",
+    "design-patterns", "clean-architecture", "functional-programming",
+    "object-oriented-programming", "reactive-programming", "state-management",
+    "accessibility", "internationalization", "ui", "ux", "ui-components",
+    "design-system", "responsive-design", "animation", "3d", "webgl", "threejs",
+    "tagging", "metadata", "text-processing", "nlp", "classification",
+]
+
+# Common aliases and spellings that map directly onto a canonical topic without
+# needing an embedding lookup.
+TOPIC_ALIASES: Dict[str, str] = {
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "c++": "cpp",
+    "c#": "csharp",
+    "f#": "fsharp",
+    "objc": "objective-c",
+    "wasm": "webassembly",
+    "reactjs": "react",
+    "react-js": "react",
+    "next-js": "nextjs",
+    "next": "nextjs",
+    "vuejs": "vue",
+    "vue-js": "vue",
+    "angularjs": "angular",
+    "node": "nodejs",
+    "node-js": "nodejs",
+    "expressjs": "express",
+    "express-js": "express",
+    "nest-js": "nestjs",
+    "ror": "rails",
+    "ruby-on-rails": "rails",
+    "springboot": "spring-boot",
+    ".net": "dotnet",
+    "net-core": "dotnet",
+    "asp-net-core": "aspnet-core",
+    "tailwind": "tailwindcss",
+    "ml": "machine-learning",
+    "dl": "deep-learning",
+    "ai": "artificial-intelligence",
+    "llms": "large-language-models",
+    "genai": "generative-ai",
+    "gen-ai": "generative-ai",
+    "cv": "computer-vision",
+    "rl": "reinforcement-learning",
+    "sklearn": "scikit-learn",
+    "torch": "pytorch",
+    "tf": "tensorflow",
+    "hugging-face": "huggingface",
+    "retrieval-augmented-generation": "rag",
+    "vector-db": "vector-database",
+    "agents": "ai-agents",
+    "multi-agent": "multi-agent-systems",
+    "multi-agent-system": "multi-agent-systems",
+    "postgres": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "gcp": "google-cloud",
+    "amazon-web-services": "aws",
+    "cicd": "ci-cd",
+    "continuous-integration": "ci-cd",
+    "iac": "infrastructure-as-code",
+    "oauth": "oauth2",
+    "rest": "rest-api",
+    "restful-api": "rest-api",
+    "restful": "rest-api",
+    "command-line": "cli",
+    "web-scraper": "web-scraping",
+    "scraping": "web-scraping",
+    "gamedev": "game-development",
+    "eth": "ethereum",
+    "crypto": "cryptocurrency",
+    "internet-of-things": "iot",
+    "rpi": "raspberry-pi",
+    "ecommerce": "e-commerce",
+    "oop": "object-oriented-programming",
+    "fp": "functional-programming",
+    "a11y": "accessibility",
+    "i18n": "internationalization",
+    "three-js": "threejs",
+    "jupyter": "jupyter-notebook",
+    "ipynb": "jupyter-notebook",
+    "natural-language-processing-nlp": "natural-language-processing",
+}
+
+# Language names as reported by the GitHub languages API (GitHub linguist).
+LINGUIST_LANGUAGES: List[str] = [
+    "Python", "JavaScript", "TypeScript", "Java", "Kotlin", "Scala", "Go", "Rust",
+    "C", "C++", "C#", "F#", "Ruby", "PHP", "Perl", "Swift", "Objective-C",
+    "Objective-C++", "Dart", "Elixir", "Erlang", "Haskell", "Clojure", "Lua", "R",
+    "Julia", "MATLAB", "Shell", "PowerShell", "Batchfile", "HTML", "CSS", "SCSS",
+    "Sass", "Less", "Vue", "Svelte", "Astro", "Jupyter Notebook", "Dockerfile",
+    "Makefile", "CMake", "HCL", "Nix", "Smarty", "Handlebars", "EJS", "Pug",
+    "Jinja", "TeX", "Roff", "Groovy", "Zig", "Nim", "OCaml", "Solidity", "Vim Script",
+    "Emacs Lisp", "Common Lisp", "Scheme", "Racket", "Assembly", "Fortran", "COBOL",
+    "Visual Basic .NET", "PLpgSQL", "TSQL", "Cuda", "GLSL", "HLSL", "ShaderLab",
+    "Starlark", "Procfile", "Mako", "Cython", "Jsonnet", "Earthly", "Just",
+    "Mustache", "Twig", "Blade", "Liquid", "WebAssembly", "Apex", "ABAP",
+]
+
+
+def slugify_topic(text: str) -> str:
+    """
+    Normalize free-form text into a GitHub topic slug.
+
+    Args:
+        text: Raw tag text (e.g., "Machine Learning", "rest_api")
+
+    Returns:
+        Lowercase hyphenated slug (e.g., "machine-learning", "rest-api")
+
+    Example:
+        >>> slugify_topic("  Machine Learning ")
+        'machine-learning'
+    """
+    if not isinstance(text, str):
+        return ""
+
+    slug = text.strip().lower()
+    # Keep symbols that carry meaning in aliases (c++, c#, .net) before stripping
+    if slug in TOPIC_ALIASES:
+        return slug
+    slug = re.sub(r"[\s_/]+", "-", slug)
+    slug = re.sub(r"[^a-z0-9\-.+#]", "", slug)
+    slug = re.sub(r"-{2,}", "-", slug).strip("-")
+    return slug
+
+
+def resolve_topic_alias(tag: str) -> str:
+    """
+    Resolve a tag to its canonical topic via exact or alias match.
+
+    Args:
+        tag: Raw tag text
+
+    Returns:
+        Canonical topic slug, or an empty string if the tag is not a known topic or alias
+
+    Example:
+        >>> resolve_topic_alias("K8s")
+        'kubernetes'
+    """
+    slug = slugify_topic(tag)
+    if not slug:
+        return ""
+    if slug in TOPIC_ALIASES:
+        return TOPIC_ALIASES[slug]
+    if slug in _CANONICAL_TOPIC_SET:
+        return slug
+    return ""
+
+
+_CANONICAL_TOPIC_SET = set(CANONICAL_TOPICS)
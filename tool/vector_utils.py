@@ -245,3 +245,72 @@ def dot_product(vec1: np.ndarray, vec2: np.ndarray) -> float:
         raise ValueError(f"Vector dimensions must match: {vec1.shape} vs {vec2.shape}")
     
     return float(np.dot(vec1, vec2))
+
+
+def truncate_embeddings(vectors: List[np.ndarray], dimensions: int) -> List[np.ndarray]:
+    """
+    Truncate embeddings to their first ``dimensions`` components and re-normalize.
+    
+    Matryoshka-trained models such as nomic-embed-text keep most of their quality in
+    the leading components, so short prefixes are cheaper to store and compare.
+    
+    Args:
+        vectors: List of embedding vectors
+        dimensions: Target dimensionality (must be positive)
+        
+    Returns:
+        List of float32 unit vectors of length min(dimensions, original length)
+        
+    Example:
+        >>> truncate_embeddings([np.array([3.0, 4.0, 12.0])], 2)
+        [array([0.6, 0.8], dtype=float32)]
+    """
+    if not isinstance(dimensions, int) or dimensions <= 0:
+        raise ValueError(f"dimensions must be a positive integer, got {dimensions}")
+    
+    if not vectors:
+        return []
+    
+    matrix = np.vstack([np.asarray(v, dtype=np.float32)[:dimensions] for v in vectors])
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return list(matrix / norms)
+
+
+def cosine_similarity_matrix(vectors_a: List[np.ndarray], vectors_b: List[np.ndarray]) -> np.ndarray:
+    """
+    Calculate pairwise cosine similarities between two sets of vectors in one matrix product.
+    
+    Rows that have zero magnitude or contain NaN/Inf values score 0.0 against everything,
+    matching cosine_similarity.
+    
+    Args:
+        vectors_a: List of m vectors
+        vectors_b: List of n vectors with the same dimension
+        
+    Returns:
+        float32 array of shape (m, n)
+        
+    Example:
+        >>> cosine_similarity_matrix([np.array([1, 0])], [np.array([1, 0]), np.array([0, 1])])
+        array([[1., 0.]], dtype=float32)
+    """
+    a = _unit_rows(vectors_a)
+    b = _unit_rows(vectors_b)
+    
+    if a.shape[1] != b.shape[1]:
+        raise ValueError(f"Vector dimensions must match: {a.shape[1]} vs {b.shape[1]}")
+    
+    return a @ b.T
+
+
+def _unit_rows(vectors: List[np.ndarray]) -> np.ndarray:
+    """Stack vectors into a float32 matrix of unit rows (invalid rows become zeros)"""
+    matrix = np.vstack([np.asarray(v, dtype=np.float32) for v in vectors])
+    invalid = ~np.all(np.isfinite(matrix), axis=1)
+    if np.any(invalid):
+        print(f"[vector_utils] Warning: {int(invalid.sum())} vector(s) contain NaN or Inf values")
+        matrix[invalid] = 0.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
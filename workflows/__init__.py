@@ -1,3 +1,3 @@
-from .workflow import run_simple_analysis_workflow, create_simple_analysis_workflow
+from .workflow import run_simple_analysis_workflow, run_batch_analysis_workflow, create_simple_analysis_workflow
 
-__all__ = ["run_simple_analysis_workflow", "create_simple_analysis_workflow"]
+__all__ = ["run_simple_analysis_workflow", "run_batch_analysis_workflow", "create_simple_analysis_workflow"]
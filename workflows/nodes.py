@@ -1,10 +1,47 @@
 from agents.data_collection_agent import fetch_github_readme
 from agents.tag_candidate_agent import generate_tag_candidates
+from agents.candidate_cascade_agent import cascade_tag_candidates, CANDIDATE_CASCADE
 from agents.tag_similarity_agent import calculate_tag_similarity
+from agents.topic_snapping_agent import snap_tags_to_topics
+from agents.tag_pruning_agent import prune_tags_mmr
 from agents.tag_critic_agent import critique_tags
 from agents.tag_rule_agent import rule_based_tag_filter
+from tool.embedding_backends import EmbeddingBackend, get_embedding_backend
+from tool.embedding_prefetch import PrefetchingEmbeddingBackend
+from tool.readme_chunking import chunk_text
+from tool.topic_vocabulary import resolve_topic_alias, slugify_topic
 from .state import SimpleAnalysisState
 
+
+def embedding_backend_for(options: dict) -> EmbeddingBackend:
+    """Resolve the embedding backend requested in the workflow options"""
+    return get_embedding_backend(
+        options.get('embedding_backend'),
+        dimensions=options.get('embedding_dimensions')
+    )
+
+
+def _embedding_backend(state: SimpleAnalysisState) -> EmbeddingBackend:
+    # Reuse the backend that has been embedding ahead of time since the candidate stage
+    if state.get('embedding_prefetch') is not None:
+        return state['embedding_prefetch']
+    return embedding_backend_for(state.get('options') or {})
+
+
+def _prefetch_tags(prefetcher: PrefetchingEmbeddingBackend):
+    """
+    Callback queueing the tags topic snapping will embed: those that are not a known
+    topic or alias. The similarity stage embeds tags only after its lexical check, so
+    their snapped forms are left to it.
+    """
+    def submit(tags):
+        prefetcher.submit([
+            tag for tag in tags
+            if isinstance(tag, str) and slugify_topic(tag) and not resolve_topic_alias(tag)
+        ])
+    return submit
+
+
 # Node functions
 def data_collector_node(state: SimpleAnalysisState) -> SimpleAnalysisState:
     """Fetch README, technologies, and topics from GitHub"""
@@ -34,14 +71,72 @@ def tag_candidate_node(state: SimpleAnalysisState) -> SimpleAnalysisState:
         state['current_step'] = "tag_candidate"
         return state
     
+    options = state.get('options') or {}
+    cascade = options.get('candidate_cascade')
+    prefetcher = state.get('embedding_prefetch')
+    on_tags = None
+    
+    if prefetcher is not None:
+        # README chunk embeddings do not depend on the tags: start them now, and embed
+        # tags for topic snapping as each chunk's tags come back
+        prefetcher.submit(chunk_text(content, chunk_size=1000, overlap=200))
+        on_tags = _prefetch_tags(prefetcher)
+    
+    if CANDIDATE_CASCADE if cascade is None else cascade:
+        # Local extractors first; the LLM only runs when they are not confident enough
+        cascade_result = cascade_tag_candidates(
+            content,
+            topics=state['topics'],
+            technologies=state['technologies'],
+            max_concurrency=options.get('candidate_concurrency'),
+            packing=options.get('candidate_packing'),
+            routing=options.get('model_routing'),
+            on_tags=on_tags,
+            hedging=options.get('llm_hedging')
+        )
+        state['candidate_cascade'] = cascade_result
+        if cascade_result.get('success'):
+            state['candidate_tags'] = cascade_result['tags']
+            if on_tags:
+                on_tags(state['candidate_tags'])
+            state['current_step'] = "tag_candidate_complete"
+            return state
+    
     # New signature: just pass readme_content, returns List[str]
-    candidate_tags = generate_tag_candidates(content)
+    candidate_tags = generate_tag_candidates(
+        content,
+        max_concurrency=options.get('candidate_concurrency'),
+        packing=options.get('candidate_packing'),
+        routing=options.get('model_routing'),
+        on_tags=on_tags,
+        hedging=options.get('llm_hedging')
+    )
     
     # Store as simple list
     state['candidate_tags'] = candidate_tags + state['technologies'] + state['topics']
+    if on_tags:
+        on_tags(state['technologies'] + state['topics'])
     state['current_step'] = "tag_candidate_complete"
     return state
 
+def topic_snap_node(state: SimpleAnalysisState) -> SimpleAnalysisState:
+    """Snap candidate tags onto canonical GitHub topics before similarity scoring"""
+    candidate_tags = state.get('candidate_tags', [])
+    
+    if not candidate_tags:
+        state['current_step'] = "topic_snap_complete"
+        return state
+    
+    snap_result = snap_tags_to_topics(candidate_tags, embedding_backend=_embedding_backend(state))
+    state['topic_snap'] = snap_result
+    
+    # Snapping is an optimization: keep the raw candidates if it could not run
+    if snap_result.get('success') and snap_result.get('snapped_tags'):
+        state['candidate_tags'] = snap_result['snapped_tags']
+    
+    state['current_step'] = "topic_snap_complete"
+    return state
+
 def similarity_node(state: SimpleAnalysisState) -> SimpleAnalysisState:
     """Calculate similarity between README and candidate tags"""
     content = state.get('readme_content', '')
@@ -57,8 +152,18 @@ def similarity_node(state: SimpleAnalysisState) -> SimpleAnalysisState:
         state['current_step'] = "similarity"
         return state
     
-    # New signature: calculate_tag_similarity(readme_content, candidate_tags)
-    similarity_result = calculate_tag_similarity(content, candidate_tags)
+    similarity_result = calculate_tag_similarity(
+        content,
+        candidate_tags,
+        embedding_backend=_embedding_backend(state)
+    )
+    
+    prefetcher = state.get('embedding_prefetch')
+    if prefetcher is not None:
+        # Later stages embed little; let the worker wind down
+        prefetcher.close()
+        if similarity_result.get('success'):
+            similarity_result['embedding_prefetch'] = prefetcher.stats()
     
     if not similarity_result.get('success'):
         state['similarity_analysis'] = {
@@ -72,6 +177,27 @@ def similarity_node(state: SimpleAnalysisState) -> SimpleAnalysisState:
     state['current_step'] = "similarity_complete"
     return state
 
+def tag_pruning_node(state: SimpleAnalysisState) -> SimpleAnalysisState:
+    """Keep a diverse top-N of the scored tags so the critic sees fewer, less redundant tags"""
+    tag_similarities = state.get('similarity_analysis', {}).get('tag_similarities', [])
+    
+    if not tag_similarities:
+        state['current_step'] = "tag_pruning_complete"
+        return state
+    
+    options = state.get('options') or {}
+    prune_kwargs = {}
+    if options.get('mmr_lambda') is not None:
+        prune_kwargs['lambda_mult'] = options['mmr_lambda']
+    state['tag_pruning'] = prune_tags_mmr(
+        tag_similarities,
+        top_n=options.get('critic_top_n'),
+        embedding_backend=_embedding_backend(state),
+        **prune_kwargs
+    )
+    state['current_step'] = "tag_pruning_complete"
+    return state
+
 def tag_critic_node(state: SimpleAnalysisState) -> SimpleAnalysisState:
     """Evaluate and refine tags using rubric-based critique"""
     print(f"[Workflow] Critiquing tags with rubric evaluator...")
@@ -83,6 +209,11 @@ def tag_critic_node(state: SimpleAnalysisState) -> SimpleAnalysisState:
     tag_similarities = similarity_analysis.get('tag_similarities', [])
     recommended_tags = [ele.get('tag') for ele in tag_similarities] if tag_similarities else []
     
+    # Only the pruned selection goes to the (expensive) critic
+    tag_pruning = state.get('tag_pruning', {})
+    if tag_pruning.get('success') and tag_pruning.get('selected_tags'):
+        recommended_tags = tag_pruning['selected_tags']
+    
     if not recommended_tags:
         # Fallback to top candidate tags if similarity didn't produce recommendations
         candidate_tags = state.get('candidate_tags', [])
@@ -93,8 +224,24 @@ def tag_critic_node(state: SimpleAnalysisState) -> SimpleAnalysisState:
         state['current_step'] = "tag_critic"
         return state
     
+    # Per-tag README excerpts when the similarity stage found any, else the shared digest
+    supporting_chunks = {
+        t.get('tag'): t.get('supporting_chunks', []) for t in tag_similarities if t.get('tag')
+    }
+    if not any(supporting_chunks.values()):
+        supporting_chunks = None
+    
     # Critique the recommended tags
-    critic_result = critique_tags(recommended_tags, context=content)
+    options = state.get('options') or {}
+    critic_result = critique_tags(
+        recommended_tags,
+        context=content,
+        combined=options.get('critic_combined'),
+        shard_size=options.get('critic_shard_size'),
+        supporting_chunks=supporting_chunks,
+        hedging=options.get('llm_hedging'),
+        routing=options.get('model_routing')
+    )
     state['tag_critic'] = critic_result
     state['current_step'] = "tag_critic_complete"
     return state
@@ -1,13 +1,18 @@
-from typing import Dict, Any, TypedDict, List
+from typing import Dict, Any, TypedDict, List, Optional
 
 class SimpleAnalysisState(TypedDict):
     owner: str
     repo: str
+    options: Dict[str, Any]  # Per-request tuning knobs (e.g. embedding_backend)
+    embedding_prefetch: Optional[Any]  # PrefetchingEmbeddingBackend shared by the embedding stages
     readme_content: str
     technologies: List[str]  # GitHub languages/technologies
     topics: List[str]  # GitHub topics
     candidate_tags: List[str]  # Simplified: now just array of strings
+    candidate_cascade: Dict[str, Any]  # Tier per candidate tag and whether the LLM ran
+    topic_snap: Dict[str, Any]  # Canonical topic snapping output
     similarity_analysis: Dict[str, Any]
+    tag_pruning: Dict[str, Any]  # MMR selection of tags passed to the critic
     tag_rule: Dict[str, Any]  # Added for rule-based agent output
     tag_critic: Dict[str, Any]  # Added field for tag critic output
     error: str
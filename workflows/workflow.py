@@ -1,46 +1,90 @@
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from dotenv import load_dotenv
 from langgraph.graph import StateGraph, END
+from agents.tag_candidate_agent import pack_repo_candidates
+from agents.tag_critic_agent import pack_repo_evaluations
+from tool.batch_packing import BATCH_PACKING, BatchPacker, batch_packing, batch_repo
+from tool.embedding_prefetch import EMBEDDING_PREFETCH, PrefetchingEmbeddingBackend
+from tool.llm_cache import llm_cache_bypass
+from tool.llm_usage import llm_usage_stage, track_llm_usage
 from .state import SimpleAnalysisState
-from .nodes import data_collector_node, tag_candidate_node, similarity_node, tag_rule_node, tag_critic_node
+from .nodes import embedding_backend_for, data_collector_node, tag_candidate_node, topic_snap_node, similarity_node, tag_pruning_node, tag_rule_node, tag_critic_node
+
+load_dotenv()
+
+BATCH_MAX_PARALLEL = int(os.getenv("BATCH_MAX_PARALLEL", "8"))  # Repositories analyzed at once in a batch
+
+def _in_stage(stage: str, node):
+    """Run a node with its LLM calls attributed to ``stage`` in the usage accounting"""
+    def run(state: SimpleAnalysisState) -> SimpleAnalysisState:
+        with llm_usage_stage(stage):
+            return node(state)
+    return run
 
 def create_simple_analysis_workflow():
     """Create and return a simple analysis workflow with rule and critic agents"""
     workflow = StateGraph(SimpleAnalysisState)
     
     # Add nodes
-    workflow.add_node("collector", data_collector_node)
-    workflow.add_node("candidate", tag_candidate_node)
-    workflow.add_node("similarity", similarity_node)
-    workflow.add_node("tag_critic", tag_critic_node)
-    workflow.add_node("tag_rule", tag_rule_node)
+    workflow.add_node("collector", _in_stage("collector", data_collector_node))
+    workflow.add_node("candidate", _in_stage("candidate", tag_candidate_node))
+    workflow.add_node("topic_snap", _in_stage("topic_snap", topic_snap_node))
+    workflow.add_node("similarity", _in_stage("similarity", similarity_node))
+    workflow.add_node("tag_pruning", _in_stage("tag_pruning", tag_pruning_node))
+    workflow.add_node("tag_critic", _in_stage("tag_critic", tag_critic_node))
+    workflow.add_node("tag_rule", _in_stage("tag_rule", tag_rule_node))
     
     # Define workflow edges (removed metadata extractor)
     workflow.add_edge("collector", "candidate")
-    workflow.add_edge("candidate", "similarity")
-    workflow.add_edge("similarity", "tag_critic")
+    workflow.add_edge("candidate", "topic_snap")
+    workflow.add_edge("topic_snap", "similarity")
+    workflow.add_edge("similarity", "tag_pruning")
+    workflow.add_edge("tag_pruning", "tag_critic")
     workflow.add_edge("tag_critic", "tag_rule")
     workflow.add_edge("tag_rule", END)
     
     workflow.set_entry_point("collector")
     return workflow.compile()
 
-def run_simple_analysis_workflow(owner: str, repo: str):
+def run_simple_analysis_workflow(owner: str, repo: str, options: Optional[Dict[str, Any]] = None):
     app = create_simple_analysis_workflow()
     initial_state = {
         "owner": owner,
         "repo": repo,
+        "options": options or {},
+        "embedding_prefetch": None,
         "readme_content": "",
         "technologies": [],
         "topics": [],
         "candidate_tags": [],  # Now a simple list
+        "candidate_cascade": {},
+        "topic_snap": {},
         "similarity_analysis": {},
+        "tag_pruning": {},
         "tag_critic": {},
         "tag_rule": {},
         "error": "",
         "current_step": "start"
     }
     
+    # Held here rather than only in the graph state, so it is closed even if the graph raises
+    prefetcher = None
     try:
-        final_state = app.invoke(initial_state)
+        prefetch = initial_state['options'].get('embedding_prefetch')
+        if EMBEDDING_PREFETCH if prefetch is None else prefetch:
+            prefetcher = PrefetchingEmbeddingBackend(embedding_backend_for(initial_state['options']))
+            initial_state['embedding_prefetch'] = prefetcher
+        
+        with llm_cache_bypass(initial_state['options'].get('llm_cache_bypass', False)), track_llm_usage() as usage:
+            final_state = app.invoke(initial_state)
+        llm_usage = usage.summary()
+        print(f"[workflow] LLM usage: {llm_usage['totals']['calls']} calls "
+              f"({llm_usage['totals']['cached_calls']} cached), "
+              f"{llm_usage['totals']['total_tokens']} tokens, ${llm_usage['totals']['cost_usd']:.4f}, "
+              f"most expensive stage: {llm_usage['most_expensive_stage']}")
         
         if final_state.get('error'):
             return {
@@ -48,12 +92,16 @@ def run_simple_analysis_workflow(owner: str, repo: str):
                 "error": final_state['error'],
                 "failed_at_step": final_state.get('current_step'),
                 "owner": owner,
-                "repo": repo
+                "repo": repo,
+                "llm_usage": llm_usage
             }
         
         # Extract data from final state
         similarity_data = final_state.get('similarity_analysis', {})
         candidate_tags = final_state.get('candidate_tags', [])
+        candidate_cascade_data = final_state.get('candidate_cascade', {})
+        topic_snap_data = final_state.get('topic_snap', {})
+        tag_pruning_data = final_state.get('tag_pruning', {})
         tag_critic_data = final_state.get('tag_critic', {})
         tag_rule_data = final_state.get('tag_rule', {})
         technologies = final_state.get('technologies', [])
@@ -67,7 +115,7 @@ def run_simple_analysis_workflow(owner: str, repo: str):
             "owner": owner,
             "repo": repo,
             "workflow": "simple_analysis",
-            "steps_completed": ["collector", "candidate", "similarity", "tag_critic", "tag_rule"],
+            "steps_completed": ["collector", "candidate", "topic_snap", "similarity", "tag_pruning", "tag_critic", "tag_rule"],
             "readme_content": {
                 "text": final_state.get('readme_content', '')[:500] + "...",
                 "length": len(final_state.get('readme_content', ''))
@@ -75,7 +123,10 @@ def run_simple_analysis_workflow(owner: str, repo: str):
             "technologies": technologies,
             "topics": topics,
             "candidate_tags": candidate_tags,
+            "candidate_cascade": candidate_cascade_data,
+            "topic_snap": topic_snap_data,
             "similarity_analysis": similarity_data,
+            "tag_pruning": tag_pruning_data,
             "tag_critic": tag_critic_data,
             "tag_rule": tag_rule_data,
             "summary": {
@@ -84,7 +135,8 @@ def run_simple_analysis_workflow(owner: str, repo: str):
                 "topics": topics,
                 "recommended_tags": recommended_tags,
                 "similarity_stats": similarity_data.get('statistics', {})
-            }
+            },
+            "llm_usage": llm_usage
         }
     except Exception as e:
         print(f"Exception in workflow: {e}")
@@ -94,3 +146,62 @@ def run_simple_analysis_workflow(owner: str, repo: str):
             "owner": owner,
             "repo": repo
         }
+    finally:
+        if prefetcher is not None:
+            prefetcher.close()
+
+def run_batch_analysis_workflow(
+    repositories: List[Tuple[str, str]],
+    options: Optional[Dict[str, Any]] = None,
+    max_parallel: Optional[int] = None,
+    packing: Optional[bool] = None
+):
+    """
+    Run the simple analysis workflow for several repositories at once.
+
+    Up to ``max_parallel`` workflows (default: BATCH_MAX_PARALLEL setting, 8) run
+    concurrently. With packing (default: BATCH_PACKING setting, on) the candidate chunks
+    of short READMEs and the critic evaluations of small tag sets from workflows in
+    flight together are packed into shared LLM requests with one section per
+    repository; larger inputs, and sections a packed request fails to answer, fall back
+    to the usual per-repository calls.
+
+    Args:
+        repositories: (owner, repo) pairs
+        options: Workflow options applied to every repository
+        max_parallel: Maximum number of workflows running at once
+        packing: Pack requests across repositories
+
+    Returns:
+        Dictionary with per-repository "results" (in input order), success counts and
+        "batch_packing" stats per request kind
+    """
+    packing = BATCH_PACKING if packing is None else packing
+    packers = {
+        "candidate": BatchPacker("candidate", pack_repo_candidates),
+        "critic": BatchPacker("critic", pack_repo_evaluations)
+    } if packing else {}
+    
+    def run(owner: str, repo: str):
+        with batch_repo(f"{owner}/{repo}"):
+            return run_simple_analysis_workflow(owner, repo, options=options)
+    
+    workers = max(1, min(max_parallel or BATCH_MAX_PARALLEL, len(repositories)))
+    with batch_packing(packers), ThreadPoolExecutor(max_workers=workers) as executor:
+        # Each workflow gets a copy of this context, packers included
+        futures = [
+            executor.submit(contextvars.copy_context().run, run, owner, repo)
+            for owner, repo in repositories
+        ]
+        results = [future.result() for future in futures]
+    
+    succeeded = sum(1 for result in results if result.get("success"))
+    stats = {name: packer.stats() for name, packer in packers.items()}
+    print(f"[workflow] Batch of {len(results)} repositories: {succeeded} succeeded, packing stats: {stats}")
+    return {
+        "success": succeeded == len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+        "batch_packing": stats
+    }